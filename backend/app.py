@@ -6,16 +6,29 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from functools import wraps
-from sqlalchemy import func
+from werkzeug.middleware.proxy_fix import ProxyFix
+from sqlalchemy import func, select, update
+import hashlib
 import re
 
+# Al ejecutar `python app.py`, `app` resuelve al paquete app/ (helpers sin estado)
+from app.pagination import PaginationError, paginate, parse_datetime, task_filters
+from app.passwords import PasswordHasher
+from app.sqlite import configure_sqlite_engine
+from app.summary import SummaryCache, summary_counts
+from app.events import EventHub, event_stream_response
+from app.diagnostics import QueryDiagnostics
+from app.metrics import Metrics
+from app.encoding import Compressor, etag_variants, negotiate, negotiated_response
+from app.ratelimit import RateLimiter
+
 # ----------------------------------------------------
 # 1. Configuración base
 # ----------------------------------------------------
 app = Flask(__name__)
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
-DB_PATH = os.path.join(BASE_DIR, 'organizador.db')
+DB_PATH = os.environ.get('ORGANIZADOR_DB_PATH') or os.path.join(BASE_DIR, 'organizador.db')
 
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'una_clave_secreta_fuerte_para_sesion_y_cifrado')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
@@ -27,13 +40,19 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = 60 * 60 * 24 * 7
 
+# bcrypt en un pool de procesos acotado (503 si está saturado)
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))
+
 # ----------------------------------------------------
 # CORS (YA SIN /api)
 # ----------------------------------------------------
 CORS(
     app,
     supports_credentials=True,
-    resources={r"/*": {"origins": "http://localhost:5173"}}
+    resources={r"/*": {"origins": "http://localhost:5173"}},
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache", "Retry-After"]
 )
 
 # ----------------------------------------------------
@@ -41,6 +60,38 @@ CORS(
 # ----------------------------------------------------
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
+hasher = PasswordHasher(app)
+summary_cache = SummaryCache()
+event_hub = EventHub(app)
+
+# Métricas Prometheus en /metrics; Server-Timing con METRICS_SERVER_TIMING=1
+app.config['METRICS_SERVER_TIMING'] = os.environ.get('METRICS_SERVER_TIMING', '0') == '1'
+metrics = Metrics(app, db)
+
+# Diagnóstico de SQL (consultas lentas con su plan, N+1) con SQL_DIAGNOSTICS=1
+app.config['SQL_DIAGNOSTICS'] = os.environ.get('SQL_DIAGNOSTICS', '0') == '1'
+app.config['SQL_SLOW_QUERY_MS'] = int(os.environ.get('SQL_SLOW_QUERY_MS', 50))
+sql_diagnostics = QueryDiagnostics(app, db)
+
+# Compresión brotli/gzip de las respuestas grandes (COMPRESS_ENABLED=0 la desactiva)
+app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+compressor = Compressor(app)
+
+# Límite de peticiones por usuario/IP (429) y de concurrencia (503); ver app/ratelimit.py.
+# Se comprueba en login_required y en las rutas de auth, no en un hook global
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+app.config['RATE_LIMIT_STORAGE'] = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+app.config['RATE_LIMIT_MAX_CONCURRENT'] = int(os.environ.get('RATE_LIMIT_MAX_CONCURRENT', 0))
+rate_limiter = RateLimiter(app, check_requests=False)
+# Proxies inversos de confianza delante (0 = conexión directa): IP real para los límites por IP
+app.config['PROXY_FIX_X_FOR'] = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+
+# Perfil de producción de SQLite (WAL, PRAGMAs), opcional
+if os.environ.get('SQLITE_TUNED', '0') == '1':
+    with app.app_context():
+        configure_sqlite_engine(db.engine, app.config)
 
 # ----------------------------------------------------
 # 3. Modelos
@@ -58,6 +109,7 @@ class User(db.Model):
     name = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     tasks = db.relationship('Task', backref='owner', lazy=True, cascade="all, delete-orphan")
     tags = db.relationship('Tag', backref='owner', lazy=True, cascade="all, delete-orphan")
@@ -71,9 +123,12 @@ class User(db.Model):
         }
 
 class Tag(db.Model):
+    __table_args__ = (db.Index('ix_tag_user_sync', 'user_id', 'sync_version'),)
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def to_dict(self):
         return {
@@ -83,6 +138,14 @@ class Tag(db.Model):
         }
 
 class Task(db.Model):
+    __table_args__ = (
+        db.Index('ix_task_user_completed_due', 'user_id', 'completed', 'due_date'),
+        db.Index('ix_task_user_created', 'user_id', 'created_at'),
+        db.Index('ix_task_user_status', 'user_id', 'status'),
+        db.Index('ix_task_user_quadrant', 'user_id', 'eisenhower_quadrant'),
+        db.Index('ix_task_user_sync', 'user_id', 'sync_version'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     title = db.Column(db.String(150), nullable=False)
@@ -94,6 +157,7 @@ class Task(db.Model):
     completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=func.now())
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     tags = db.relationship(
         'Tag',
@@ -118,6 +182,24 @@ class Task(db.Model):
             "tags": [tag.to_dict() for tag in self.tags]
         }
 
+class Tombstone(db.Model):
+    __table_args__ = (db.Index('ix_tombstone_user_sync', 'user_id', 'sync_version'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    entity_type = db.Column(db.String(10), nullable=False)  # 'task' o 'tag'
+    entity_id = db.Column(db.Integer, nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Orden de /tasks: (columna, descendente); el id desempata para el cursor
+TASK_ORDER = [
+    (Task.completed, False),
+    (Task.due_date, False),
+    (Task.created_at, True),
+    (Task.id, True),
+]
+
 # ----------------------------------------------------
 # 4. Utilidades
 # ----------------------------------------------------
@@ -127,6 +209,9 @@ def login_required(f):
         if "user_id" not in session:
             return jsonify({"message": "Acceso no autorizado."}), 401
         g.user_id = session["user_id"]
+        limited = rate_limiter.check_request(g.user_id)
+        if limited is not None:
+            return limited
         return f(*args, **kwargs)
     return wrapper
 
@@ -135,6 +220,34 @@ def create_tables():
         db.create_all()
         print("Base de datos creada.")
 
+def next_version(user_id):
+    # Cursor de cambios del usuario; el UPDATE bloquea la fila hasta el commit
+    db.session.execute(
+        update(User).where(User.id == user_id).values(sync_version=User.sync_version + 1)
+    )
+    return db.session.execute(select(User.sync_version).where(User.id == user_id)).scalar_one()
+
+def current_version(user_id):
+    return db.session.execute(select(User.sync_version).where(User.id == user_id)).scalar() or 0
+
+def record_deletion(user_id, entity_type, entity_id):
+    version = next_version(user_id)
+    db.session.add(Tombstone(user_id=user_id, entity_type=entity_type,
+                             entity_id=entity_id, sync_version=version))
+    return version
+
+def list_etag(user_id, scope):
+    key = f"{scope}:{user_id}:{current_version(user_id)}:{negotiate()}:{request.query_string.decode()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def not_modified(etag):
+    for variant in etag_variants(etag):
+        if request.if_none_match.contains(variant):
+            response = app.response_class(status=304)
+            response.set_etag(variant)
+            return response
+    return None
+
 def process_tag_ids_for_task(user_id, tag_ids):
     if not tag_ids:
         return []
@@ -146,6 +259,7 @@ def process_tag_ids_for_task(user_id, tag_ids):
 # 5. Auth (YA SIN /api)
 # ----------------------------------------------------
 @app.route("/register", methods=["POST"])
+@rate_limiter.limit('auth')
 def register():
     data = request.get_json()
     email = data.get("email")
@@ -160,7 +274,7 @@ def register():
     if User.query.filter_by(email=email).first():
         return jsonify({"message": "Email ya registrado."}), 409
 
-    hashed = bcrypt.generate_password_hash(password).decode("utf-8")
+    hashed = hasher.generate_password_hash(password)
     user = User(email=email, password=hashed)
     db.session.add(user)
     db.session.commit()
@@ -171,6 +285,7 @@ def register():
     return jsonify({"message": "Registro exitoso.", "user": user.to_dict()}), 201
 
 @app.route("/login", methods=["POST"])
+@rate_limiter.limit('auth')
 def login():
     data = request.get_json()
     email = data.get("email")
@@ -178,9 +293,14 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user or not bcrypt.check_password_hash(user.password, password):
+    if not user or not hasher.check_password_hash(user.password, password):
         return jsonify({"message": "Credenciales inválidas."}), 401
 
+    # Hash con un coste antiguo: se actualiza de forma transparente
+    if hasher.needs_rehash(user.password):
+        user.password = hasher.generate_password_hash(password)
+        db.session.commit()
+
     session["user_id"] = user.id
     session.permanent = True
     return jsonify({"message": "Login exitoso.", "user": user.to_dict()})
@@ -205,12 +325,22 @@ def tasks():
     user_id = g.user_id
 
     if request.method == "GET":
-        tasks = Task.query.filter_by(user_id=user_id).order_by(
-            Task.completed.asc(),
-            Task.due_date.asc(),
-            Task.created_at.desc()
-        ).all()
-        return jsonify([t.to_dict() for t in tasks])
+        etag = list_etag(user_id, "tasks")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        try:
+            query = Task.query.filter(Task.user_id == user_id, *task_filters(Task, request.args))
+            tasks, next_cursor = paginate(query, TASK_ORDER, request.args)
+        except PaginationError as e:
+            return jsonify({"message": str(e)}), 400
+
+        response = negotiated_response([t.to_dict() for t in tasks])
+        response.set_etag(etag)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
 
     if request.method == "POST":
         data = request.get_json()
@@ -223,9 +353,7 @@ def tasks():
         due_date = None
         if data.get("due_date"):
             try:
-                due_date = datetime.fromisoformat(
-                    data["due_date"].replace("Z", "+00:00").split("+")[0]
-                )
+                due_date = parse_datetime(data["due_date"])
             except:
                 return jsonify({"message": "Fecha inválida."}), 400
 
@@ -241,10 +369,16 @@ def tasks():
         )
 
         task.tags = process_tag_ids_for_task(user_id, tag_ids)
+        # Sin autoflush: la tarea aún no está en la sesión (se inserta ya con su versión)
+        with db.session.no_autoflush:
+            task.sync_version = next_version(user_id)
         db.session.add(task)
         db.session.commit()
+        summary_cache.invalidate(user_id)
 
-        return jsonify(task.to_dict()), 201
+        payload = task.to_dict()
+        event_hub.publish(user_id, "task.created", payload, cursor=task.sync_version)
+        return jsonify(payload), 201
 
 @app.route("/tasks/<int:task_id>", methods=["PUT", "DELETE"])
 @login_required
@@ -256,8 +390,11 @@ def task_detail(task_id):
         return jsonify({"message": "Tarea no encontrada."}), 404
 
     if request.method == "DELETE":
+        version = record_deletion(user_id, "task", task.id)
         db.session.delete(task)
         db.session.commit()
+        summary_cache.invalidate(user_id)
+        event_hub.publish(user_id, "task.deleted", {"id": task_id}, cursor=version)
         return "", 204
 
     data = request.get_json()
@@ -276,17 +413,19 @@ def task_detail(task_id):
             task.due_date = None
         else:
             try:
-                task.due_date = datetime.fromisoformat(
-                    data["due_date"].replace("Z", "+00:00").split("+")[0]
-                )
+                task.due_date = parse_datetime(data["due_date"])
             except:
                 return jsonify({"message": "Fecha inválida."}), 400
 
     if "tag_ids" in data:
         task.tags = process_tag_ids_for_task(user_id, data["tag_ids"])
 
+    task.sync_version = next_version(user_id)
     db.session.commit()
-    return jsonify(task.to_dict())
+    summary_cache.invalidate(user_id)
+    payload = task.to_dict()
+    event_hub.publish(user_id, "task.updated", payload, cursor=task.sync_version)
+    return jsonify(payload)
 
 @app.route("/tasks/<int:task_id>/complete", methods=["PATCH"])
 @login_required
@@ -302,9 +441,29 @@ def task_toggle(task_id):
         return jsonify({"message": "Campo 'completed' obligatorio."}), 400
 
     task.completed = data["completed"]
+    task.sync_version = next_version(user_id)
     db.session.commit()
+    summary_cache.invalidate(user_id)
 
-    return jsonify(task.to_dict())
+    payload = task.to_dict()
+    event_hub.publish(user_id, "task.updated", payload, cursor=task.sync_version)
+    return jsonify(payload)
+
+@app.route("/summary")
+@login_required
+def summary():
+    user_id = g.user_id
+    data, hit = summary_cache.get_or_compute(
+        user_id, lambda: summary_counts(db.session, Task, user_id), current_version(user_id)
+    )
+    response = jsonify(data)
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+@app.route("/summary/cache")
+@login_required
+def summary_cache_stats():
+    return jsonify(summary_cache.stats())
 
 # ----------------------------------------------------
 # 7. Etiquetas (SIN /api)
@@ -315,8 +474,15 @@ def tags():
     user_id = g.user_id
 
     if request.method == "GET":
+        etag = list_etag(user_id, "tags")
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         tags = Tag.query.filter_by(user_id=user_id).order_by(Tag.name.asc()).all()
-        return jsonify([t.to_dict() for t in tags])
+        response = negotiated_response([t.to_dict() for t in tags])
+        response.set_etag(etag)
+        return response
 
     data = request.get_json()
     name = data.get("name", "").strip()
@@ -327,11 +493,13 @@ def tags():
     if Tag.query.filter_by(name=name, user_id=user_id).first():
         return jsonify({"message": "Ya existe esta etiqueta."}), 409
 
-    tag = Tag(name=name, user_id=user_id)
+    tag = Tag(name=name, user_id=user_id, sync_version=next_version(user_id))
     db.session.add(tag)
     db.session.commit()
 
-    return jsonify(tag.to_dict()), 201
+    payload = tag.to_dict()
+    event_hub.publish(user_id, "tag.created", payload, cursor=tag.sync_version)
+    return jsonify(payload), 201
 
 @app.route("/tags/<int:tag_id>", methods=["DELETE"])
 @login_required
@@ -342,14 +510,77 @@ def tag_delete(tag_id):
     if not tag:
         return jsonify({"message": "Etiqueta no encontrada."}), 404
 
+    # Las tareas que la tenían cambian de contenido: nueva versión para ellas
+    version = record_deletion(user_id, "tag", tag.id)
+    linked = select(task_tags.c.task_id).where(task_tags.c.tag_id == tag.id)
+    db.session.execute(
+        update(Task)
+        .where(Task.user_id == user_id, Task.id.in_(linked))
+        .values(sync_version=version)
+        .execution_options(synchronize_session=False)
+    )
     db.session.delete(tag)
     db.session.commit()
+    event_hub.publish(user_id, "tag.deleted", {"id": tag_id}, cursor=version)
 
     return "", 204
 
 # ----------------------------------------------------
-# 8. RUN
+# 8. Sincronización incremental
+# ----------------------------------------------------
+@app.route("/sync")
+@login_required
+def sync_changes():
+    user_id = g.user_id
+    try:
+        since = int(request.args.get("since") or 0)
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"message": "Parámetro since inválido."}), 400
+
+    cursor = current_version(user_id)
+    tasks_query = Task.query.filter(Task.user_id == user_id)
+    tags_query = Tag.query.filter(Tag.user_id == user_id)
+    deleted = {"tasks": [], "tags": []}
+
+    if since:
+        tasks_query = tasks_query.filter(Task.sync_version > since)
+        tags_query = tags_query.filter(Tag.sync_version > since)
+        tombstones = db.session.execute(
+            select(Tombstone.entity_type, Tombstone.entity_id)
+            .where(Tombstone.user_id == user_id, Tombstone.sync_version > since)
+        )
+        for entity_type, entity_id in tombstones:
+            deleted[entity_type + "s"].append(entity_id)
+
+    return jsonify({
+        "cursor": cursor,
+        "tasks": [t.to_dict() for t in tasks_query.all()],
+        "tags": [t.to_dict() for t in tags_query.all()],
+        "deleted": deleted,
+    })
+
+# ----------------------------------------------------
+# 9. Flujo de cambios (SSE)
+# ----------------------------------------------------
+@app.route("/events")
+@login_required
+def events():
+    # La cookie de sesión viaja con EventSource(..., { withCredentials: true })
+    return event_stream_response(event_hub, g.user_id)
+
+@app.route("/events/stats")
+@login_required
+def events_stats():
+    return jsonify(event_hub.stats())
+
+# ----------------------------------------------------
+# 10. RUN
 # ----------------------------------------------------
+# Solo desarrollo: en producción el esquema no se toca al arrancar
+# (ver gunicorn.conf.py)
 if __name__ == "__main__":
-    create_tables()
-    app.run(debug=True, port=5000)
+    if os.environ.get("ORGANIZADOR_CREATE_TABLES", "1") == "1":
+        create_tables()
+    app.run(debug=os.environ.get("FLASK_DEBUG", "1") == "1", port=5000)
@@ -1,29 +1,70 @@
 # backend/app/__init__.py
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
+from app.diagnostics import QueryDiagnostics
+from app.encoding import Compressor
+from app.metrics import Metrics
+from app.ordering import PositionRebalancer
+from app.passwords import PasswordHasher
+from app.ratelimit import RateLimiter
+from app.sqlite import configure_sqlite_engine, enforce_foreign_keys
+from app.task_store import TaskStore
+from app.writer import GroupCommitWriter
 
 db = SQLAlchemy()
 migrate = Migrate()
 bcrypt = Bcrypt()
 jwt = JWTManager()
 cors = CORS()
+password_hasher = PasswordHasher()
+writer = GroupCommitWriter()
+task_store = TaskStore()
+metrics = Metrics()
+sql_diagnostics = QueryDiagnostics()
+position_rebalancer = PositionRebalancer()
+compressor = Compressor()
+rate_limiter = RateLimiter()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    # Detrás de un proxy inverso remote_addr sería siempre la del proxy
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
     db.init_app(app)
+    with app.app_context():
+        if app.config.get('SQLITE_FOREIGN_KEYS', True):
+            enforce_foreign_keys(db.engine)
+        if app.config.get('SQLITE_TUNED'):
+            configure_sqlite_engine(db.engine, app.config)
+    # Métricas primero: sus eventos SQL y hooks cubren todo lo demás
+    metrics.init_app(app, db)
+    sql_diagnostics.init_app(app, db)
+    writer.init_app(app)
+    task_store.init_app(app)
+    position_rebalancer.init_app(app)
+    # Tras metrics: las respuestas 429/503 también se cuentan
+    rate_limiter.init_app(app)
+    # Tras metrics: los after_request corren en orden inverso y así la compresión se mide
+    compressor.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
+    from app.revocation import token_blocklist
+    token_blocklist.init_app(app, jwt)
 
     # CORS para cualquier ruta (ya NO usamos /api)
-    cors.init_app(app, resources={r"/*": {"origins": "http://localhost:5173"}})
+    cors.init_app(app, resources={r"/*": {"origins": "http://localhost:5173"}},
+                  expose_headers=["X-Next-Cursor", "ETag", "X-Cache", "Content-Disposition",
+                                  "Retry-After"])
 
     from app import models
 
@@ -34,4 +75,39 @@ def create_app(config_class=Config):
     from app.routes import main_bp
     app.register_blueprint(main_bp)
 
+    from app.sync import sync_bp
+    app.register_blueprint(sync_bp)
+
+    from app.transfer import transfer_bp
+    app.register_blueprint(transfer_bp)
+
+    from app.accounts import accounts_bp
+    app.register_blueprint(accounts_bp)
+
+    from app.archive import archive_bp, task_archiver
+    app.register_blueprint(archive_bp)
+    task_archiver.init_app(app)
+
+    from app.reminders import reminder_scheduler
+    reminder_scheduler.init_app(app)
+
+    from app.events import event_hub
+    event_hub.init_app(app)
+
+    # Comandos de mantenimiento (flask pomodoro ...)
+    from app.pomodoro import pomodoro_cli
+    app.cli.add_command(pomodoro_cli)
+    from app.search import search_cli
+    app.cli.add_command(search_cli)
+    from app.ordering import positions_cli
+    app.cli.add_command(positions_cli)
+    from app.accounts import accounts_cli
+    app.cli.add_command(accounts_cli)
+    from app.archive import archive_cli
+    app.cli.add_command(archive_cli)
+    from app.sync import sync_cli
+    app.cli.add_command(sync_cli)
+    from app.reminders import reminders_cli
+    app.cli.add_command(reminders_cli)
+
     return app
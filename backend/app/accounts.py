@@ -0,0 +1,121 @@
+# backend/app/accounts.py
+"""Baja de cuentas: borrado de un usuario y de todos sus datos por trozos.
+
+Las claves foráneas tienen `ON DELETE CASCADE`, así que borrar la fila del
+usuario bastaría para llevarse todo; pero en una cuenta grande sería una
+única transacción larga con el cerrojo de escritura de SQLite tomado.
+`purge_user` borra primero las tareas (activas y archivadas), etiquetas,
+sesiones y tombstones en trozos de `ACCOUNT_PURGE_CHUNK_SIZE` filas con un
+commit por trozo (cada DELETE de tareas arrastra en la base sus enlaces y
+excepciones) y al final la fila del usuario. Si se corta a medias basta con repetirlo.
+
+`DELETE /account` (con la contraseña en el cuerpo) da de baja al usuario del
+token; `flask accounts purge` hace lo mismo desde la consola.
+"""
+import click
+from flask import Blueprint, current_app, request, jsonify
+from flask.cli import AppGroup
+from flask_jwt_extended import get_jwt, jwt_required
+from sqlalchemy import select, delete
+
+from app import db, task_store
+from app.auth import current_user_id
+from app.models import (User, Task, ArchivedTask, Tag, PomodoroSession, PomodoroDailyStat,
+                        PomodoroWeeklyStat, Tombstone)
+from app.revocation import token_blocklist
+from app.sqlite import write_intent
+from app.summary import summary_cache
+
+# Tablas con id propio, en el orden en que se purgan
+CHUNKED_MODELS = (Task, ArchivedTask, Tag, PomodoroSession, Tombstone)
+# Acumulados: una fila por día o semana, se borran de una vez
+ROLLUP_MODELS = (PomodoroDailyStat, PomodoroWeeklyStat)
+
+accounts_bp = Blueprint('accounts', __name__)
+accounts_cli = AppGroup('accounts', help='Gestión de cuentas de usuario.')
+
+
+def _delete_chunk(model, user_id, chunk_size):
+    ids = db.session.scalars(
+        select(model.id).where(model.user_id == user_id).order_by(model.id).limit(chunk_size)
+    ).all()
+    if ids:
+        db.session.execute(
+            delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return len(ids)
+
+
+def purge_user(user_id, chunk_size=None):
+    """Borra el usuario y todos sus datos con un commit por trozo. Devuelve las filas por tabla."""
+    chunk_size = chunk_size or current_app.config.get('ACCOUNT_PURGE_CHUNK_SIZE', 500)
+    # Cada trozo lee ids y borra: con BEGIN IMMEDIATE no hay que promover el cerrojo
+    token = write_intent.set(True)
+    try:
+        deleted = {}
+        for model in CHUNKED_MODELS:
+            count = 0
+            while True:
+                removed = _delete_chunk(model, user_id, chunk_size)
+                count += removed
+                if removed < chunk_size:
+                    break
+            deleted[model.__tablename__] = count
+        for model in ROLLUP_MODELS + (User,):
+            key = model.id if model is User else model.user_id
+            result = db.session.execute(
+                delete(model).where(key == user_id).execution_options(synchronize_session=False)
+            )
+            deleted[model.__tablename__] = result.rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        write_intent.reset(token)
+
+    task_store.invalidate(user_id)
+    summary_cache.invalidate(user_id)
+    return deleted
+
+
+@accounts_bp.route('/account', methods=['DELETE'])
+@jwt_required()
+def delete_account():
+    """Da de baja la cuenta del token y borra todos sus datos. Pide la contraseña."""
+    user_id = current_user_id()
+    data = request.get_json(silent=True) or {}
+    password = data.get('password')
+    if not password:
+        return jsonify({"msg": "Falta la contraseña"}), 400
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return jsonify({"msg": "Usuario no encontrado"}), 404
+    if not user.check_password(password):
+        return jsonify({"msg": "Credenciales inválidas"}), 401
+    # Termina la transacción de lectura antes de empezar a borrar
+    db.session.rollback()
+
+    deleted = purge_user(user_id)
+    # El token ya no corresponde a ningún usuario
+    token_blocklist.revoke(get_jwt())
+    return jsonify({"msg": "Cuenta eliminada", "deleted": deleted}), 200
+
+
+@accounts_cli.command('purge')
+@click.argument('user_id', type=int)
+@click.option('--chunk-size', type=int, default=None,
+              help='Filas por transacción (por defecto ACCOUNT_PURGE_CHUNK_SIZE).')
+@click.option('--yes', is_flag=True, help='No pedir confirmación.')
+def purge_command(user_id, chunk_size, yes):
+    """Borra el usuario USER_ID y todos sus datos."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        raise click.ClickException(f'No existe el usuario {user_id}')
+    if not yes:
+        click.confirm(f'¿Borrar a {user.email} y todos sus datos?', abort=True)
+    db.session.rollback()
+    for table, count in purge_user(user_id, chunk_size).items():
+        click.echo(f'{table}: {count}')
@@ -0,0 +1,318 @@
+# backend/app/archive.py
+"""Archivo de tareas completadas antiguas (datos fríos fuera de la tabla `task`).
+
+Las tareas completadas se acumulan para siempre y cada listado, índice y
+carga de etiquetas las arrastra. El archivador mueve a `archived_task` (y
+sus enlaces a `archived_task_tags`) las tareas completadas, no recurrentes,
+creadas y con vencimiento hace más de `ARCHIVE_AFTER_DAYS` días, así
+`task` queda acotada por el trabajo activo y no por la antigüedad de la
+cuenta.
+
+Se mueven en lotes de `ARCHIVE_BATCH_SIZE` tareas con un commit por lote
+(INSERT ... SELECT, lápidas para /sync y un DELETE que arrastra en cascada
+los enlaces): si se corta a medias, la siguiente ejecución sigue donde se
+quedó. Lo lanza `flask archive run` o, con `ARCHIVE_INTERVAL` > 0, un hilo
+de cada proceso que se arranca en la primera petición (y que purga también
+las lápidas caducadas de /sync).
+
+Para los clientes una tarea archivada es una tarea borrada: sale de /tasks
+y aparece en `deleted` de /sync. `GET /tasks/archive` lista las archivadas
+(paginado) y `POST /tasks/unarchive` las devuelve a `task` con su mismo id
+(`task` usa AUTOINCREMENT en SQLite y no reutiliza ids) al final de su
+columna del tablero. Una tarea restaurada no se vuelve a archivar hasta
+pasados otros `ARCHIVE_AFTER_DAYS` días.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import Blueprint, current_app, request, jsonify
+from flask.cli import AppGroup
+from flask_jwt_extended import jwt_required
+from sqlalchemy import delete, insert, literal, or_, select
+
+from app import db, task_store
+from app.auth import current_user_id
+from app.encoding import negotiated_response
+from app.events import event_hub
+from app.models import ArchivedTask, Task, Tombstone, archived_task_tags, task_tags
+from app.ordering import tail_keys
+from app.pagination import DEFAULT_PAGE_SIZE, PaginationError, paginate
+from app.serializers import serialize_task_rows, tags_by_task, task_rows
+from app.sqlite import write_intent
+from app.summary import summary_cache
+from app.sync import list_etag, next_version, not_modified, prune_tombstones, record_deletion
+
+# Columnas copiadas entre `task` y `archived_task`
+COLUMNS = ('id', 'title', 'description', 'due_date', 'completed', 'created_at', 'status',
+           'eisenhower_quadrant', 'user_id', 'recurrence_rule', 'position')
+ARCHIVE_ORDER = [(ArchivedTask.archived_at, True), (ArchivedTask.id, True)]
+MAX_UNARCHIVE_IDS = 500
+
+logger = logging.getLogger(__name__)
+
+archive_bp = Blueprint('archive', __name__)
+archive_cli = AppGroup('archive', help='Archivo de tareas completadas antiguas.')
+
+
+def archive_cutoff(days=None):
+    """Fecha límite: se archivan las tareas anteriores a ella."""
+    if days is None:
+        days = current_app.config.get('ARCHIVE_AFTER_DAYS', 90)
+    return datetime.utcnow() - timedelta(days=days)
+
+
+def _candidates(cutoff, batch_size, user_id=None):
+    stmt = (
+        select(Task.id, Task.user_id)
+        .where(Task.completed.is_(True), Task.created_at < cutoff,
+               or_(Task.due_date.is_(None), Task.due_date < cutoff),
+               or_(Task.restored_at.is_(None), Task.restored_at < cutoff),
+               # Las series siguen generando ocurrencias aunque estén completadas
+               Task.recurrence_rule.is_(None))
+        .order_by(Task.completed, Task.created_at)
+        .limit(batch_size)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Task.user_id == user_id)
+    return db.session.execute(stmt).all()
+
+
+def archive_batch(cutoff, batch_size, user_id=None):
+    """Archiva un lote en una transacción. Devuelve `{user_id: (versión, tareas)}`."""
+    by_user = {}
+    for task_id, owner in _candidates(cutoff, batch_size, user_id):
+        by_user.setdefault(owner, []).append(task_id)
+    archived_at = datetime.utcnow()
+    moved = {}
+    for owner, ids in by_user.items():
+        version = next_version(owner)
+        columns = [getattr(Task, name) for name in COLUMNS]
+        db.session.execute(
+            insert(ArchivedTask).from_select(
+                list(COLUMNS) + ['archived_at'],
+                select(*columns, literal(archived_at)).where(Task.id.in_(ids)),
+            )
+        )
+        db.session.execute(
+            insert(archived_task_tags).from_select(
+                ['task_id', 'tag_id'],
+                select(task_tags.c.task_id, task_tags.c.tag_id).where(task_tags.c.task_id.in_(ids)),
+            )
+        )
+        record_deletion(owner, 'task', *ids, version=version)
+        # ON DELETE CASCADE borra los enlaces task_tags
+        db.session.execute(
+            delete(Task).where(Task.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        moved[owner] = (version, len(ids))
+    db.session.commit()
+    for owner, (version, _) in moved.items():
+        _changed(owner, version)
+    return moved
+
+
+def archive_completed(cutoff=None, batch_size=None, user_id=None):
+    """Archiva lote a lote hasta que no quede nada. Devuelve el número de tareas movidas."""
+    cutoff = cutoff or archive_cutoff()
+    batch_size = batch_size or current_app.config.get('ARCHIVE_BATCH_SIZE', 500)
+    # Cada lote lee y después escribe: con BEGIN IMMEDIATE no hay que promover el cerrojo
+    token = write_intent.set(True)
+    try:
+        total = 0
+        while True:
+            try:
+                moved = archive_batch(cutoff, batch_size, user_id)
+            except Exception:
+                db.session.rollback()
+                raise
+            count = sum(n for _, n in moved.values())
+            total += count
+            if count < batch_size:
+                return total
+    finally:
+        write_intent.reset(token)
+
+
+def _changed(user_id, version):
+    # Los cambios de varias tareas a la vez no se aplican al almacén: se recarga
+    task_store.invalidate(user_id)
+    summary_cache.invalidate(user_id)
+    event_hub.publish(user_id, 'sync', cursor=version)
+
+
+def restore_tasks(user_id, ids):
+    """Devuelve a `task` las archivadas `ids` del usuario (con su id). Devuelve la versión."""
+    version = next_version(user_id)
+    rows = db.session.execute(
+        select(ArchivedTask.__table__).where(ArchivedTask.id.in_(ids)).order_by(ArchivedTask.id)
+    ).mappings().all()
+    restored_at = datetime.utcnow()
+    values = []
+    # Al final de su columna: su posición antigua pudo quedar entre otras tarjetas
+    for row, position in zip(rows, tail_keys(db.session, Task, user_id, len(rows))):
+        values.append({**{name: row[name] for name in COLUMNS}, "position": position,
+                       "restored_at": restored_at, "sync_version": version})
+    db.session.execute(insert(Task.__table__), values)
+    db.session.execute(
+        insert(task_tags).from_select(
+            ['task_id', 'tag_id'],
+            select(archived_task_tags.c.task_id, archived_task_tags.c.tag_id)
+            .where(archived_task_tags.c.task_id.in_(ids)),
+        )
+    )
+    # La tarea vuelve a existir: su lápida del archivado ya no aplica
+    db.session.execute(
+        delete(Tombstone).where(Tombstone.user_id == user_id, Tombstone.entity_type == 'task',
+                                Tombstone.entity_id.in_(ids))
+    )
+    # ON DELETE CASCADE borra sus enlaces archivados
+    db.session.execute(
+        delete(ArchivedTask).where(ArchivedTask.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    return version
+
+
+def serialize_archived_rows(rows):
+    """Como `serialize_task_rows`, más `archived_at`."""
+    tags = tags_by_task([row.id for row in rows], archived_task_tags)
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "due_date": row.due_date.isoformat() if row.due_date else None,
+            "completed": row.completed,
+            "status": row.status,
+            "eisenhower_quadrant": row.eisenhower_quadrant,
+            "user_id": row.user_id,
+            "recurrence_rule": row.recurrence_rule,
+            "position": row.position,
+            "tags": tags.get(row.id, []),
+            "archived_at": row.archived_at.isoformat(),
+        }
+        for row in rows
+    ]
+
+
+@archive_bp.route('/tasks/archive', methods=['GET'])
+@jwt_required()
+def get_archive():
+    """Tareas archivadas del usuario, de la última archivada a la primera.
+
+    Paginado siempre (`limit`, por defecto 100, y `cursor`); el cursor de la
+    siguiente página va en la cabecera X-Next-Cursor.
+    """
+    user_id = current_user_id()
+    etag = list_etag(user_id, 'archive')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    query = ArchivedTask.query.filter(ArchivedTask.user_id == user_id).with_entities(
+        *[getattr(ArchivedTask, name) for name in COLUMNS], ArchivedTask.archived_at
+    )
+    try:
+        rows, next_cursor = paginate(query, ARCHIVE_ORDER, request.args,
+                                     default_size=DEFAULT_PAGE_SIZE)
+    except PaginationError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    response = negotiated_response(serialize_archived_rows(rows))
+    response.set_etag(etag)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@archive_bp.route('/tasks/unarchive', methods=['POST'])
+@jwt_required()
+def unarchive_tasks():
+    """Devuelve tareas archivadas a la lista activa. Cuerpo: `{"ids": [...]}`.
+
+    Todas o ninguna: 404 si alguna no está en el archivo del usuario.
+    Devuelve las tareas restauradas en `tasks`.
+    """
+    user_id = current_user_id()
+    data = request.get_json(silent=True) or {}
+    try:
+        ids = sorted({int(i) for i in data.get('ids') or []})
+    except (TypeError, ValueError):
+        return jsonify({"msg": "Los ids deben ser enteros"}), 400
+    if not ids:
+        return jsonify({"msg": "ids es requerido"}), 400
+    if len(ids) > MAX_UNARCHIVE_IDS:
+        return jsonify({"msg": f"Máximo {MAX_UNARCHIVE_IDS} ids"}), 400
+
+    owned = db.session.scalar(
+        select(db.func.count()).where(ArchivedTask.user_id == user_id, ArchivedTask.id.in_(ids))
+    )
+    if owned != len(ids):
+        return jsonify({"msg": "Tarea archivada no encontrada"}), 404
+
+    version = restore_tasks(user_id, ids)
+    rows = task_rows(Task.query.filter(Task.id.in_(ids)).order_by(Task.id)).all()
+    tasks = serialize_task_rows(rows)
+    db.session.commit()
+    _changed(user_id, version)
+    return jsonify({"tasks": tasks, "cursor": version}), 200
+
+
+class TaskArchiver:
+    """Extensión Flask con el hilo que archiva cada `ARCHIVE_INTERVAL` segundos (0 = nunca)."""
+
+    def __init__(self, app=None):
+        self.interval = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self.archived = 0
+        self.runs = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.interval = app.config.get('ARCHIVE_INTERVAL', self.interval)
+        self.app = app
+        app.extensions['task_archiver'] = self
+        if self.interval > 0:
+            app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        # Perezoso: tras un fork del servidor cada proceso arranca su propio hilo
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='task-archiver', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                with self.app.app_context():
+                    self.archived += archive_completed()
+                    # Las lápidas que deja el archivo (y cualquier borrado) caducan aquí
+                    prune_tombstones()
+                self.runs += 1
+            except Exception:
+                logger.exception('Fallo al archivar tareas completadas')
+
+
+# Instancia del paquete `app` (se inicializa en create_app)
+task_archiver = TaskArchiver()
+
+
+@archive_cli.command('run')
+@click.option('--older-than-days', type=int, default=None,
+              help='Antigüedad mínima en días (por defecto ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=None,
+              help='Tareas por transacción (por defecto ARCHIVE_BATCH_SIZE).')
+@click.option('--user', 'user_id', type=int, default=None, help='Archivar solo este usuario.')
+def run_command(older_than_days, batch_size, user_id):
+    """Mueve al archivo las tareas completadas antiguas."""
+    total = archive_completed(archive_cutoff(older_than_days), batch_size, user_id)
+    click.echo(f'{total} tareas archivadas')
@@ -2,12 +2,17 @@
 from flask import Blueprint, request, jsonify
 from app import db, bcrypt
 from app.models import User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from app.revocation import token_blocklist
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 import re # Para validar email
 
 # Creamos un "Blueprint" para organizar nuestras rutas de autenticación
 auth_bp = Blueprint('auth', __name__)
 
+def current_user_id():
+    """Id del usuario del JWT como entero (el `sub` del token siempre es texto)."""
+    return int(get_jwt_identity())
+
 def is_valid_email(email):
     """Función simple para validar el formato de email."""
     regex = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -52,8 +57,20 @@ def login():
     user = User.query.filter_by(email=email).first()
 
     if user and user.check_password(password):
+        # Hash con un coste antiguo: se actualiza de forma transparente
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+
         # Si las credenciales son válidas, creamos un token de acceso
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=str(user.id))
         return jsonify(access_token=access_token, user={"id": user.id, "username": user.username}), 200
     else:
-        return jsonify({"msg": "Credenciales inválidas"}), 401
\ No newline at end of file
+        return jsonify({"msg": "Credenciales inválidas"}), 401
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Cierra la sesión: revoca el token con el que se llama."""
+    token_blocklist.revoke(get_jwt())
+    return jsonify({"msg": "Sesión cerrada"}), 200
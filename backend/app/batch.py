@@ -0,0 +1,241 @@
+# backend/app/batch.py
+"""Mutaciones de tareas por lotes en una sola transacción.
+
+Todas las operaciones se validan antes de escribir nada: la propiedad de
+las tareas y etiquetas referenciadas se comprueba con una consulta IN por
+tipo, y después las escrituras se agrupan en INSERT/UPDATE/DELETE masivos
+con un único commit.
+"""
+from sqlalchemy import select, insert, update, delete
+
+from app import db
+from app.models import OccurrenceException, Task, Tag, task_tags
+from app.ordering import tail_keys
+from app.pagination import parse_datetime
+from app.recurrence import RecurrenceError, normalize_rule
+from app.sync import next_version, record_deletion
+
+MAX_BATCH_OPERATIONS = 500
+
+OPERATIONS = ('create', 'update', 'delete')
+TASK_FIELDS = ('title', 'description', 'due_date', 'completed', 'status', 'eisenhower_quadrant',
+               'recurrence_rule')
+TEXT_FIELDS = ('title', 'description', 'due_date', 'status', 'eisenhower_quadrant')
+# Columnas NOT NULL: un null explícito se rechaza en vez de llegar a la base
+REQUIRED_FIELDS = ('status', 'eisenhower_quadrant')
+RECURRENCE_NEEDS_DUE = "Las tareas recurrentes necesitan fecha de inicio (due_date)"
+
+
+class BatchError(Exception):
+    """El lote completo es inválido (formato o tamaño)."""
+
+
+def task_values(data, creating):
+    """Valida y normaliza los campos de una tarea. Devuelve (valores, error)."""
+    if not isinstance(data, dict):
+        return None, "Los datos de la tarea deben ser un objeto"
+    values = {field: data[field] for field in TASK_FIELDS if field in data}
+    if creating and not values.get('title'):
+        return None, "El título es requerido"
+    if 'title' in values and not values['title']:
+        return None, "El título no puede estar vacío"
+    for field in REQUIRED_FIELDS:
+        if field in values and values[field] is None:
+            return None, f"{field} no puede ser nulo"
+    for field in TEXT_FIELDS:
+        if values.get(field) is not None and not isinstance(values[field], str):
+            return None, f"{field} debe ser un texto"
+    if 'completed' in values and not isinstance(values['completed'], bool):
+        return None, "completed debe ser true o false"
+    if values.get('due_date') == '':
+        values['due_date'] = None
+    if values.get('due_date') is not None:
+        try:
+            values['due_date'] = parse_datetime(values['due_date'])
+        except (TypeError, ValueError):
+            return None, "Fecha inválida"
+    if 'recurrence_rule' in values:
+        try:
+            values['recurrence_rule'] = normalize_rule(values['recurrence_rule'])
+        except RecurrenceError as e:
+            return None, str(e)
+        if creating and values['recurrence_rule'] and not values.get('due_date'):
+            return None, RECURRENCE_NEEDS_DUE
+    if creating:
+        values.setdefault('eisenhower_quadrant', 'ni_urgente_ni_importante')
+        values.setdefault('status', 'pending')
+    return values, None
+
+
+def _tag_ids(data):
+    ids = data.get('tag_ids', data.get('tags_ids'))
+    if ids is None:
+        return None
+    if not isinstance(ids, list):
+        raise TypeError('tag_ids debe ser una lista')
+    return {int(tag_id) for tag_id in ids}
+
+
+def _validate(user_id, operations):
+    """Primera pasada: formato, propiedad de tareas y etiquetas (una consulta IN cada una)."""
+    results = []
+    parsed = []
+    task_ids = set()
+    tag_ids = set()
+
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+            results.append({"index": index, "status": 400, "msg": "Operación inválida"})
+            parsed.append(None)
+            continue
+        op = operation['op']
+        data = operation.get('data') or {}
+        entry = {"index": index, "op": op}
+        try:
+            if op != 'create':
+                entry['id'] = int(operation['id'])
+            if op != 'delete' and isinstance(data, dict):
+                entry['tag_ids'] = _tag_ids(data)
+        except (KeyError, TypeError, ValueError):
+            results.append({**_public(entry), "status": 400, "msg": "Operación inválida"})
+            parsed.append(None)
+            continue
+
+        error = None
+        if op != 'delete':
+            entry['values'], error = task_values(data, op == 'create')
+        if not error and entry.get('id') in task_ids:
+            error = "La tarea aparece más de una vez en el lote"
+        if error:
+            results.append({**_public(entry), "status": 400, "msg": error})
+            parsed.append(None)
+            continue
+
+        if 'id' in entry:
+            task_ids.add(entry['id'])
+        tag_ids |= entry.get('tag_ids') or set()
+        results.append(None)
+        parsed.append(entry)
+
+    owned_tasks = {}
+    if task_ids:
+        owned_tasks = {row.id: row for row in db.session.execute(
+            select(Task.id, Task.recurrence_rule, Task.due_date)
+            .where(Task.user_id == user_id, Task.id.in_(task_ids))
+        )}
+    owned_tags = set()
+    if tag_ids:
+        owned_tags = set(db.session.scalars(
+            select(Tag.id).where(Tag.user_id == user_id, Tag.id.in_(tag_ids))
+        ))
+
+    for i, entry in enumerate(parsed):
+        if entry is None:
+            continue
+        if entry['op'] != 'create' and entry['id'] not in owned_tasks:
+            results[i] = {**_public(entry), "status": 404, "msg": "Tarea no encontrada"}
+            parsed[i] = None
+        elif entry.get('tag_ids') and not entry['tag_ids'] <= owned_tags:
+            results[i] = {**_public(entry), "status": 404, "msg": "Etiqueta no encontrada"}
+            parsed[i] = None
+        elif entry['op'] == 'update' and _loses_start(entry['values'], owned_tasks[entry['id']]):
+            results[i] = {**_public(entry), "status": 400, "msg": RECURRENCE_NEEDS_DUE}
+            parsed[i] = None
+
+    return parsed, results
+
+
+def _loses_start(values, current):
+    """True si la edición deja la tarea recurrente sin fecha de inicio."""
+    rule = values.get('recurrence_rule', current.recurrence_rule)
+    return bool(rule) and values.get('due_date', current.due_date) is None
+
+
+def _public(entry):
+    return {key: entry[key] for key in ('index', 'op', 'id') if key in entry}
+
+
+def apply_batch(user_id, operations):
+    """Aplica un lote de operaciones. Devuelve `(ok, resultados)`.
+
+    Si alguna operación es inválida no se escribe nada (`ok` es False) y los
+    resultados indican el error de cada una.
+    """
+    if not isinstance(operations, list) or not operations:
+        raise BatchError("Se requiere una lista de operaciones")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f"Máximo {MAX_BATCH_OPERATIONS} operaciones por lote")
+
+    parsed, results = _validate(user_id, operations)
+    if any(result is not None for result in results):
+        return False, [result or {**_public(entry), "status": 424, "msg": "No aplicada"}
+                       for result, entry in zip(results, parsed)]
+
+    version = next_version(user_id)
+    creates = [entry for entry in parsed if entry['op'] == 'create']
+    updates = [entry for entry in parsed if entry['op'] == 'update']
+    deletes = [entry['id'] for entry in parsed if entry['op'] == 'delete']
+
+    if creates:
+        # Las nuevas van al final de su columna, en el orden del lote
+        for entry, position in zip(creates, tail_keys(db.session, Task, user_id, len(creates))):
+            entry['values']['position'] = position
+        rows = [{**entry['values'], "user_id": user_id, "sync_version": version} for entry in creates]
+        new_ids = db.session.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), rows
+        ).all()
+        for entry, new_id in zip(creates, new_ids):
+            entry['id'] = new_id
+
+    # Las excepciones de una serie dejan de valer si cambia su regla o su inicio
+    _reset_changed_series(user_id, updates)
+
+    # UPDATE masivo por clave primaria, agrupado por conjunto de columnas
+    groups = {}
+    for entry in updates:
+        values = {**entry['values'], "sync_version": version}
+        groups.setdefault(frozenset(values), []).append({"id": entry['id'], **values})
+    for rows in groups.values():
+        db.session.execute(update(Task), rows)
+
+    retagged = [entry for entry in creates + updates if entry['tag_ids'] is not None]
+    if retagged:
+        db.session.execute(
+            delete(task_tags).where(task_tags.c.task_id.in_([entry['id'] for entry in retagged]))
+        )
+        links = [{"task_id": entry['id'], "tag_id": tag_id}
+                 for entry in retagged for tag_id in sorted(entry['tag_ids'])]
+        if links:
+            db.session.execute(insert(task_tags), links)
+
+    if deletes:
+        # ON DELETE CASCADE borra sus enlaces task_tags y excepciones de ocurrencia
+        db.session.execute(
+            delete(Task).where(Task.user_id == user_id, Task.id.in_(deletes))
+            .execution_options(synchronize_session=False)
+        )
+        record_deletion(user_id, 'task', *deletes, version=version)
+
+    db.session.commit()
+
+    status_by_op = {'create': 201, 'update': 200, 'delete': 204}
+    return True, [{**_public(entry), "status": status_by_op[entry['op']]} for entry in parsed]
+
+
+def _reset_changed_series(user_id, updates):
+    touched = {entry['id']: entry['values'] for entry in updates
+               if {'recurrence_rule', 'due_date'} & entry['values'].keys()}
+    if not touched:
+        return
+    changed = [
+        task_id for task_id, rule, due_date in db.session.execute(
+            select(Task.id, Task.recurrence_rule, Task.due_date)
+            .where(Task.user_id == user_id, Task.id.in_(touched))
+        )
+        if rule and (touched[task_id].get('recurrence_rule', rule),
+                     touched[task_id].get('due_date', due_date)) != (rule, due_date)
+    ]
+    if changed:
+        db.session.execute(
+            delete(OccurrenceException).where(OccurrenceException.task_id.in_(changed))
+        )
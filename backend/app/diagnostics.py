@@ -0,0 +1,166 @@
+# backend/app/diagnostics.py
+"""Modo diagnóstico de SQL: consultas lentas con su plan y detección de N+1.
+
+Se activa con `SQL_DIAGNOSTICS = True` (no pensado para producción: ejecuta
+EXPLAIN QUERY PLAN y guarda las sentencias de cada petición). Escribe en el
+logger `app.sql`:
+
+- Sentencias que tardan más de `SQL_SLOW_QUERY_MS`, con su plan.
+- La primera vez que aparece cada forma de sentencia se obtiene su plan; si
+  recorre entera `task` o `task_tags` (SCAN) se avisa con la ruta de origen.
+- Al terminar cada petición, las formas repetidas `SQL_N_PLUS_ONE_THRESHOLD`
+  veces o más (el típico bucle que lanza una consulta por elemento).
+
+`capture_queries` y `assert_max_queries` sirven en tests (pytest) para fijar
+el número máximo de consultas de un endpoint.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('app.sql')
+
+# Tablas cuyo recorrido completo se señala
+WATCHED_TABLES = ('task', 'task_tags')
+_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(%s)\b' % '|'.join(WATCHED_TABLES))
+# Las listas IN expandidas cambian de longitud: se normalizan para agrupar
+_IN_LIST = re.compile(r'\((?:\?|:\w+|%\(\w+\)s)(?:\s*,\s*(?:\?|:\w+|%\(\w+\)s))*\)')
+_WHITESPACE = re.compile(r'\s+')
+# Solo se analizan sentencias de datos (no PRAGMA, DDL ni control de transacciones)
+_DML = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+
+
+def statement_shape(statement):
+    """Forma de una sentencia: sin espacios repetidos ni longitud de las listas IN."""
+    return _IN_LIST.sub('(?…)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _route():
+    if has_request_context():
+        rule = request.url_rule.rule if request.url_rule else request.path
+        return f'{request.method} {rule}'
+    return 'fuera de petición'
+
+
+class QueryDiagnostics:
+    """Extensión Flask del modo diagnóstico (eventos SQL + hook de fin de petición)."""
+
+    def __init__(self, app=None, db=None):
+        self.enabled = False
+        self.slow_ms = 50
+        self.n_plus_one_threshold = 5
+        self._explained = set()
+        self._lock = threading.Lock()
+        # Últimos hallazgos, para consultarlos desde tests o una consola
+        self.findings = deque(maxlen=200)
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.enabled = app.config.get('SQL_DIAGNOSTICS', False)
+        self.slow_ms = app.config.get('SQL_SLOW_QUERY_MS', self.slow_ms)
+        self.n_plus_one_threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD',
+                                                   self.n_plus_one_threshold)
+        app.extensions['sql_diagnostics'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            self._listen(db.engine)
+        app.after_request(self._after_request)
+
+    def _listen(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info['_diagnostics_start'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = conn.info.pop('_diagnostics_start', None)
+            if not _DML.match(statement):
+                return
+            elapsed_ms = (time.perf_counter() - start) * 1000 if start is not None else 0
+            shape = statement_shape(statement)
+
+            if has_request_context():
+                shapes = g.get('_sql_shapes')
+                if shapes is None:
+                    shapes = g._sql_shapes = Counter()
+                shapes[shape] += 1
+
+            with self._lock:
+                first_time = shape not in self._explained
+                self._explained.add(shape)
+            slow = elapsed_ms >= self.slow_ms
+            if executemany or not (first_time or slow):
+                return
+
+            plan = self._explain(conn, statement, parameters)
+            scans = sorted({m.group(1) for line in plan for m in [_FULL_SCAN.search(line)] if m})
+            if slow:
+                self._report('slow', '%s: %.1f ms\n%s\nplan:\n  %s', _route(), elapsed_ms,
+                             statement, '\n  '.join(plan) or '(sin plan)')
+            if first_time and scans:
+                self._report('full_scan', '%s: recorrido completo de %s\n%s\nplan:\n  %s', _route(),
+                             ', '.join(scans), statement, '\n  '.join(plan))
+
+    def _explain(self, conn, statement, parameters):
+        if conn.dialect.name != 'sqlite':
+            return []
+        # Conexión DBAPI directa: no vuelve a disparar estos eventos
+        try:
+            cursor = conn.connection.driver_connection.execute(
+                'EXPLAIN QUERY PLAN ' + statement, parameters or ())
+            return [row[-1] for row in cursor.fetchall()]
+        except Exception as e:  # p. ej. sentencias que no admiten EXPLAIN
+            return [f'(EXPLAIN falló: {e})']
+
+    def _after_request(self, response):
+        shapes = g.pop('_sql_shapes', None)
+        if shapes:
+            for shape, count in shapes.items():
+                if count >= self.n_plus_one_threshold:
+                    self._report('n_plus_one', '%s: posible N+1, %d veces la misma sentencia\n%s',
+                                 _route(), count, shape)
+        return response
+
+    def _report(self, kind, message, *args):
+        logger.warning(message, *args)
+        self.findings.append({"kind": kind, "route": args[0], "message": message % args})
+
+
+@contextmanager
+def capture_queries(engine):
+    """Registra las sentencias SQL ejecutadas en `engine` dentro del bloque."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def assert_max_queries(engine, maximum):
+    """Falla (AssertionError) si el bloque ejecuta más de `maximum` sentencias.
+
+    Uso en pytest:
+        with assert_max_queries(db.engine, 3):
+            client.get('/tasks', headers=auth)
+    """
+    with capture_queries(engine) as statements:
+        yield statements
+    if len(statements) > maximum:
+        listing = '\n'.join(f'  {i}. {statement_shape(s)}' for i, s in enumerate(statements, 1))
+        raise AssertionError(f'Se esperaban como máximo {maximum} consultas y hubo '
+                             f'{len(statements)}:\n{listing}')
@@ -0,0 +1,30 @@
+# backend/app/dialects.py
+"""INSERT con resolución de conflictos según el dialecto de la base configurada."""
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def _dialect_insert(session, table):
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    return None
+
+
+def insert_ignore(session, table):
+    """INSERT ... ON CONFLICT DO NOTHING."""
+    stmt = _dialect_insert(session, table)
+    if stmt is None:
+        return insert(table).prefix_with('IGNORE')
+    return stmt.on_conflict_do_nothing()
+
+
+def upsert_add(session, table, keys, **increments):
+    """INSERT de la fila `keys` o, si ya existe, suma `increments` a sus columnas."""
+    stmt = _dialect_insert(session, table).values(**keys, **increments)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + stmt.excluded[name] for name in increments},
+    )
@@ -0,0 +1,220 @@
+# backend/app/encoding.py
+"""Representaciones negociadas de los listados y compresión de respuestas.
+
+Los listados (`/tasks`, `/sync`, `/tags`, búsqueda y agenda) repiten las
+mismas claves en cada fila. Con la cabecera `Accept` el cliente elige:
+
+- `application/json` (por defecto): el formato de siempre, una lista de objetos.
+- `application/vnd.organizador.columnar+json`: cada lista de objetos pasa a ser
+  `{"columns": [...], "rows": [[...], ...]}`; las etiquetas anidadas se
+  sustituyen por sus ids y sus nombres van una sola vez en `"tags": [[id, nombre], ...]`.
+- `application/msgpack` y `application/vnd.organizador.columnar+msgpack`: las
+  mismas dos estructuras en MessagePack (solo si `msgpack` está instalado).
+
+`Compressor` comprime con brotli (si está instalado) o gzip, según
+`Accept-Encoding`, las respuestas comprimibles de más de `COMPRESS_MIN_SIZE`
+bytes. La ETag de una respuesta comprimida lleva el sufijo de su
+codificación; `etag_variants` permite reconocerla en `If-None-Match`.
+
+No depende del estado del paquete `app` (lo usa también app.py).
+"""
+import gzip
+import json
+import time
+from operator import itemgetter
+
+from flask import current_app, request
+
+from app.metrics import record_timing
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack es opcional
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.organizador.columnar+json'
+MSGPACK = 'application/msgpack'
+COLUMNAR_MSGPACK = 'application/vnd.organizador.columnar+msgpack'
+COLUMNAR = (COLUMNAR_JSON, COLUMNAR_MSGPACK)
+
+# El primero es el de por defecto (Accept ausente o */*)
+MEDIA_TYPES = (JSON, COLUMNAR_JSON) + ((MSGPACK, COLUMNAR_MSGPACK) if msgpack else ())
+ALIASES = {'application/x-msgpack': MSGPACK}
+
+COMPRESSIBLE = {JSON, COLUMNAR_JSON, MSGPACK, COLUMNAR_MSGPACK, 'text/csv', 'text/plain',
+                'application/x-ndjson'}
+CODINGS = (('br', 'gzip') if brotli else ('gzip',))
+
+
+def dumps(payload):
+    """Codifica a JSON (bytes) con orjson si está instalado."""
+    start = time.perf_counter()
+    try:
+        if orjson is not None:
+            return orjson.dumps(payload)
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    finally:
+        record_timing('json', time.perf_counter() - start)
+
+
+def loads(data):
+    """Decodifica JSON (str o bytes) con orjson si está instalado."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def negotiate():
+    """Tipo de contenido de la respuesta según `Accept` (JSON si nada encaja)."""
+    offers = MEDIA_TYPES + tuple(alias for alias, target in ALIASES.items() if target in MEDIA_TYPES)
+    best = request.accept_mimetypes.best_match(offers, default=JSON)
+    return ALIASES.get(best, best)
+
+
+def _pack(rows, columns):
+    """Filas como tuplas en el orden de `columns`; KeyError si alguna tiene otras claves."""
+    width = len(columns)
+    nested = 'tags' in columns
+    values = [key for key in columns if key != 'tags']
+    if len(values) == 1:
+        get = lambda row, key=values[0]: (row[key],)  # noqa: E731 (itemgetter de una clave no da tupla)
+    else:
+        get = itemgetter(*values)
+    if not nested:
+        packed = []
+        for row in rows:
+            if len(row) != width:
+                raise KeyError(width)
+            packed.append(get(row))
+        return {"columns": values, "rows": packed}
+
+    tags = {}
+    packed = []
+    for row in rows:
+        if len(row) != width:
+            raise KeyError(width)
+        row_tags = row['tags'] or ()
+        for tag in row_tags:
+            tags[tag['id']] = tag['name']
+        packed.append((*get(row), [tag['id'] for tag in row_tags]))
+    return {"columns": values + ['tags'], "rows": packed,
+            "tags": [[tag_id, name] for tag_id, name in tags.items()]}
+
+
+def _table(rows):
+    """Lista de dicts → `{"columns", "rows"}` (+ `"tags"` si hay etiquetas anidadas)."""
+    if not rows:
+        return {"columns": [], "rows": []}
+    try:
+        return _pack(rows, list(rows[0]))
+    except KeyError:
+        # Filas con claves distintas (p. ej. ocurrencias en la agenda): unión de columnas
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        return _pack([{key: row.get(key) for key in columns} for row in rows], columns)
+
+
+def _is_rows(value):
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
+
+def columnar(payload):
+    """Forma columnar de un listado o de un objeto cuyos valores son listados."""
+    if _is_rows(payload):
+        return _table(payload)
+    if isinstance(payload, dict):
+        return {key: _table(value) if _is_rows(value) else value for key, value in payload.items()}
+    return payload
+
+
+def encode(payload, media_type):
+    """Cuerpo de la respuesta en el tipo de contenido negociado."""
+    if media_type in COLUMNAR:
+        start = time.perf_counter()
+        payload = columnar(payload)
+        record_timing('json', time.perf_counter() - start)
+    if media_type in (MSGPACK, COLUMNAR_MSGPACK):
+        start = time.perf_counter()
+        try:
+            return msgpack.packb(payload, use_bin_type=True)
+        finally:
+            record_timing('json', time.perf_counter() - start)
+    return dumps(payload)
+
+
+def negotiated_response(payload, status=200):
+    """Respuesta de un listado en el formato pedido en `Accept`."""
+    media_type = negotiate()
+    response = current_app.response_class(encode(payload, media_type), status=status,
+                                          mimetype=media_type)
+    response.vary.add('Accept')
+    return response
+
+
+def etag_variants(etag):
+    """ETag sin comprimir y con cada codificación (para comparar con If-None-Match)."""
+    return [etag] + [f'{etag}-{coding}' for coding in CODINGS]
+
+
+def compress(data, coding, level):
+    if coding == 'br':
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class Compressor:
+    """Extensión Flask que comprime las respuestas grandes en `after_request`."""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.levels = {'gzip': 6, 'br': 4}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', self.enabled)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.levels = {
+            'gzip': app.config.get('COMPRESS_GZIP_LEVEL', self.levels['gzip']),
+            'br': app.config.get('COMPRESS_BROTLI_QUALITY', self.levels['br']),
+        }
+        app.extensions['compressor'] = self
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def _coding(self):
+        best = max(CODINGS, key=lambda coding: request.accept_encodings[coding])
+        return best if request.accept_encodings[best] > 0 else None
+
+    def _after_request(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        coding = self._coding()
+        if coding is None or (response.content_length or 0) < self.min_size:
+            return response
+
+        data = response.get_data()
+        start = time.perf_counter()
+        compressed = compress(data, coding, self.levels[coding])
+        record_timing('compress', time.perf_counter() - start)
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = coding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{coding}', weak)
+        return response
@@ -0,0 +1,192 @@
+# backend/app/events.py
+"""Flujo de cambios por usuario con Server-Sent Events (`GET /events`).
+
+Los endpoints que escriben publican, tras el commit, un evento compacto en
+un hub en memoria (`task.created`, `task.updated`, `task.deleted`,
+`tag.created`, `tag.deleted`, o `sync` para las escrituras masivas, que
+pide al cliente llamar a `/sync?since=<cursor>`). Cada pestaña abierta es
+un suscriptor con su propia cola acotada: si no la vacía a tiempo se le
+desconecta y, al reconectar, el navegador envía `Last-Event-ID`.
+
+El hub guarda los últimos eventos de cada usuario para reenviarlos en la
+reconexión. Si el id no está cubierto (otro arranque del proceso o un hueco
+demasiado grande) se envía `resync`. Un cliente inactivo no hace ninguna
+lectura de la base: solo espera en su cola y recibe un latido periódico.
+
+El hub es por proceso: con varios workers cada uno publica solo sus
+propias escrituras y los clientes deben apoyarse en `resync`/`/sync`.
+"""
+import itertools
+import json
+import queue
+import secrets
+import threading
+from collections import OrderedDict, deque
+
+from flask import Response, request
+
+
+class _Subscriber:
+    __slots__ = ('queue', 'dropped')
+
+    def __init__(self, size):
+        self.queue = queue.Queue(maxsize=size)
+        self.dropped = False
+
+
+class EventHub:
+    """Pub/sub en memoria por usuario con historial acotado para reanudar."""
+
+    def __init__(self, app=None):
+        self.queue_size = 100
+        self.replay_size = 256
+        self.max_subscribers = 20
+        # Usuarios con historial en memoria (los menos recientes se olvidan)
+        self.max_history_users = 10000
+        # Cambia en cada arranque: un Last-Event-ID de otro proceso no es reanudable
+        self.epoch = secrets.token_hex(4)
+        self._sequence = itertools.count(1)
+        self._subscribers = {}
+        self._history = OrderedDict()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.queue_size = app.config.get('EVENTS_QUEUE_SIZE', self.queue_size)
+        self.replay_size = app.config.get('EVENTS_REPLAY_SIZE', self.replay_size)
+        self.max_subscribers = app.config.get('EVENTS_MAX_SUBSCRIBERS', self.max_subscribers)
+        app.extensions['event_hub'] = self
+
+    def publish(self, user_id, event_type, data=None, cursor=None):
+        """Envía un evento a todas las conexiones de `user_id` (llamar tras el commit)."""
+        payload = dict(data or {})
+        if cursor is not None:
+            payload['cursor'] = cursor
+        with self._lock:
+            event_id = f'{self.epoch}-{next(self._sequence)}'
+            message = _format(event_id, event_type, payload)
+            history = self._history.get(user_id)
+            if history is None:
+                history = self._history[user_id] = deque(maxlen=self.replay_size)
+                if len(self._history) > self.max_history_users:
+                    self._history.popitem(last=False)
+            else:
+                self._history.move_to_end(user_id)
+            history.append((event_id, message))
+            self.published += 1
+            for subscriber in list(self._subscribers.get(user_id, ())):
+                try:
+                    subscriber.queue.put_nowait(message)
+                except queue.Full:
+                    # Consumidor lento: se le corta y reanuda con Last-Event-ID
+                    self._drop(user_id, subscriber)
+
+    def subscribe(self, user_id, last_event_id=None):
+        """Registra una conexión; devuelve `(suscriptor, mensajes pendientes)`."""
+        subscriber = _Subscriber(self.queue_size)
+        with self._lock:
+            backlog = self._backlog(user_id, last_event_id)
+            subscribers = self._subscribers.setdefault(user_id, [])
+            subscribers.append(subscriber)
+            if len(subscribers) > self.max_subscribers:
+                self._drop(user_id, subscribers[0])
+        return subscriber, backlog
+
+    def unsubscribe(self, user_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers and subscriber in subscribers:
+                subscribers.remove(subscriber)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def reset(self):
+        """Época, historial y suscriptores nuevos (en un proceso recién creado por fork)."""
+        self._lock = threading.Lock()
+        self.epoch = secrets.token_hex(4)
+        self._sequence = itertools.count(1)
+        self._subscribers = {}
+        self._history = OrderedDict()
+        self.published = 0
+        self.dropped = 0
+
+    def close(self):
+        """Termina todas las conexiones abiertas (parada del proceso)."""
+        with self._lock:
+            for user_id, subscribers in list(self._subscribers.items()):
+                for subscriber in list(subscribers):
+                    self._drop(user_id, subscriber)
+                    try:
+                        # Despierta al generador que espera en la cola
+                        subscriber.queue.put_nowait(': cierre\n\n')
+                    except queue.Full:
+                        pass
+                self._subscribers.pop(user_id, None)
+
+    def _drop(self, user_id, subscriber):
+        subscriber.dropped = True
+        self._subscribers[user_id].remove(subscriber)
+        self.dropped += 1
+
+    def _backlog(self, user_id, last_event_id):
+        if not last_event_id:
+            return []
+        history = self._history.get(user_id, ())
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch == self.epoch and sequence.isdigit():
+            sequence = int(sequence)
+            ids = [int(event_id.split('-')[1]) for event_id, _ in history]
+            if ids and ids[-1] == sequence:
+                return []
+            # Reanudable si el siguiente evento sigue en el historial
+            if ids and ids[0] <= sequence + 1:
+                return [message for (_, message), i in zip(history, ids) if i > sequence]
+        return [_format(None, 'resync', {})]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "users": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+            }
+
+
+def _format(event_id, event_type, payload):
+    lines = [] if event_id is None else [f'id: {event_id}']
+    lines.append(f'event: {event_type}')
+    lines.append('data: ' + json.dumps(payload, separators=(',', ':'), default=str))
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_stream_response(hub, user_id, heartbeat=15, retry_ms=3000):
+    """Respuesta SSE para `user_id`; la reanudación lee la cabecera Last-Event-ID."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    subscriber, backlog = hub.subscribe(user_id, last_event_id)
+
+    def generate():
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            for message in backlog:
+                yield message
+            while not subscriber.dropped:
+                try:
+                    yield subscriber.queue.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Latido: mantiene viva la conexión y detecta clientes caídos
+                    yield ': ping\n\n'
+        finally:
+            hub.unsubscribe(user_id, subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# Hub del paquete `app` (app.py crea el suyo)
+event_hub = EventHub()
@@ -0,0 +1,203 @@
+# backend/app/metrics.py
+"""Métricas por endpoint en formato Prometheus (`GET /metrics`) y Server-Timing.
+
+Con hooks de Flask se mide cada petición y, con los eventos
+`before_cursor_execute`/`after_cursor_execute` de SQLAlchemy, cuántas
+sentencias ejecuta y cuánto tiempo pasa en SQLite. El hash de contraseñas
+(app/passwords.py), la codificación de las respuestas y su compresión
+(app/encoding.py) suman su tiempo con `record_timing`. Por ruta se guardan:
+
+- `http_request_duration_seconds`: histograma de latencia.
+- `http_request_sql_statements`: histograma de sentencias por petición.
+- `http_requests_total`: peticiones por estado.
+- `http_request_phase_seconds_total`: tiempo acumulado en sql, bcrypt, json y compress.
+
+El coste por petición es un par de `perf_counter()` por sentencia y una
+actualización de contadores bajo un lock, así que puede quedar activo en
+producción. Las métricas son del proceso: con varios workers Prometheus debe
+recogerlas de cada uno. `/metrics` no pide autenticación; en producción
+conviene limitarlo a la red interna desde el proxy.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PHASES = ('sql', 'bcrypt', 'json', 'compress')
+
+
+class _RequestTimings:
+    __slots__ = ('start', 'statements', 'sql', 'bcrypt', 'json', 'compress')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.statements = 0
+        self.sql = 0.0
+        self.bcrypt = 0.0
+        self.json = 0.0
+        self.compress = 0.0
+
+
+def record_timing(phase, seconds):
+    """Suma `seconds` a la fase (`'bcrypt'`, `'json'`, `'compress'`) de la petición en curso, si se mide."""
+    if has_app_context():
+        timings = g.get('_timings')
+        if timings is not None:
+            setattr(timings, phase, getattr(timings, phase) + seconds)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _TimedJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask que suma su tiempo a la fase `json` (jsonify)."""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            record_timing('json', time.perf_counter() - start)
+
+
+class Metrics:
+    """Extensión Flask: hooks de petición, eventos SQL y endpoint `/metrics`."""
+
+    def __init__(self, app=None, db=None):
+        self.enabled = False
+        self.server_timing = False
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._statements = {}
+        self._requests = {}
+        self._phases = {}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.server_timing = app.config.get('METRICS_SERVER_TIMING', False)
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            self._listen(db.engine)
+        app.json = _TimedJSONProvider(app)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _listen(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info['_query_start'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            start = conn.info.pop('_query_start', None)
+            if start is None:
+                return
+            elapsed = time.perf_counter() - start
+            # Fuera de una petición (hilo escritor, comandos CLI) no se atribuye a ninguna ruta
+            if has_app_context():
+                timings = g.get('_timings')
+                if timings is not None:
+                    timings.statements += 1
+                    timings.sql += elapsed
+
+    def _before_request(self):
+        g._timings = _RequestTimings()
+
+    def _after_request(self, response):
+        timings = g.pop('_timings', None)
+        if timings is None:
+            return response
+        elapsed = time.perf_counter() - timings.start
+        route = request.url_rule.rule if request.url_rule else 'no_encontrada'
+        key = (request.method, route)
+
+        with self._lock:
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = _Histogram(LATENCY_BUCKETS)
+                self._statements[key] = _Histogram(STATEMENT_BUCKETS)
+                self._phases[key] = dict.fromkeys(PHASES, 0.0)
+            latency.observe(elapsed)
+            self._statements[key].observe(timings.statements)
+            phases = self._phases[key]
+            phases['sql'] += timings.sql
+            phases['bcrypt'] += timings.bcrypt
+            phases['json'] += timings.json
+            phases['compress'] += timings.compress
+            status_key = key + (response.status_code,)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'sql;dur={timings.sql * 1000:.2f};desc="{timings.statements} sentencias", '
+                f'bcrypt;dur={timings.bcrypt * 1000:.2f}, '
+                f'json;dur={timings.json * 1000:.2f}, '
+                f'compress;dur={timings.compress * 1000:.2f}, '
+                f'total;dur={elapsed * 1000:.2f}'
+            )
+        return response
+
+    def render(self):
+        """Todas las métricas en el formato de texto de Prometheus (0.0.4)."""
+        lines = []
+        with self._lock:
+            lines += ['# HELP http_requests_total Peticiones atendidas por ruta y estado.',
+                      '# TYPE http_requests_total counter']
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+            lines += _histogram_lines('http_request_duration_seconds',
+                                      'Latencia de las peticiones por ruta.', self._latency)
+            lines += _histogram_lines('http_request_sql_statements',
+                                      'Sentencias SQL por petición.', self._statements)
+            lines += ['# HELP http_request_phase_seconds_total Tiempo acumulado en SQL, bcrypt, JSON y compresión.',
+                      '# TYPE http_request_phase_seconds_total counter']
+            for (method, route), phases in sorted(self._phases.items()):
+                for phase in PHASES:
+                    lines.append(f'http_request_phase_seconds_total{{{_labels(method, route)},'
+                                 f'phase="{phase}"}} {phases[phase]:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return self.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def _labels(method, route):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+def _histogram_lines(name, help_text, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = _labels(method, route)
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {round(histogram.sum, 6)}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
@@ -1,12 +1,19 @@
 # backend/app/models.py
-from app import db, bcrypt
+from app import db, password_hasher
 from datetime import datetime
 
 # --- AÑADIR ESTO ---
 # Tabla de asociación para la relación Muchos-a-Muchos entre Tareas y Etiquetas
 task_tags = db.Table('task_tags',
-    db.Column('task_id', db.Integer, db.ForeignKey('task.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True)
+    db.Column('task_id', db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True)
+)
+
+# Enlaces de las tareas archivadas (mismas columnas que task_tags, ver app/archive.py)
+archived_task_tags = db.Table('archived_task_tags',
+    db.Column('task_id', db.Integer, db.ForeignKey('archived_task.id', ondelete='CASCADE'),
+              primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True)
 )
 # --------------------
 
@@ -15,21 +22,34 @@ class User(db.Model):
     username = db.Column(db.String(80), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
+    # Cursor de cambios del usuario: se incrementa con cada escritura (ver app/sync.py)
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Versión de la lápida más reciente ya purgada: un cursor anterior necesita resincronizar
+    sync_pruned_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # --- MODIFICAR ESTO ---
-    # Relaciones: Un usuario tiene muchas tareas, etiquetas y sesiones
-    tasks = db.relationship('Task', backref='author', lazy=True, cascade="all, delete-orphan")
-    tags = db.relationship('Tag', backref='owner', lazy=True, cascade="all, delete-orphan")
-    pomodoro_sessions = db.relationship('PomodoroSession', backref='user', lazy=True, cascade="all, delete-orphan")
+    # Relaciones: Un usuario tiene muchas tareas, etiquetas y sesiones.
+    # passive_deletes: al borrar el usuario el ORM no carga sus filas; las borra
+    # la base con ON DELETE CASCADE (y app/accounts.py las purga antes por trozos)
+    tasks = db.relationship('Task', backref='author', lazy=True, cascade="all, delete-orphan",
+                            passive_deletes=True)
+    tags = db.relationship('Tag', backref='owner', lazy=True, cascade="all, delete-orphan",
+                           passive_deletes=True)
+    pomodoro_sessions = db.relationship('PomodoroSession', backref='user', lazy=True,
+                                        cascade="all, delete-orphan", passive_deletes=True)
     # -----------------------
 
     def set_password(self, password):
-        """Crea un hash de la contraseña."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Crea un hash de la contraseña (en el pool de bcrypt, ver app/passwords.py)."""
+        self.password_hash = password_hasher.generate_password_hash(password)
 
     def check_password(self, password):
         """Verifica el hash de la contraseña."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check_password_hash(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True si el hash usa menos rondas que BCRYPT_LOG_ROUNDS."""
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -38,6 +58,30 @@ class User(db.Model):
 
 class Task(db.Model):
     """Modelo de Tareas"""
+    # Índices compuestos para filtros y paginación por cursor de /tasks
+    __table_args__ = (
+        db.Index('ix_task_user_completed_due', 'user_id', 'completed', 'due_date'),
+        db.Index('ix_task_user_created', 'user_id', 'created_at'),
+        db.Index('ix_task_user_status', 'user_id', 'status'),
+        db.Index('ix_task_user_quadrant', 'user_id', 'eisenhower_quadrant'),
+        db.Index('ix_task_user_sync', 'user_id', 'sync_version'),
+        # Orden manual dentro de cada columna del Kanban y de la Matriz (ver app/ordering.py)
+        db.Index('ix_task_user_status_position', 'user_id', 'status', 'position'),
+        db.Index('ix_task_user_quadrant_position', 'user_id', 'eisenhower_quadrant', 'position'),
+        # Extremos y huecos del orden completo del usuario, compartido por los dos tableros
+        db.Index('ix_task_user_position', 'user_id', 'position'),
+        # Solo las series: la agenda las lee todas sin recorrer las tareas sueltas
+        db.Index('ix_task_user_recurring', 'user_id',
+                 sqlite_where=db.text('recurrence_rule IS NOT NULL'),
+                 postgresql_where=db.text('recurrence_rule IS NOT NULL')),
+        # El archivador busca las completadas más antiguas de todos los usuarios
+        db.Index('ix_task_completed_created', 'completed', 'created_at'),
+        # Vencimientos próximos de todos los usuarios, por ventanas (ver app/reminders.py)
+        db.Index('ix_task_due_completed', 'due_date', 'completed'),
+        # Ids nunca reutilizados: una tarea archivada puede volver con el suyo (ver app/archive.py)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -52,11 +96,26 @@ class Task(db.Model):
     eisenhower_quadrant = db.Column(db.String(30), nullable=True, default='ni_urgente_ni_importante') 
     
     # Foreign Key al Usuario
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+
+    # Versión del último cambio (sincronización incremental)
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Regla tipo RRULE (ver app/recurrence.py); due_date es el inicio de la serie
+    recurrence_rule = db.Column(db.String(200), nullable=True)
+
+    # Clave de orden fraccionaria en base 62 (ver app/ordering.py)
+    position = db.Column(db.String(255), nullable=True)
+
+    # Sacada del archivo: no se vuelve a archivar hasta pasado ARCHIVE_AFTER_DAYS
+    restored_at = db.Column(db.DateTime, nullable=True)
     
     # Relación Muchos-a-Muchos con Etiquetas [cite: 33]
-    tags = db.relationship('Tag', secondary=task_tags, lazy='subquery',
-                           backref=db.backref('tasks', lazy=True))
+    tags = db.relationship('Tag', secondary=task_tags, lazy='subquery', passive_deletes=True,
+                           backref=db.backref('tasks', lazy=True, passive_deletes=True))
+    # Ocurrencias completadas, canceladas o modificadas de una serie
+    occurrence_exceptions = db.relationship('OccurrenceException', backref='task', lazy=True,
+                                            cascade="all, delete-orphan", passive_deletes=True)
 
     def to_dict(self):
         """Convierte el objeto Tarea en un diccionario para la API."""
@@ -69,19 +128,87 @@ class Task(db.Model):
             "status": self.status,
             "eisenhower_quadrant": self.eisenhower_quadrant,
             "user_id": self.user_id,
+            "recurrence_rule": self.recurrence_rule,
+            "position": self.position,
             "tags": [tag.to_dict() for tag in self.tags]
         }
 
     def __repr__(self):
         return f'<Task {self.title}>'
 
+class ArchivedTask(db.Model):
+    """Tarea completada antigua, fuera de la tabla `task` (ver app/archive.py).
+
+    Conserva el id y las columnas de la tarea; `archived_at` es el momento
+    en que se movió.
+    """
+    __table_args__ = (
+        # Listado paginado de /tasks/archive
+        db.Index('ix_archived_task_user_archived', 'user_id', 'archived_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(150), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    due_date = db.Column(db.DateTime, nullable=True)
+    completed = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    eisenhower_quadrant = db.Column(db.String(30), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    recurrence_rule = db.Column(db.String(200), nullable=True)
+    position = db.Column(db.String(255), nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ArchivedTask {self.title}>'
+
+class OccurrenceException(db.Model):
+    """Excepción de una ocurrencia de una tarea recurrente (las demás no se guardan)."""
+    __table_args__ = (
+        db.UniqueConstraint('task_id', 'occurrence', name='uq_occurrence_exception_task_occurrence'),
+        db.Index('ix_occurrence_exception_user_occurrence', 'user_id', 'occurrence'),
+        # Ocurrencias movidas a otra fecha: la agenda las busca por su nueva fecha
+        db.Index('ix_occurrence_exception_user_due', 'user_id', 'due_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    # Inicio original de la ocurrencia según la regla
+    occurrence = db.Column(db.DateTime, nullable=False)
+    completed = db.Column(db.Boolean, nullable=False, default=False)
+    cancelled = db.Column(db.Boolean, nullable=False, default=False)
+    # Título o fecha propios de esta ocurrencia (None = los de la serie)
+    title = db.Column(db.String(150), nullable=True)
+    due_date = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "task_id": self.task_id,
+            "occurrence": self.occurrence.isoformat(),
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "title": self.title,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+        }
+
+    def __repr__(self):
+        return f'<OccurrenceException {self.task_id} {self.occurrence}>'
+
 class Tag(db.Model):
     """Modelo de Etiquetas"""
+    __table_args__ = (
+        db.Index('ix_tag_user_sync', 'user_id', 'sync_version'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     
     # Foreign Key al Usuario (para que cada usuario tenga sus propias etiquetas) [cite: 32]
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def to_dict(self):
         """Convierte el objeto Etiqueta en un diccionario."""
@@ -98,7 +225,91 @@ class PomodoroSession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     date_completed = db.Column(db.DateTime, default=datetime.utcnow)
     duration = db.Column(db.Integer, default=25) # Duración en minutos
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+
+    def __repr__(self):
+        return f'<PomodoroSession {self.date_completed}>'
+
+class PomodoroDailyStat(db.Model):
+    """Acumulado diario de sesiones Pomodoro, mantenido al registrar cada sesión."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+
+class PomodoroWeeklyStat(db.Model):
+    """Acumulado semanal (semana que empieza en lunes) de sesiones Pomodoro."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    week_start = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Integer, nullable=False, default=0)
+
+class ReminderOutbox(db.Model):
+    """Recordatorio de vencimiento pendiente de enviar (ver app/reminders.py)."""
+    __table_args__ = (
+        # Uno por tarea y vencimiento aunque lo disparen varios procesos
+        db.UniqueConstraint('task_id', 'due_date', name='uq_reminder_outbox_task_due'),
+        # Cola de envío: pendientes en orden de llegada
+        db.Index('ix_reminder_outbox_pending', 'delivered_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    title = db.Column(db.String(150), nullable=False)
+    due_date = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "task_id": self.task_id,
+            "user_id": self.user_id,
+            "title": self.title,
+            "due_date": self.due_date.isoformat(),
+            "created_at": self.created_at.isoformat(),
+            "delivered_at": self.delivered_at.isoformat() if self.delivered_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ReminderOutbox {self.task_id} {self.due_date}>'
+
+class RevokedToken(db.Model):
+    """JWT revocado antes de caducar (ver app/revocation.py)."""
+    __table_args__ = (
+        db.UniqueConstraint('jti', name='uq_revoked_token_jti'),
+        # Borrado periódico de los ya caducados
+        db.Index('ix_revoked_token_expires', 'expires_at'),
+        # Ids nunca reutilizados: cada proceso lee las revocaciones nuevas por id
+        {'sqlite_autoincrement': True},
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(64), nullable=False)
+    # Sin clave foránea: la revocación sobrevive a la baja de la cuenta
+    user_id = db.Column(db.Integer, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Caducidad del token (None = sin caducidad, no se borra nunca)
+    expires_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+class Tombstone(db.Model):
+    """Registro de borrado de una tarea o etiqueta, para la sincronización incremental."""
+    __table_args__ = (
+        db.Index('ix_tombstone_user_sync', 'user_id', 'sync_version'),
+        # La purga de SYNC_TOMBSTONE_RETENTION_DAYS busca las más antiguas de todos los usuarios
+        db.Index('ix_tombstone_deleted', 'deleted_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
+    entity_type = db.Column(db.String(10), nullable=False) # 'task' o 'tag'
+    entity_id = db.Column(db.Integer, nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
-        return f'<PomodoroSession {self.date_completed}>'
\ No newline at end of file
+        return f'<Tombstone {self.entity_type} {self.entity_id}>'
@@ -0,0 +1,278 @@
+# backend/app/ordering.py
+"""Orden manual de las tarjetas (Kanban y Matriz Eisenhower) con índices fraccionarios.
+
+`Task.position` es una cadena en base 62 (`0-9A-Za-z`, en orden ASCII) que se
+compara como texto. Para mover una tarjeta entre dos vecinas basta calcular
+una clave estrictamente entre las suyas (`key_between`) y escribir solo esa
+fila: el coste de un arrastre no depende del tamaño de la columna. Las claves
+nunca terminan en '0', así que siempre existe otra entre dos cualesquiera.
+
+La contrapartida es que las claves crecen al insertar muchas veces en el
+mismo hueco. Cuando una supera `POSITION_MAX_LENGTH` caracteres, el
+`PositionRebalancer` reparte de nuevo todas las claves del usuario con
+longitud mínima en un hilo en segundo plano (una transacción, versionando
+las tareas para /sync). `flask positions rebalance` hace lo mismo a mano.
+
+El orden es uno solo por usuario y lo comparten los dos tableros: cada uno
+lo filtra por su columna (estado o cuadrante). Por eso las claves son únicas
+entre todas las tareas del usuario, no solo dentro de una columna: una
+tarjeta nueva va detrás de la clave mayor del usuario (`last_position`) y un
+movimiento estrecha el hueco entre sus vecinas hasta la tarea contigua del
+orden completo (`key_in_gap`). Así ninguna columna de ningún tablero tiene
+dos claves iguales. Los índices `(user_id, status, position)` y
+`(user_id, eisenhower_quadrant, position)` sirven el listado de una columna;
+`(user_id, position)`, los extremos del orden completo.
+"""
+import logging
+import queue
+import threading
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select, update
+
+from app.sqlite import write_intent
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+_INDEX = {digit: i for i, digit in enumerate(DIGITS)}
+
+logger = logging.getLogger(__name__)
+
+
+class PositionError(ValueError):
+    """Claves de posición inválidas o desordenadas."""
+
+
+def _check(key):
+    if not key or key[-1] == '0' or any(digit not in _INDEX for digit in key):
+        raise PositionError(f'Clave de posición inválida: {key!r}')
+
+
+def is_valid_key(key):
+    """True si `key` es una clave de posición bien formada."""
+    if not isinstance(key, str):
+        return False
+    try:
+        _check(key)
+    except PositionError:
+        return False
+    return True
+
+
+def _midpoint(a, b):
+    # a < b como fracciones en base 62; b None = 1
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def key_after(a):
+    """Clave corta mayor que `a` (añadir al final crece un carácter cada ~30 veces)."""
+    if not a:
+        return DIGITS[BASE // 2]
+    if a[0] != DIGITS[-1]:
+        return DIGITS[_INDEX[a[0]] + 1]
+    return a[0] + key_after(a[1:])
+
+
+def key_before(b):
+    """Clave corta menor que `b`."""
+    if _INDEX[b[0]] > 1:
+        return DIGITS[_INDEX[b[0]] - 1]
+    if b[0] == DIGITS[1]:
+        return DIGITS[0] + DIGITS[BASE // 2]
+    return b[0] + key_before(b[1:])
+
+
+def key_between(a, b):
+    """Clave estrictamente entre `a` y `b` (None = sin vecina por ese lado)."""
+    for key in (a, b):
+        if key is not None:
+            _check(key)
+    if a is not None and b is not None and a >= b:
+        raise PositionError('Las vecinas están desordenadas')
+    if a is None and b is None:
+        return DIGITS[BASE // 2]
+    if b is None:
+        return key_after(a)
+    if a is None:
+        return key_before(b)
+    return _midpoint(a, b)
+
+
+def spread_keys(count):
+    """`count` claves crecientes, repartidas de forma uniforme y con la longitud mínima."""
+    width = 1
+    while BASE ** width < 2 * (count + 1):
+        width += 1
+    keys = []
+    for i in range(1, count + 1):
+        value = i * BASE ** width // (count + 1)
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        # Quitar los ceros finales conserva el orden y el invariante
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
+
+
+def last_position(session, model, user_id):
+    """Clave para añadir una tarjeta al final de su columna (y del orden del usuario)."""
+    current = session.execute(
+        select(func.max(model.position)).where(model.user_id == user_id)
+    ).scalar()
+    return key_after(current)
+
+
+def tail_keys(session, model, user_id, count):
+    """`count` claves crecientes para añadir varias tarjetas al final, en ese orden."""
+    keys = []
+    for _ in range(count):
+        keys.append(key_after(keys[-1]) if keys else last_position(session, model, user_id))
+    return keys
+
+
+def key_in_gap(session, model, user_id, after, before, exclude=None):
+    """Clave entre las vecinas `after` y `before` que no usa ninguna otra tarea del usuario.
+
+    Las vecinas son de una columna, pero entre ellas puede haber tarjetas de
+    otras columnas: el hueco se estrecha hasta la tarea contigua del orden
+    completo. `exclude` es la tarea que se mueve. Sin vecinas (columna vacía)
+    va al final del orden.
+    """
+    for key in (after, before):
+        if key is not None:
+            _check(key)
+    if after is not None and before is not None and after >= before:
+        raise PositionError('Las vecinas están desordenadas')
+    if after is None and before is None:
+        return last_position(session, model, user_id)
+    others = [model.user_id == user_id, model.id != exclude]
+    if after is not None:
+        nearest = session.execute(
+            select(func.min(model.position)).where(*others, model.position > after)
+        ).scalar()
+        if nearest is not None and (before is None or nearest < before):
+            before = nearest
+    else:
+        after = session.execute(
+            select(func.max(model.position)).where(*others, model.position < before)
+        ).scalar()
+    return key_between(after, before)
+
+
+def rebalance_user(session, model, user_id, next_version):
+    """Reasigna todas las posiciones de `user_id` conservando el orden. Devuelve la versión o None."""
+    rows = session.execute(
+        select(model.id, model.position).where(model.user_id == user_id)
+        .order_by(model.position.is_(None), model.position, model.id)
+    ).all()
+    changed = [{"id": task_id, "position": key}
+               for (task_id, old), key in zip(rows, spread_keys(len(rows))) if old != key]
+    if not changed:
+        return None
+    version = next_version(user_id, session)
+    session.execute(update(model), [dict(row, sync_version=version) for row in changed])
+    return version
+
+
+class PositionRebalancer:
+    """Extensión Flask con el hilo que compacta las claves largas (se arranca en el primer uso)."""
+
+    def __init__(self, app=None):
+        self.max_length = 24
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.rebalanced = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_length = app.config.get('POSITION_MAX_LENGTH', self.max_length)
+        self.app = app
+        app.extensions['position_rebalancer'] = self
+
+    def check(self, user_id, key):
+        """Programa la compactación de `user_id` si `key` es demasiado larga."""
+        if key is not None and len(key) > self.max_length:
+            self.schedule(user_id)
+
+    def schedule(self, user_id):
+        with self._lock:
+            if user_id in self._pending:
+                return
+            self._pending.add(user_id)
+            # Perezoso: tras un fork del servidor cada proceso arranca su propio hilo
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='position-rebalancer',
+                                                daemon=True)
+                self._thread.start()
+        self._queue.put(user_id)
+
+    def _run(self):
+        write_intent.set(True)
+        while True:
+            user_id = self._queue.get()
+            try:
+                with self.app.app_context():
+                    rebalance(user_id)
+                self.rebalanced += 1
+            except Exception:
+                logger.exception('No se pudieron compactar las posiciones del usuario %s', user_id)
+            finally:
+                with self._lock:
+                    self._pending.discard(user_id)
+
+
+def rebalance(user_id):
+    """Compacta las posiciones de `user_id` en la sesión de la app y avisa a sus clientes."""
+    from app import db
+    from app.events import event_hub
+    from app.models import Task
+    from app.sync import next_version
+
+    version = rebalance_user(db.session, Task, user_id, next_version)
+    db.session.commit()
+    if version is not None:
+        event_hub.publish(user_id, 'sync', cursor=version)
+    return version
+
+
+positions_cli = AppGroup('positions', help='Mantenimiento del orden manual de las tareas.')
+
+
+@positions_cli.command('rebalance')
+@click.option('--user', 'user_ids', type=int, multiple=True,
+              help='Usuario a compactar (se puede repetir). Por defecto, los que tengan claves largas.')
+@click.option('--max-length', type=int, default=None,
+              help='Longitud a partir de la cual se compacta (por defecto POSITION_MAX_LENGTH).')
+def rebalance_command(user_ids, max_length):
+    """Reparte de nuevo las posiciones de los usuarios con claves demasiado largas."""
+    from app import db
+    from app.models import Task
+
+    if not user_ids:
+        limit = max_length or current_app.config.get('POSITION_MAX_LENGTH', 24)
+        # También los que tengan tareas sin posición
+        user_ids = db.session.scalars(
+            select(Task.user_id).where((func.length(Task.position) > limit) | Task.position.is_(None))
+            .distinct()
+        ).all()
+    for user_id in user_ids:
+        version = rebalance(user_id)
+        click.echo(f'Usuario {user_id}: ' + ('compactado' if version else 'sin cambios'))
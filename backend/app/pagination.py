@@ -0,0 +1,194 @@
+# backend/app/pagination.py
+"""Utilidades de paginación por cursor (keyset) y filtros de tareas."""
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, false, literal
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class PaginationError(ValueError):
+    """Parámetro de paginación o filtro inválido."""
+
+
+def parse_datetime(value):
+    """Convierte una fecha ISO (con o sin 'Z' / zona horaria) en datetime sin zona.
+
+    Las fechas se guardan sin zona en UTC: una fecha con zona se pasa a UTC.
+    """
+    if not isinstance(value, str):
+        raise TypeError('La fecha debe ser un texto ISO 8601')
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def is_date_only(value):
+    """True si `value` es solo una fecha (YYYY-MM-DD), sin hora."""
+    return len(value.strip()) == 10
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict) and 'dt' in value:
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+
+def encode_cursor(values):
+    """Codifica los valores de la clave de orden de la última fila en un cursor opaco."""
+    raw = json.dumps([_dump_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decodifica un cursor generado por `encode_cursor`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_load_value(v) for v in values]
+    except (ValueError, TypeError):
+        raise PaginationError('Cursor inválido')
+
+
+def _is_after(column, descending, value):
+    """Condición "la fila va después de `value`" para una columna.
+
+    Los valores se envuelven en `literal` para poder comparar también
+    columnas booleanas (`completed`). SQLite ordena los NULL como el valor
+    más pequeño: primero en ASC y al final en DESC.
+    """
+    if descending:
+        if value is None:
+            return false()
+        return or_(column < literal(value), column.is_(None))
+    if value is None:
+        return column.isnot(None)
+    return column > literal(value)
+
+
+def _is_equal(column, value):
+    if value is None:
+        return column.is_(None)
+    return column == literal(value)
+
+
+def keyset_filter(order, values):
+    """Construye el predicado `(c1, c2, ...) > (v1, v2, ...)` para un orden mixto.
+
+    `order` es una lista de tuplas `(columna, descendente)` y `values` los
+    valores de la última fila de la página anterior, en el mismo orden.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order):
+        prefix = [_is_equal(c, v) for (c, _), v in zip(order[:i], values[:i])]
+        clauses.append(and_(*prefix, _is_after(column, descending, values[i])))
+    return or_(*clauses)
+
+
+def order_by_clauses(order):
+    return [column.desc() if descending else column.asc() for column, descending in order]
+
+
+def parse_page_size(value):
+    if value is None:
+        return None
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError('El parámetro limit debe ser un entero')
+    if size < 1:
+        raise PaginationError('El parámetro limit debe ser mayor que cero')
+    return min(size, MAX_PAGE_SIZE)
+
+
+def parse_bool(value):
+    lowered = value.strip().lower()
+    if lowered in ('1', 'true', 'si', 'sí', 'yes'):
+        return True
+    if lowered in ('0', 'false', 'no'):
+        return False
+    raise PaginationError('El parámetro completed debe ser true o false')
+
+
+def parse_task_filters(args):
+    """Valida los parámetros de filtro de /tasks y los devuelve ya convertidos."""
+    filters = {}
+    for key in ('status', 'eisenhower_quadrant'):
+        if args.get(key):
+            filters[key] = args[key]
+    if args.get('completed'):
+        filters['completed'] = parse_bool(args['completed'])
+    try:
+        if args.get('due_from'):
+            filters['due_from'] = parse_datetime(args['due_from'])
+        if args.get('due_to'):
+            due_to = parse_datetime(args['due_to'])
+            # Un día sin hora incluye todo ese día: cota exclusiva en el día siguiente
+            if is_date_only(args['due_to']):
+                filters['due_before'] = due_to + timedelta(days=1)
+            else:
+                filters['due_to'] = due_to
+    except ValueError:
+        raise PaginationError('Fecha de filtro inválida')
+    return filters
+
+
+def task_filters(model, args):
+    """Traduce los parámetros de consulta de /tasks en condiciones SQL."""
+    filters = parse_task_filters(args)
+    conditions = []
+    for key in ('status', 'eisenhower_quadrant', 'completed'):
+        if key in filters:
+            conditions.append(getattr(model, key) == filters[key])
+    if 'due_from' in filters:
+        conditions.append(model.due_date >= filters['due_from'])
+    if 'due_to' in filters:
+        conditions.append(model.due_date <= filters['due_to'])
+    if 'due_before' in filters:
+        conditions.append(model.due_date < filters['due_before'])
+    return conditions
+
+
+def page_params(args, order_size, default_size=None):
+    """Lee `limit` y `cursor`. Devuelve `(tamaño o None, valores del cursor o None)`."""
+    size = parse_page_size(args.get('limit'))
+    cursor = args.get('cursor')
+    if size is None and cursor:
+        size = DEFAULT_PAGE_SIZE
+    if size is None:
+        size = default_size
+    return size, decode_cursor(cursor, order_size) if cursor else None
+
+
+def paginate(query, order, args, default_size=None):
+    """Aplica orden, cursor y límite a `query`.
+
+    Devuelve `(filas, siguiente_cursor)`. Sin `limit` ni `cursor` en `args`
+    (y sin `default_size`) se devuelven todas las filas y el cursor es None.
+    """
+    size, cursor = page_params(args, len(order), default_size)
+    if cursor:
+        query = query.filter(keyset_filter(order, cursor))
+    query = query.order_by(*order_by_clauses(order))
+
+    if size is None:
+        return query.all(), None
+
+    rows = query.limit(size + 1).all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, column.key) for column, _ in order])
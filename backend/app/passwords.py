@@ -0,0 +1,139 @@
+# backend/app/passwords.py
+"""Hash y verificación de contraseñas bcrypt fuera del hilo de la petición.
+
+bcrypt es deliberadamente lento (~250 ms con 12 rondas). Ejecutarlo en el
+hilo del worker hace que una ráfaga de logins bloquee al resto de
+endpoints, así que el trabajo se envía a un `ProcessPoolExecutor` acotado:
+si ya hay `PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE` operaciones en
+curso se rechaza al instante con `PasswordHasherBusy` (HTTP 503).
+
+Genera y verifica hashes compatibles con Flask-Bcrypt (mismas opciones
+BCRYPT_LOG_ROUNDS, BCRYPT_HASH_PREFIX y BCRYPT_HANDLE_LONG_PASSWORDS).
+"""
+import atexit
+import hashlib
+import hmac
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+from flask import jsonify
+
+from app.metrics import record_timing
+
+
+class PasswordHasherBusy(Exception):
+    """El pool de hashing está saturado; el cliente debe reintentar."""
+
+
+# --- Funciones ejecutadas en los procesos del pool (deben ser picklables) ---
+
+def _prepare(password, handle_long_passwords):
+    password = password.encode('utf-8') if isinstance(password, str) else password
+    if handle_long_passwords:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def _generate(password, rounds, prefix, handle_long_passwords):
+    salt = bcrypt.gensalt(rounds=rounds, prefix=prefix.encode('utf-8'))
+    return bcrypt.hashpw(_prepare(password, handle_long_passwords), salt).decode('utf-8')
+
+
+def _verify(pw_hash, password, handle_long_passwords):
+    pw_hash = pw_hash.encode('utf-8')
+    candidate = bcrypt.hashpw(_prepare(password, handle_long_passwords), pw_hash)
+    return hmac.compare_digest(candidate, pw_hash)
+
+
+def hash_rounds(pw_hash):
+    """Factor de coste de un hash bcrypt ('$2b$12$...' -> 12)."""
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """Extensión Flask que ejecuta bcrypt en un pool de procesos acotado.
+
+    Con `PASSWORD_HASH_WORKERS = 0` el hashing se hace en el propio hilo
+    (útil en desarrollo y tests).
+    """
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prefix = app.config.get('BCRYPT_HASH_PREFIX', '2b')
+        self.handle_long_passwords = app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.queue_limit = app.config.get('PASSWORD_HASH_QUEUE', 32)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.retry_after = app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+        app.extensions['password_hasher'] = self
+        app.register_error_handler(PasswordHasherBusy, self._busy_response)
+
+    def _busy_response(self, error):
+        response = jsonify({"msg": "Servidor ocupado, inténtalo de nuevo"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+    def _get_pool(self):
+        # El pool se crea perezosamente en cada proceso (tras un posible fork del servidor)
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                    )
+                    atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        # El hueco se libera cuando termina el trabajo, no cuando deja de esperarse
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PasswordHasherBusy()
+
+    def _timed(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return self._run(fn, *args)
+        finally:
+            record_timing('bcrypt', time.perf_counter() - start)
+
+    def generate_password_hash(self, password):
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._timed(_generate, password, self.rounds, self.prefix, self.handle_long_passwords)
+
+    def check_password_hash(self, pw_hash, password):
+        if not pw_hash or not password:
+            return False
+        return self._timed(_verify, pw_hash, password, self.handle_long_passwords)
+
+    def needs_rehash(self, pw_hash):
+        """True si el hash se creó con un coste menor que el configurado."""
+        return hash_rounds(pw_hash) < self.rounds
@@ -0,0 +1,129 @@
+# backend/app/pomodoro.py
+"""Acumulados diarios y semanales de sesiones Pomodoro.
+
+Cada sesión registrada suma su duración a `pomodoro_daily_stat` y
+`pomodoro_weekly_stat` en la misma transacción, así las estadísticas leen
+una fila por día o semana del rango en lugar de todo el historial.
+`flask pomodoro rebuild-stats` reconstruye los acumulados desde la tabla
+de sesiones por lotes.
+"""
+from datetime import date, datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import select, delete
+
+from app import db
+from app.dialects import upsert_add
+from app.models import PomodoroSession, PomodoroDailyStat, PomodoroWeeklyStat
+
+GRANULARITIES = ('day', 'week')
+# Rango máximo de una consulta de estadísticas, en periodos
+MAX_PERIODS = 366
+
+pomodoro_cli = AppGroup('pomodoro', help='Mantenimiento de las métricas Pomodoro.')
+
+
+def week_start(day):
+    """Lunes de la semana de `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def add_to_rollups(session, user_id, day, sessions, minutes):
+    """Suma sesiones y minutos a los acumulados del día y de la semana."""
+    session.execute(upsert_add(session, PomodoroDailyStat.__table__,
+                               {"user_id": user_id, "day": day},
+                               sessions=sessions, minutes=minutes))
+    session.execute(upsert_add(session, PomodoroWeeklyStat.__table__,
+                               {"user_id": user_id, "week_start": week_start(day)},
+                               sessions=sessions, minutes=minutes))
+
+
+def record_session(session, user_id, duration):
+    """Inserta una sesión Pomodoro y actualiza sus acumulados en la misma transacción."""
+    completed = datetime.utcnow()
+    session.add(PomodoroSession(user_id=user_id, duration=duration, date_completed=completed))
+    add_to_rollups(session, user_id, completed.date(), 1, duration or 0)
+
+
+def stats(user_id, granularity, start, end):
+    """Serie densa `[{"period", "sessions", "minutes"}]` entre `start` y `end` (incluidos)."""
+    if granularity == 'week':
+        model, column, step = PomodoroWeeklyStat, PomodoroWeeklyStat.week_start, timedelta(weeks=1)
+        start, end = week_start(start), week_start(end)
+    else:
+        model, column, step = PomodoroDailyStat, PomodoroDailyStat.day, timedelta(days=1)
+
+    rows = db.session.execute(
+        select(column, model.sessions, model.minutes)
+        .where(model.user_id == user_id, column >= start, column <= end)
+    )
+    found = {period: (sessions, minutes) for period, sessions, minutes in rows}
+
+    series = []
+    period = start
+    while period <= end:
+        sessions, minutes = found.get(period, (0, 0))
+        series.append({"period": period.isoformat(), "sessions": sessions, "minutes": minutes})
+        period += step
+    return series
+
+
+def parse_range(args, granularity):
+    """Lee `from` y `to` (YYYY-MM-DD). Por defecto, los últimos 30 días o 12 semanas."""
+    end = date.fromisoformat(args['to']) if args.get('to') else datetime.utcnow().date()
+    if args.get('from'):
+        start = date.fromisoformat(args['from'])
+    else:
+        start = end - (timedelta(weeks=11) if granularity == 'week' else timedelta(days=29))
+    if start > end:
+        raise ValueError('from debe ser anterior a to')
+    periods = (end - start).days // (7 if granularity == 'week' else 1) + 1
+    if periods > MAX_PERIODS:
+        raise ValueError(f'El rango no puede superar {MAX_PERIODS} periodos')
+    return start, end
+
+
+@pomodoro_cli.command('rebuild-stats')
+@click.option('--batch-size', default=5000, show_default=True, help='Sesiones leídas por lote.')
+@click.option('--user-id', type=int, default=None, help='Reconstruir solo este usuario.')
+def rebuild_stats(batch_size, user_id):
+    """Reconstruye los acumulados diarios y semanales desde pomodoro_session."""
+    scope = [] if user_id is None else [PomodoroSession.user_id == user_id]
+    for model in (PomodoroDailyStat, PomodoroWeeklyStat):
+        stmt = delete(model)
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        db.session.execute(stmt)
+    # Se lee en la misma transacción que el borrado: las sesiones posteriores
+    # ya suman en vivo y no se vuelven a contar
+    max_id = db.session.scalar(select(db.func.max(PomodoroSession.id)).where(*scope)) or 0
+    db.session.commit()
+
+    last_id = 0
+    processed = 0
+    while last_id < max_id:
+        rows = db.session.execute(
+            select(PomodoroSession.id, PomodoroSession.user_id,
+                   PomodoroSession.date_completed, PomodoroSession.duration)
+            .where(PomodoroSession.id > last_id, PomodoroSession.id <= max_id, *scope)
+            .order_by(PomodoroSession.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+
+        totals = {}
+        for _, owner, completed, duration in rows:
+            day = (completed or datetime.utcnow()).date()
+            sessions, minutes = totals.get((owner, day), (0, 0))
+            totals[(owner, day)] = (sessions + 1, minutes + (duration or 0))
+        for (owner, day), (sessions, minutes) in totals.items():
+            add_to_rollups(db.session, owner, day, sessions, minutes)
+        db.session.commit()
+
+        last_id = rows[-1].id
+        processed += len(rows)
+        click.echo(f'{processed} sesiones procesadas')
+
+    click.echo('Acumulados Pomodoro reconstruidos.')
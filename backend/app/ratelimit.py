@@ -0,0 +1,269 @@
+# backend/app/ratelimit.py
+"""Límite de peticiones por usuario (token bucket) y descarte de carga.
+
+Un cliente que repite `GET /tasks` en bucle o que prueba contraseñas en
+`/login` (cada intento cuesta un bcrypt) puede ocupar un worker entero. Cada
+petición gasta un token del cubo de su clave: el id del usuario si está
+autenticado o la IP si no. Hay un presupuesto por tipo de endpoint
+(`RATE_LIMITS`, tokens por segundo y capacidad de ráfaga):
+
+- `read`: GET y demás métodos de lectura.
+- `write`: POST, PUT, PATCH y DELETE.
+- `auth`: login, registro y baja de cuenta (`RATE_LIMIT_AUTH_ENDPOINTS`),
+  siempre por IP.
+
+La IP es `request.remote_addr`. Detrás de un proxy inverso sería la del
+proxy para todos los clientes (y 5 intentos fallidos bloquearían el login
+de todos): con `PROXY_FIX_X_FOR` = número de proxies de confianza, la app
+la toma de `X-Forwarded-For` (`ProxyFix` de Werkzeug).
+
+Sin tokens la respuesta es 429 con `Retry-After` (segundos hasta que haya
+uno). Los cubos viven en memoria (`MemoryBackend`, un dict con LRU y O(1)
+por comprobación; cada proceso lleva su cuenta) o en un fichero SQLite
+compartido (`SQLiteBackend`, `RATE_LIMIT_STORAGE`) para que todos los
+workers de gunicorn vean el mismo saldo.
+
+Además `RATE_LIMIT_MAX_CONCURRENT` acota las peticiones en curso por
+proceso: por encima, 503 con `Retry-After` al instante, antes de que la
+cola del worker crezca y todas las peticiones se vuelvan lentas. Los flujos
+SSE no cuentan (duran lo que dure la conexión).
+
+No depende del estado del paquete `app` (lo usa también app.py).
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+
+READ, WRITE, AUTH = 'read', 'write', 'auth'
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+# (tokens por segundo, capacidad)
+DEFAULT_LIMITS = {READ: (10, 60), WRITE: (5, 30), AUTH: (0.2, 5)}
+AUTH_ENDPOINTS = ('auth.login', 'auth.register', 'accounts.delete_account', 'login', 'register')
+EXEMPT_ENDPOINTS = ('metrics', 'static')
+# Conexiones de larga duración: no ocupan hueco de concurrencia
+STREAMING_ENDPOINTS = ('sync.events', 'events')
+
+logger = logging.getLogger(__name__)
+
+
+def take(tokens, updated, now, rate, burst, cost=1):
+    """Un paso del token bucket. Devuelve `(tokens, espera)`; espera 0 = permitido."""
+    if tokens is None:
+        tokens = burst
+    else:
+        tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+class MemoryBackend:
+    """Cubos en un dict del proceso, con expulsión LRU por encima de `max_keys`."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, rate, burst, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (None, now))
+            tokens, wait = take(tokens, updated, now, rate, burst, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Cubos en un fichero SQLite compartido por todos los procesos.
+
+    Es un fichero aparte de la base de la app, para no competir por su
+    cerrojo de escritura. Cada comprobación es una transacción BEGIN
+    IMMEDIATE (lectura y escritura del cubo sin carreras entre procesos) en
+    WAL y sin fsync: perder el saldo en un apagón no importa.
+    """
+
+    # Cada cuántas comprobaciones se borran los cubos que ya estarían llenos
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, busy_timeout_ms=1000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._hits = 0
+        self._max_refill = 0.0
+
+    def _connection(self):
+        # Una conexión por hilo y por proceso (tras un fork no se reutiliza la del padre)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False,
+                                   timeout=self.busy_timeout_ms / 1000)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_bucket '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) '
+                         'WITHOUT ROWID')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def hit(self, key, rate, burst, cost=1):
+        # Reloj de pared: el monotónico no es comparable entre procesos
+        now = time.time()
+        conn = self._connection()
+        self._max_refill = max(self._max_refill, burst / rate)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_bucket WHERE key = ?', (key,)).fetchone()
+            tokens, wait = take(*(row or (None, now)), now, rate, burst, cost)
+            conn.execute('INSERT OR REPLACE INTO rate_bucket (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            self._hits += 1
+            if self._hits % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM rate_bucket WHERE updated < ?', (now - self._max_refill,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def reset(self):
+        self._connection().execute('DELETE FROM rate_bucket')
+
+
+class RateLimiter:
+    """Extensión Flask: token buckets por usuario y presupuesto, y límite de concurrencia.
+
+    Con `check_requests=True` (create_app) comprueba cada petición en un
+    `before_request`, identificando al usuario por su JWT si lo trae. app.py
+    pasa `False` y llama a `check_request` desde `login_required` y desde el
+    decorador `limit` en las rutas sin sesión.
+    """
+
+    def __init__(self, app=None, **kwargs):
+        self.enabled = False
+        self.backend = None
+        self._slots = None
+        self.limited = 0
+        self.shed = 0
+        if app is not None:
+            self.init_app(app, **kwargs)
+
+    def init_app(self, app, check_requests=True):
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.limits = {**DEFAULT_LIMITS, **app.config.get('RATE_LIMITS', {})}
+        self.auth_endpoints = frozenset(app.config.get('RATE_LIMIT_AUTH_ENDPOINTS', AUTH_ENDPOINTS))
+        self.exempt = frozenset(app.config.get('RATE_LIMIT_EXEMPT', EXEMPT_ENDPOINTS))
+        storage = app.config.get('RATE_LIMIT_STORAGE', 'memory')
+        if storage == 'memory':
+            self.backend = MemoryBackend(app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+        else:
+            self.backend = SQLiteBackend(storage)
+        max_concurrent = app.config.get('RATE_LIMIT_MAX_CONCURRENT', 0)
+        self.retry_after_busy = app.config.get('RATE_LIMIT_BUSY_RETRY_AFTER', 1)
+        app.extensions['rate_limiter'] = self
+
+        if max_concurrent:
+            # Antes que los cubos: descartar no debe costar ni decodificar el JWT
+            self._slots = threading.BoundedSemaphore(max_concurrent)
+            app.before_request(self._acquire_slot)
+            app.teardown_request(self._release_slot)
+        if self.enabled and check_requests:
+            app.before_request(self._before_request)
+
+    # --- Concurrencia ---
+
+    def _acquire_slot(self):
+        if request.endpoint in STREAMING_ENDPOINTS or request.endpoint in self.exempt:
+            return None
+        if not self._slots.acquire(blocking=False):
+            self.shed += 1
+            return self._error(503, "Servidor ocupado, inténtalo de nuevo", self.retry_after_busy)
+        g._rate_limit_slot = True
+        return None
+
+    def _release_slot(self, exc=None):
+        if g.pop('_rate_limit_slot', False):
+            self._slots.release()
+
+    # --- Token buckets ---
+
+    def budget(self):
+        """Presupuesto de la petición en curso."""
+        if request.endpoint in self.auth_endpoints:
+            return AUTH
+        return WRITE if request.method in WRITE_METHODS else READ
+
+    def check_request(self, user_id=None, budget=None):
+        """None si la petición cabe en su presupuesto; si no, la respuesta 429."""
+        if not self.enabled or request.method == 'OPTIONS' or request.endpoint in self.exempt:
+            return None
+        budget = budget or self.budget()
+        if budget == AUTH or user_id is None:
+            identity = f'ip:{request.remote_addr}'
+        else:
+            identity = f'user:{user_id}'
+        rate, burst = self.limits[budget]
+        try:
+            wait = self.backend.hit(f'{budget}:{identity}', rate, burst)
+        except sqlite3.Error:
+            # Sin almacén compartido no se bloquea a nadie: se deja pasar
+            logger.exception('No se pudo consultar el límite de peticiones')
+            return None
+        if not wait:
+            return None
+        self.limited += 1
+        return self._error(429, "Demasiadas peticiones, inténtalo más tarde", wait)
+
+    def limit(self, budget=None):
+        """Decorador para rutas que se limitan a mano (app.py)."""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                limited = self.check_request(g.get('user_id'), budget)
+                if limited is not None:
+                    return limited
+                return f(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _before_request(self):
+        # Sin decodificar el JWT de lo que no se limita
+        if request.method == 'OPTIONS' or request.endpoint in self.exempt:
+            return None
+        return self.check_request(_jwt_user_id())
+
+    def _error(self, status, msg, retry_after):
+        response = jsonify({"msg": msg})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def stats(self):
+        return {"limited": self.limited, "shed": self.shed}
+
+
+def _jwt_user_id():
+    """Usuario del JWT de la petición, o None si no trae uno válido (el endpoint decidirá)."""
+    if 'flask-jwt-extended' not in current_app.extensions:
+        return None
+    from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+    try:
+        if verify_jwt_in_request(optional=True, locations=['headers', 'query_string']) is None:
+            return None
+        return get_jwt_identity()
+    except Exception:
+        return None
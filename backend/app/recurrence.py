@@ -0,0 +1,345 @@
+# backend/app/recurrence.py
+"""Tareas recurrentes: regla tipo RRULE y expansión perezosa de ocurrencias.
+
+Una serie es una sola fila de `task` con `recurrence_rule` (subconjunto de
+RFC 5545: `FREQ=DAILY|WEEKLY|MONTHLY`, `INTERVAL`, `BYDAY` en semanales,
+`BYMONTHDAY` en mensuales, `UNTIL` y `COUNT`). Su `due_date` es el inicio
+de la serie (DTSTART). Las ocurrencias no se guardan: se calculan para la
+ventana que piden las vistas Hoy/Semana (`GET /tasks/agenda`) saltando
+directamente al inicio de la ventana, sin recorrer la serie desde el
+principio (salvo con COUNT, acotado por `MAX_COUNT`).
+
+Solo se persisten las excepciones (`OccurrenceException`): una ocurrencia
+completada, cancelada o con título o fecha propios. El almacenamiento es
+O(series + excepciones). La expansión de cada (tarea, ventana) se guarda en
+`occurrence_cache`; la clave incluye la regla y el inicio, así que editar
+la serie no deja entradas obsoletas.
+"""
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from app.models import OccurrenceException, Task
+from app.pagination import parse_datetime
+from app.serializers import serialize_task_rows, task_rows
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+MAX_INTERVAL = 366
+MAX_COUNT = 1000
+# Ventana máxima de /tasks/agenda y ocurrencias máximas por serie en ella
+MAX_WINDOW_DAYS = 92
+MAX_OCCURRENCES = 1000
+
+
+class RecurrenceError(ValueError):
+    """Regla de recurrencia o ventana inválida (se responde con 400)."""
+
+
+class Rule:
+    """Regla ya validada."""
+    __slots__ = ('freq', 'interval', 'byday', 'bymonthday', 'until', 'count')
+
+    def __init__(self, freq, interval=1, byday=(), bymonthday=(), until=None, count=None):
+        self.freq = freq
+        self.interval = interval
+        self.byday = byday
+        self.bymonthday = bymonthday
+        self.until = until
+        self.count = count
+
+    def __str__(self):
+        """Forma canónica, la que se guarda en `Task.recurrence_rule`."""
+        parts = [f'FREQ={self.freq}']
+        if self.interval != 1:
+            parts.append(f'INTERVAL={self.interval}')
+        if self.byday:
+            parts.append('BYDAY=' + ','.join(WEEKDAYS[day] for day in self.byday))
+        if self.bymonthday:
+            parts.append('BYMONTHDAY=' + ','.join(str(day) for day in self.bymonthday))
+        if self.until:
+            parts.append('UNTIL=' + self.until.strftime('%Y%m%dT%H%M%S'))
+        if self.count:
+            parts.append(f'COUNT={self.count}')
+        return ';'.join(parts)
+
+
+def _positive_int(name, value, maximum):
+    if not value.isdigit() or not 1 <= int(value) <= maximum:
+        raise RecurrenceError(f'{name} debe ser un entero entre 1 y {maximum}')
+    return int(value)
+
+
+def _parse_until(value):
+    for fmt in ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S', '%Y%m%d'):
+        try:
+            until = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        # Una fecha sin hora incluye todo ese día
+        return until + timedelta(days=1, microseconds=-1) if fmt == '%Y%m%d' else until
+    raise RecurrenceError('UNTIL debe tener el formato AAAAMMDD o AAAAMMDDTHHMMSS')
+
+
+def parse_rule(text):
+    """Valida una regla (`"FREQ=WEEKLY;BYDAY=MO,WE"`) y devuelve un `Rule`."""
+    if not isinstance(text, str) or not text.strip():
+        raise RecurrenceError('La regla de recurrencia está vacía')
+    text = text.strip()
+    if text.upper().startswith('RRULE:'):
+        text = text[6:]
+
+    fields = {}
+    for part in text.split(';'):
+        name, _, value = part.partition('=')
+        name, value = name.strip().upper(), value.strip().upper()
+        if not value or name in fields:
+            raise RecurrenceError(f'Parte inválida o repetida en la regla: {part!r}')
+        fields[name] = value
+
+    freq = fields.pop('FREQ', None)
+    if freq not in FREQUENCIES:
+        raise RecurrenceError('FREQ debe ser DAILY, WEEKLY o MONTHLY')
+    rule = Rule(freq)
+    if 'INTERVAL' in fields:
+        rule.interval = _positive_int('INTERVAL', fields.pop('INTERVAL'), MAX_INTERVAL)
+    if 'BYDAY' in fields:
+        if freq != 'WEEKLY':
+            raise RecurrenceError('BYDAY solo se admite con FREQ=WEEKLY')
+        days = fields.pop('BYDAY').split(',')
+        if any(day not in WEEKDAYS for day in days):
+            raise RecurrenceError('BYDAY admite MO, TU, WE, TH, FR, SA y SU')
+        rule.byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+    if 'BYMONTHDAY' in fields:
+        if freq != 'MONTHLY':
+            raise RecurrenceError('BYMONTHDAY solo se admite con FREQ=MONTHLY')
+        try:
+            days = {int(day) for day in fields.pop('BYMONTHDAY').split(',')}
+        except ValueError:
+            raise RecurrenceError('BYMONTHDAY debe ser una lista de días (1..31 o -31..-1)')
+        if any(day == 0 or not -31 <= day <= 31 for day in days):
+            raise RecurrenceError('BYMONTHDAY debe ser una lista de días (1..31 o -31..-1)')
+        rule.bymonthday = tuple(sorted(days))
+    if 'UNTIL' in fields:
+        rule.until = _parse_until(fields.pop('UNTIL'))
+    if 'COUNT' in fields:
+        rule.count = _positive_int('COUNT', fields.pop('COUNT'), MAX_COUNT)
+    if rule.until and rule.count:
+        raise RecurrenceError('UNTIL y COUNT no pueden usarse a la vez')
+    if fields:
+        raise RecurrenceError('Partes no admitidas en la regla: ' + ', '.join(sorted(fields)))
+    return rule
+
+
+def normalize_rule(text):
+    """Regla en forma canónica, o None si `text` está vacío (la tarea deja de repetirse)."""
+    if text is None or (isinstance(text, str) and not text.strip()):
+        return None
+    return str(parse_rule(text))
+
+
+def _daily(rule, dtstart, start, end):
+    step = timedelta(days=rule.interval)
+    k = 0
+    if start > dtstart:
+        # Primer periodo que no queda antes de la ventana
+        k = -(-(start - dtstart) // step)
+    current = dtstart + k * step
+    while current < end:
+        yield current
+        current += step
+
+
+def _weekly(rule, dtstart, start, end):
+    days = rule.byday or (dtstart.weekday(),)
+    week_zero = dtstart - timedelta(days=dtstart.weekday())
+    k = 0
+    if start > week_zero:
+        k = (start - week_zero).days // 7 // rule.interval
+    while True:
+        week = week_zero + timedelta(weeks=k * rule.interval)
+        if week >= end:
+            return
+        for day in days:
+            occurrence = week + timedelta(days=day)
+            if occurrence >= dtstart:
+                yield occurrence
+        k += 1
+
+
+def _monthly(rule, dtstart, start, end):
+    days = rule.bymonthday or (dtstart.day,)
+    k = 0
+    if start > dtstart:
+        months = (start.year - dtstart.year) * 12 + start.month - dtstart.month
+        k = max(0, months) // rule.interval
+    while True:
+        month_index = dtstart.month - 1 + k * rule.interval
+        year, month = dtstart.year + month_index // 12, month_index % 12 + 1
+        # Cada periodo se comprueba aunque no tenga ocurrencias (BYMONTHDAY=31 en febrero)
+        if datetime(year, month, 1) >= end:
+            return
+        last_day = calendar.monthrange(year, month)[1]
+        # Los días que el mes no tiene (31 en abril) se saltan, como en RFC 5545
+        resolved = sorted({day if day > 0 else last_day + day + 1
+                           for day in days if abs(day) <= last_day})
+        for day in resolved:
+            occurrence = dtstart.replace(year=year, month=month, day=day)
+            if occurrence >= dtstart:
+                yield occurrence
+        k += 1
+
+
+_GENERATORS = {'DAILY': _daily, 'WEEKLY': _weekly, 'MONTHLY': _monthly}
+
+
+def expand(rule, dtstart, start, end, limit=MAX_OCCURRENCES):
+    """Ocurrencias de la serie en `[start, end)`, como lista ordenada de datetimes."""
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    if rule.until and rule.until < start:
+        return []
+    # Con COUNT hay que contar desde el principio de la serie
+    candidates = _GENERATORS[rule.freq](rule, dtstart, dtstart if rule.count else start, end)
+    result = []
+    for index, occurrence in enumerate(candidates):
+        if occurrence >= end or (rule.until and occurrence > rule.until):
+            break
+        if rule.count and index >= rule.count:
+            break
+        if occurrence >= start:
+            result.append(occurrence)
+            if len(result) >= limit:
+                break
+    return result
+
+
+def is_occurrence(rule, dtstart, moment):
+    """True si `moment` es una de las ocurrencias de la serie."""
+    return expand(rule, dtstart, moment, moment + timedelta(seconds=1), limit=1) == [moment]
+
+
+def parse_window(args, now=None):
+    """Ventana `[start, end)` de `args` (`start`, `end`); por defecto, el día de hoy."""
+    now = now or datetime.utcnow()
+    try:
+        start = parse_datetime(args['start']) if args.get('start') else \
+            datetime(now.year, now.month, now.day)
+        end = parse_datetime(args['end']) if args.get('end') else start + timedelta(days=1)
+    except (TypeError, ValueError):
+        raise RecurrenceError('Fechas de la ventana inválidas')
+    if end <= start:
+        raise RecurrenceError('end debe ser posterior a start')
+    if end - start > timedelta(days=MAX_WINDOW_DAYS):
+        raise RecurrenceError(f'La ventana no puede superar {MAX_WINDOW_DAYS} días')
+    return start, end
+
+
+def agenda(user_id, start, end, cache=None):
+    """Tareas de `user_id` en `[start, end)`: las sueltas por vencimiento y las ocurrencias de sus series.
+
+    Cada ocurrencia lleva los campos de la serie con `occurrence` (inicio
+    original), y `due_date`, `title` y `completed` de su excepción si la hay.
+    Las canceladas no aparecen. Las tareas sueltas llevan `occurrence: None`.
+    """
+    cache = cache or occurrence_cache
+    one_off = task_rows(Task.query.filter(
+        Task.user_id == user_id, Task.recurrence_rule.is_(None),
+        Task.due_date >= start, Task.due_date < end,
+    )).all()
+    items = [dict(task, occurrence=None) for task in serialize_task_rows(one_off)]
+
+    series_rows = task_rows(Task.query.filter(
+        Task.user_id == user_id, Task.recurrence_rule.isnot(None), Task.due_date < end,
+    )).all()
+    if not series_rows:
+        return _by_due_date(items)
+    series = {row.id: (row, task) for row, task in zip(series_rows, serialize_task_rows(series_rows))}
+
+    # Excepciones de ocurrencias de la ventana y ocurrencias movidas a ella
+    exceptions = {}
+    moved_in = []
+    for exception in OccurrenceException.query.filter(
+        OccurrenceException.user_id == user_id,
+        or_(and_(OccurrenceException.occurrence >= start, OccurrenceException.occurrence < end),
+            and_(OccurrenceException.due_date >= start, OccurrenceException.due_date < end)),
+    ):
+        if exception.task_id not in series:
+            continue
+        exceptions[(exception.task_id, exception.occurrence)] = exception
+        if not start <= exception.occurrence < end:
+            moved_in.append(exception)
+
+    for task_id, (row, task) in series.items():
+        for occurrence in cache.get(task_id, row.recurrence_rule, row.due_date, start, end):
+            item = _occurrence_item(task, occurrence, exceptions.get((task_id, occurrence)), start, end)
+            if item:
+                items.append(item)
+    for exception in moved_in:
+        row, task = series[exception.task_id]
+        if is_occurrence(row.recurrence_rule, row.due_date, exception.occurrence):
+            item = _occurrence_item(task, exception.occurrence, exception, start, end)
+            if item:
+                items.append(item)
+    return _by_due_date(items)
+
+
+def _occurrence_item(task, occurrence, exception, start, end):
+    due_date = occurrence
+    if exception is not None:
+        if exception.cancelled:
+            return None
+        due_date = exception.due_date or occurrence
+        # Movida fuera de la ventana
+        if not start <= due_date < end:
+            return None
+    return dict(
+        task,
+        occurrence=occurrence.isoformat(),
+        due_date=due_date.isoformat(),
+        title=(exception.title if exception is not None and exception.title else task['title']),
+        completed=exception.completed if exception is not None else False,
+    )
+
+
+def _by_due_date(items):
+    return sorted(items, key=lambda item: (item['due_date'], item['id']))
+
+
+class OccurrenceCache:
+    """Caché LRU de expansiones por (tarea, regla, inicio, ventana)."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, task_id, rule, dtstart, start, end):
+        key = (task_id, rule, dtstart, start, end)
+        with self._lock:
+            occurrences = self._entries.get(key)
+            if occurrences is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return occurrences
+            self.misses += 1
+
+        occurrences = tuple(expand(rule, dtstart, start, end))
+        with self._lock:
+            self._entries[key] = occurrences
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return occurrences
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Caché del paquete `app`
+occurrence_cache = OccurrenceCache()
@@ -0,0 +1,392 @@
+# backend/app/reminders.py
+"""Recordatorios de vencimiento con un montículo de temporizadores.
+
+Un cron que recorriera cada minuto todas las tareas pendientes costaría
+O(tareas) por pasada. `ReminderScheduler` guarda en un montículo (heapq)
+solo las tareas que vencen pronto: cada pasada lee del índice
+`(due_date, completed)` el tramo de vencimientos que acaba de entrar en la
+ventana (`REMINDER_WINDOW` segundos por delante) desde donde se quedó la
+anterior, y saca del montículo lo que ya toca. Memoria y trabajo por
+pasada son proporcionales a lo que vence pronto, no al total de tareas.
+
+Crear, editar y borrar una tarea actualizan el montículo (`task_changed`,
+`task_deleted`; `reload_user` tras escrituras masivas). Las entradas viejas
+no se buscan en el montículo: se descartan al salir. Antes de enviar se
+releen de la base las tareas a recordar, así que un cambio hecho en otro
+proceso tampoco produce un recordatorio equivocado.
+
+Los recordatorios van a un sumidero intercambiable (`REMINDER_SINK`):
+`outbox` los guarda en la tabla `reminder_outbox` para que otro proceso los
+envíe (correo, push...), `log` solo los escribe en el log, y también vale
+la ruta de una clase propia con un método `deliver(reminders)`. Con varios
+workers cada uno tiene su montículo; `(task_id, due_date)` es único en el
+outbox y el recordatorio se guarda una sola vez.
+
+Las tareas recurrentes no tienen recordatorio: su `due_date` es el inicio
+de la serie, no el próximo vencimiento.
+
+Con `REMINDERS_ENABLED` un hilo de cada proceso hace una pasada cada
+`REMINDER_TICK` segundos como máximo (antes si algo vence antes).
+`flask reminders run` hace una sola pasada, para lanzarlo desde cron.
+"""
+import heapq
+import logging
+import threading
+from collections import deque, namedtuple
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import and_, not_, select, update
+from werkzeug.utils import import_string
+
+from app import db
+from app.dialects import insert_ignore
+from app.models import ReminderOutbox, Task
+from app.sqlite import write_intent
+
+# Máximo de ids por consulta IN al revalidar
+REVALIDATE_CHUNK = 500
+
+Reminder = namedtuple('Reminder', 'task_id user_id title due_date')
+
+logger = logging.getLogger(__name__)
+
+reminders_cli = AppGroup('reminders', help='Recordatorios de vencimiento de tareas.')
+
+
+def _naive_utc(value):
+    # Las fechas se guardan sin zona; una fecha con zona se pasa a UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# --- Sumideros ---
+
+class LogSink:
+    """Sumidero de prueba: escribe cada recordatorio en el log y guarda los últimos."""
+
+    def __init__(self, keep=100):
+        self.delivered = deque(maxlen=keep)
+
+    def deliver(self, reminders):
+        for reminder in reminders:
+            logger.info('Recordatorio: tarea %s del usuario %s vence %s',
+                        reminder.task_id, reminder.user_id, reminder.due_date.isoformat())
+            self.delivered.append(reminder)
+        return len(reminders)
+
+
+class OutboxSink:
+    """Guarda los recordatorios en `reminder_outbox` (uno por tarea y vencimiento)."""
+
+    def deliver(self, reminders):
+        created_at = datetime.utcnow()
+        rows = [{"task_id": r.task_id, "user_id": r.user_id, "title": r.title,
+                 "due_date": r.due_date, "created_at": created_at} for r in reminders]
+        token = write_intent.set(True)
+        try:
+            result = db.session.execute(insert_ignore(db.session, ReminderOutbox.__table__), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            write_intent.reset(token)
+        return result.rowcount
+
+
+SINKS = {'log': LogSink, 'outbox': OutboxSink}
+
+
+def pending_reminders(limit=100):
+    """Recordatorios del outbox aún sin enviar, del más antiguo al más reciente."""
+    return ReminderOutbox.query.filter(ReminderOutbox.delivered_at.is_(None)) \
+        .order_by(ReminderOutbox.id).limit(limit).all()
+
+
+def mark_delivered(ids):
+    """Marca como enviados los recordatorios `ids` del outbox."""
+    db.session.execute(
+        update(ReminderOutbox).where(ReminderOutbox.id.in_(ids))
+        .values(delivered_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+# --- Planificador ---
+
+class ReminderScheduler:
+    """Extensión Flask: montículo de vencimientos próximos y el hilo que los dispara.
+
+    El montículo guarda `(due_date, task_id)`; `_live` dice qué vencimiento
+    vale para cada tarea (una entrada que no coincide está obsoleta).
+    `_cursor` es la clave `(due_date, id)` de la última fila cargada: lo que
+    queda por encima lo leerá la carga de la ventana, así que los cambios de
+    tareas por encima del cursor no tocan el montículo. Lo que vence antes de
+    `_fired_until` ya se envió (o se dejó pasar) y no vuelve a entrar.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.window = timedelta(seconds=3600)
+        self.tick = 30
+        self.lead = timedelta(0)
+        self.grace = timedelta(seconds=300)
+        self.batch_size = 1000
+        self.max_entries = 100000
+        self.sink = None
+        self._heap = []
+        self._live = {}
+        self._cursor = None
+        self._fired_until = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.loaded = 0
+        self.fired = 0
+        self.stale = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('REMINDERS_ENABLED', self.enabled)
+        self.window = timedelta(seconds=app.config.get('REMINDER_WINDOW', 3600))
+        self.tick = app.config.get('REMINDER_TICK', self.tick)
+        self.lead = timedelta(seconds=app.config.get('REMINDER_LEAD', 0))
+        self.grace = timedelta(seconds=app.config.get('REMINDER_GRACE', 300))
+        self.batch_size = app.config.get('REMINDER_BATCH_SIZE', self.batch_size)
+        self.max_entries = app.config.get('REMINDER_MAX_ENTRIES', self.max_entries)
+        self.sink = self._make_sink(app.config.get('REMINDER_SINK', 'outbox'))
+        self.app = app
+        app.extensions['reminder_scheduler'] = self
+        if self.enabled:
+            app.before_request(self._ensure_started)
+
+    @staticmethod
+    def _make_sink(name):
+        sink = SINKS.get(name) or import_string(name)
+        return sink() if isinstance(sink, type) else sink
+
+    # --- Cambios de tareas (llamar tras el commit) ---
+
+    def task_changed(self, task):
+        """Actualiza el montículo tras crear o editar `task` (TaskRecord o Task)."""
+        if not self.enabled:
+            return
+        due_date = _naive_utc(task.due_date)
+        with self._lock:
+            if self._cursor is None:
+                return
+            self._live.pop(task.id, None)
+            if (due_date is None or task.completed or task.recurrence_rule
+                    or (due_date, task.id) > self._cursor or due_date <= self._fired_until):
+                return
+            self._push(task.id, task.user_id, due_date)
+
+    def task_deleted(self, task_id):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._live.pop(task_id, None)
+
+    def reload_user(self, user_id):
+        """Relee las tareas ya cargadas del usuario tras una escritura masiva (lote, importación)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._cursor is None:
+                return
+            for task_id in [task_id for task_id, (_, owner) in self._live.items() if owner == user_id]:
+                del self._live[task_id]
+            # Índice (user_id, completed, due_date): solo lo que vence dentro de lo cargado
+            rows = db.session.execute(
+                select(Task.id, Task.due_date)
+                .where(Task.user_id == user_id, Task.completed.is_(False),
+                       Task.due_date > self._fired_until, Task.due_date <= self._cursor[0],
+                       Task.recurrence_rule.is_(None))
+            ).all()
+            for task_id, due_date in rows:
+                if (due_date, task_id) <= self._cursor:
+                    self._push(task_id, user_id, due_date)
+
+    def _push(self, task_id, user_id, due_date):
+        # Con el cerrojo tomado
+        if not self._heap or due_date < self._heap[0][0]:
+            # Vence antes que lo que el hilo espera: que recalcule su espera
+            self._wakeup.set()
+        self._live[task_id] = (due_date, user_id)
+        heapq.heappush(self._heap, (due_date, task_id))
+        if len(self._heap) > 2 * len(self._live) + 1024:
+            # Demasiadas entradas obsoletas: se reconstruye con las vigentes
+            self._heap = [(due_date, task_id) for task_id, (due_date, _) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    # --- Pasadas ---
+
+    def run_once(self, now=None):
+        """Carga el tramo de ventana que falta y envía lo vencido. Devuelve los enviados."""
+        now = now or datetime.utcnow()
+        with self._lock:
+            if self._cursor is None:
+                # Al arrancar también se envía lo vencido hace menos de REMINDER_GRACE
+                self._fired_until = now + self.lead - self.grace
+                self._cursor = (self._fired_until, 0)
+        self._load(now)
+        due = self._pop_due(now)
+        if not due:
+            return 0
+        reminders = self._revalidate(due)
+        if reminders:
+            try:
+                self.sink.deliver(reminders)
+            except Exception:
+                # Vuelven al montículo y se reintentan en la siguiente pasada
+                with self._lock:
+                    for reminder in reminders:
+                        self._push(reminder.task_id, reminder.user_id, reminder.due_date)
+                raise
+        self.fired += len(reminders)
+        return len(reminders)
+
+    def _load(self, now):
+        """Lee del índice las tareas entre el cursor y el final de la ventana, por lotes."""
+        horizon = now + self.lead + self.window
+        while True:
+            # La consulta va con el cerrojo tomado: un cambio confirmado mientras tanto
+            # espera a que avance el cursor y decide con el cursor nuevo
+            with self._lock:
+                cursor_due, cursor_id = self._cursor
+                room = self.max_entries - len(self._live)
+                if cursor_due >= horizon or room <= 0:
+                    return
+                limit = min(self.batch_size, room)
+                rows = db.session.execute(
+                    select(Task.id, Task.user_id, Task.due_date)
+                    .where(Task.due_date >= cursor_due, Task.due_date < horizon,
+                           not_(and_(Task.due_date == cursor_due, Task.id <= cursor_id)),
+                           # IS NOT y no una igualdad: con `completed = 0` SQLite (sin ANALYZE)
+                           # elige (completed, created_at) y recorre todas las pendientes
+                           Task.completed.is_not(True), Task.recurrence_rule.is_(None))
+                    .order_by(Task.due_date, Task.id)
+                    .limit(limit)
+                ).all()
+                db.session.rollback()
+                for task_id, user_id, due_date in rows:
+                    self._push(task_id, user_id, due_date)
+                self.loaded += len(rows)
+                if len(rows) < limit:
+                    # Tramo completo: la siguiente carga empieza en el horizonte
+                    self._cursor = (horizon, 0)
+                    return
+                self._cursor = (rows[-1].due_date, rows[-1].id)
+
+    def _pop_due(self, now):
+        due = []
+        fire_until = now + self.lead
+        with self._lock:
+            while self._heap and self._heap[0][0] <= fire_until:
+                due_date, task_id = heapq.heappop(self._heap)
+                live = self._live.get(task_id)
+                if live is None or live[0] != due_date:
+                    self.stale += 1
+                    continue
+                del self._live[task_id]
+                due.append((task_id, due_date))
+            self._fired_until = max(self._fired_until, fire_until)
+        return due
+
+    def _revalidate(self, due):
+        """Recordatorios de `due` cuya tarea sigue pendiente y con el mismo vencimiento."""
+        expected = dict(due)
+        reminders = []
+        ids = list(expected)
+        for start in range(0, len(ids), REVALIDATE_CHUNK):
+            rows = db.session.execute(
+                select(Task.id, Task.user_id, Task.title, Task.due_date, Task.completed,
+                       Task.recurrence_rule)
+                .where(Task.id.in_(ids[start:start + REVALIDATE_CHUNK]))
+            ).all()
+            for row in rows:
+                # Ambos lados sin zona y en UTC, como los guardan las rutas
+                due_date = _naive_utc(row.due_date)
+                if due_date == expected[row.id] and not row.completed and not row.recurrence_rule:
+                    reminders.append(Reminder(row.id, row.user_id, row.title, due_date))
+        db.session.rollback()
+        self.stale += len(due) - len(reminders)
+        return sorted(reminders, key=lambda reminder: (reminder.due_date, reminder.task_id))
+
+    def next_due(self):
+        """Vencimiento vigente más próximo del montículo, o None."""
+        with self._lock:
+            while self._heap:
+                due_date, task_id = self._heap[0]
+                live = self._live.get(task_id)
+                if live is not None and live[0] == due_date:
+                    return due_date
+                heapq.heappop(self._heap)
+                self.stale += 1
+            return None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._live),
+                "heap": len(self._heap),
+                "loaded_until": self._cursor[0].isoformat() if self._cursor else None,
+                "loaded": self.loaded,
+                "fired": self.fired,
+                "stale": self.stale,
+            }
+
+    # --- Hilo ---
+
+    def _ensure_started(self):
+        # Perezoso: tras un fork del servidor cada proceso arranca su propio hilo
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='reminder-scheduler',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.run_once()
+            except Exception:
+                logger.exception('Fallo al enviar recordatorios de vencimiento')
+            # Lo añadido durante la pasada ya cuenta en _sleep_time; lo posterior despierta al hilo
+            self._wakeup.clear()
+            self._wakeup.wait(self._sleep_time())
+
+    def _sleep_time(self):
+        next_due = self.next_due()
+        if next_due is None:
+            return self.tick
+        seconds = (next_due - self.lead - datetime.utcnow()).total_seconds()
+        return min(self.tick, max(seconds, 0))
+
+
+# Instancia del paquete `app` (se inicializa en create_app)
+reminder_scheduler = ReminderScheduler()
+
+
+@reminders_cli.command('run')
+def run_command():
+    """Una pasada: envía al sumidero los recordatorios vencidos."""
+    sent = reminder_scheduler.run_once()
+    click.echo(f'{sent} recordatorios enviados')
+
+
+@reminders_cli.command('pending')
+@click.option('--limit', type=int, default=20, help='Máximo de recordatorios a mostrar.')
+def pending_command(limit):
+    """Lista los recordatorios del outbox aún sin enviar."""
+    for reminder in pending_reminders(limit):
+        click.echo(f'{reminder.id}\t{reminder.due_date.isoformat()}\t'
+                   f'usuario {reminder.user_id}\t{reminder.title}')
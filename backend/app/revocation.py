@@ -0,0 +1,289 @@
+# backend/app/revocation.py
+"""Revocación de JWT: lista de `jti` revocados en SQLite con un filtro de Bloom delante.
+
+Sin revocación, un token filtrado vale hasta que caduca, y cerrar sesión en
+el cliente solo lo borra de localStorage. `POST /logout` guarda el `jti`
+del token en `revoked_token`, y Flask-JWT-Extended pregunta por cada token
+a `token_in_blocklist_loader`. Consultar la tabla en cada petición añadiría
+una consulta a todas; el caso normal ("no está revocado") lo responde un
+filtro de Bloom en memoria sin E/S. Solo si el filtro dice "quizá" (un
+revocado o un falso positivo, `JWT_BLOCKLIST_ERROR_RATE`) se consulta la
+tabla por su clave única.
+
+Cada proceso tiene su filtro. Lo carga en la primera petición y un hilo:
+
+- cada `JWT_BLOCKLIST_REFRESH_INTERVAL` segundos añade las revocaciones
+  hechas por otros procesos (id mayor que el último visto; `revoked_token`
+  usa AUTOINCREMENT y no reutiliza ids), así que un token revocado en otro
+  worker deja de valer en unos segundos como mucho;
+- cada `JWT_BLOCKLIST_REBUILD_INTERVAL` segundos, o si se llena, borra de
+  la tabla los tokens ya caducados (el propio JWT los rechaza) y
+  reconstruye el filtro a la medida de los que quedan.
+
+Si el filtro no se puede cargar (p. ej. sin la migración de
+`revoked_token`), cada comprobación consulta la tabla directamente y la
+carga se reintenta pasados `JWT_BLOCKLIST_REFRESH_INTERVAL` segundos.
+`stop` para el hilo y descarta el filtro: lo llaman `init_app` (una app
+nueva no hereda el filtro de otra base), `after_fork` (app/server.py) y
+quien cierre la app antes de borrar su base (los benchmarks).
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.dialects import insert_ignore
+from app.models import RevokedToken
+from app.sqlite import write_intent
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre un bytearray: sin falsos negativos, falsos positivos ≈ `error_rate`."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _hashes(self, key):
+        # Doble hash (Kirsch-Mitzenmacher): las k posiciones salen de un solo blake2b
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, key):
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            # Casi todas las claves ausentes se descartan en la primera o segunda posición
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+def _expires_at(jwt_payload):
+    exp = jwt_payload.get('exp')
+    if exp is None:
+        return None
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+class TokenBlocklist:
+    """Extensión Flask: `token_in_blocklist_loader` respaldado por `revoked_token`."""
+
+    def __init__(self, app=None, jwt=None):
+        self.error_rate = 0.001
+        self.min_capacity = 10000
+        self.refresh_interval = 5
+        self.rebuild_interval = 3600
+        self._filter = None
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._retry_at = 0
+        self.checks = 0
+        self.lookups = 0
+        self.revoked_hits = 0
+        self.pruned = 0
+        if app is not None:
+            self.init_app(app, jwt)
+
+    def init_app(self, app, jwt):
+        self.error_rate = app.config.get('JWT_BLOCKLIST_ERROR_RATE', self.error_rate)
+        self.min_capacity = app.config.get('JWT_BLOCKLIST_MIN_CAPACITY', self.min_capacity)
+        self.refresh_interval = app.config.get('JWT_BLOCKLIST_REFRESH_INTERVAL', self.refresh_interval)
+        self.rebuild_interval = app.config.get('JWT_BLOCKLIST_REBUILD_INTERVAL', self.rebuild_interval)
+        # El filtro y el hilo de una app anterior son de otra base
+        self.stop()
+        self.app = app
+        app.extensions['token_blocklist'] = self
+        jwt.token_in_blocklist_loader(self._check_token)
+
+    # --- Comprobación (cada petición con JWT) ---
+
+    def _check_token(self, jwt_header, jwt_payload):
+        return self.is_revoked(jwt_payload['jti'])
+
+    def is_revoked(self, jti):
+        """True si el token `jti` está revocado. Sin E/S salvo que el filtro diga "quizá"."""
+        if self._thread is None or not self._thread.is_alive():
+            self._ensure_started()
+        self.checks += 1
+        bloom = self._filter
+        # Sin filtro (no se pudo cargar) se consulta siempre la tabla
+        if bloom is not None and jti not in bloom:
+            return False
+        self.lookups += 1
+        try:
+            revoked = db.session.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti)) is not None
+        except OperationalError as e:
+            # Sin la migración de revoked_token no puede haber nada revocado; otro error sí cuenta
+            if bloom is not None or 'no such table' not in str(e.orig):
+                raise
+            return False
+        if revoked:
+            self.revoked_hits += 1
+        return revoked
+
+    def revoke(self, jwt_payload):
+        """Revoca el token decodificado `jwt_payload` (p. ej. `get_jwt()`). Hace commit."""
+        jti = jwt_payload['jti']
+        token = write_intent.set(True)
+        try:
+            db.session.execute(
+                insert_ignore(db.session, RevokedToken.__table__).values(
+                    jti=jti, user_id=int(jwt_payload['sub']), revoked_at=datetime.utcnow(),
+                    expires_at=_expires_at(jwt_payload),
+                )
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            write_intent.reset(token)
+        # En este proceso vale ya; los demás lo verán en su siguiente refresco
+        if self._thread is None or not self._thread.is_alive():
+            self._ensure_started()
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    # --- Carga y mantenimiento ---
+
+    def _ensure_started(self):
+        # Perezoso: tras un fork del servidor cada proceso carga su filtro y arranca su hilo
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if time.monotonic() < self._retry_at:
+                return
+            try:
+                self._filter, self._last_id = self._build()
+            except Exception:
+                self._filter = None
+                self._retry_at = time.monotonic() + self.refresh_interval
+                logger.exception('No se pudo cargar la lista de tokens revocados; '
+                                 'se consulta revoked_token en cada petición')
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name='token-blocklist', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Para el hilo de refresco y descarta el filtro (el siguiente uso lo vuelve a cargar)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+            self._filter, self._last_id, self._retry_at = None, 0, 0
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _build(self):
+        """Filtro nuevo con los tokens revocados sin caducar. Devuelve `(filtro, último id)`."""
+        alive = or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at >= datetime.utcnow())
+        count = db.session.scalar(select(func.count()).where(alive))
+        # Holgura para las revocaciones hasta la próxima reconstrucción
+        bloom = BloomFilter(max(self.min_capacity, 2 * count), self.error_rate)
+        last_id = 0
+        for token_id, jti in db.session.execute(
+            select(RevokedToken.id, RevokedToken.jti).where(alive)
+            .execution_options(yield_per=10000)
+        ):
+            bloom.add(jti)
+            last_id = max(last_id, token_id)
+        return bloom, last_id
+
+    def refresh(self):
+        """Añade al filtro las revocaciones nuevas (de cualquier proceso). Devuelve cuántas."""
+        with self._lock:
+            if self._filter is None:
+                return 0
+            rows = db.session.execute(
+                select(RevokedToken.id, RevokedToken.jti).where(RevokedToken.id > self._last_id)
+                .order_by(RevokedToken.id)
+            ).all()
+            for token_id, jti in rows:
+                self._filter.add(jti)
+                self._last_id = token_id
+        return len(rows)
+
+    def prune(self):
+        """Borra de la tabla los tokens ya caducados. Devuelve cuántos."""
+        token = write_intent.set(True)
+        try:
+            result = db.session.execute(
+                delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            write_intent.reset(token)
+        self.pruned += result.rowcount
+        return result.rowcount
+
+    def rebuild(self):
+        """Sustituye el filtro por uno nuevo a la medida de la tabla."""
+        bloom, last_id = self._build()
+        with self._lock:
+            if self._filter is None:
+                # Parado mientras se construía
+                return
+            self._filter, self._last_id = bloom, last_id
+        # Lo revocado mientras se construía
+        self.refresh()
+
+    def stats(self):
+        bloom = self._filter
+        return {
+            "entries": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "bits": bloom.size if bloom else 0,
+            "checks": self.checks,
+            "lookups": self.lookups,
+            "false_positives": self.lookups - self.revoked_hits,
+            "pruned": self.pruned,
+        }
+
+    def _run(self, stop):
+        next_rebuild = time.monotonic() + self.rebuild_interval
+        while not stop.wait(self.refresh_interval):
+            bloom = self._filter
+            if bloom is None:
+                return
+            try:
+                with self.app.app_context():
+                    if time.monotonic() >= next_rebuild or bloom.count > bloom.capacity:
+                        self.prune()
+                        self.rebuild()
+                        next_rebuild = time.monotonic() + self.rebuild_interval
+                    else:
+                        self.refresh()
+            except Exception:
+                logger.exception('Fallo al actualizar la lista de tokens revocados')
+
+
+# Instancia del paquete `app` (se inicializa en create_app)
+token_blocklist = TokenBlocklist()
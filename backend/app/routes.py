@@ -1,53 +1,189 @@
 # backend/app/routes.py
 from flask import Blueprint, request, jsonify
-from app import db
-from app.models import Task, Tag, PomodoroSession
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db, writer, task_store, position_rebalancer
+from app.models import OccurrenceException, Task, Tag, task_tags
+from app.pagination import (PaginationError, encode_cursor, page_params, paginate,
+                            parse_datetime, parse_task_filters, task_filters)
+from app.serializers import serialize_tags, serialize_task_rows, task_rows
+from app.encoding import negotiated_response
+from app.batch import BatchError, apply_batch
+from app.dialects import insert_ignore
+from app.summary import summary_cache, summary_counts
+from app.pomodoro import GRANULARITIES, parse_range, record_session, stats
+from app.search import SearchError, parse_search_limit, search_query
+from app.recurrence import (RecurrenceError, agenda, is_occurrence, normalize_rule,
+                            occurrence_cache, parse_window)
+from app.events import event_hub
+from app.reminders import reminder_scheduler
+from app.task_store import TaskRecord
+from app.ordering import PositionError, key_in_gap, last_position
+from app.sync import (current_version, list_etag, mark_changed, mark_tasks_changed, not_modified,
+                      record_deletion, tag_deleted)
+from flask_jwt_extended import jwt_required
+from app.auth import current_user_id
+from sqlalchemy import select, delete, true
 from datetime import datetime
 
 # Nuevo Blueprint para las rutas principales (tareas, etiquetas, etc.)
 main_bp = Blueprint('main', __name__)
 
+# Orden de los listados de tareas: (columna, descendente). El id desempata
+# para que el cursor sea estable.
+TASK_ORDER = [(Task.created_at, True), (Task.id, True)]
+# `?order=position`: orden manual de los tableros (ver app/ordering.py)
+POSITION_ORDER = [(Task.position, False), (Task.id, False)]
+
 # --- RUTAS DE TAREAS (Tasks) --- [cite: 11, 63]
 
 @main_bp.route('/tasks', methods=['POST'])
 @jwt_required()
 def create_task():
     """Crea una nueva tarea."""
-    user_id = get_jwt_identity() # Obtiene el ID del usuario desde el token JWT
+    user_id = current_user_id() # Obtiene el ID del usuario desde el token JWT
     data = request.get_json()
 
     if not data.get('title'):
         return jsonify({"msg": "El título es requerido"}), 400
+    try:
+        recurrence_rule = normalize_rule(data.get('recurrence_rule'))
+    except RecurrenceError as e:
+        return jsonify({"msg": str(e)}), 400
+    if recurrence_rule and not data.get('due_date'):
+        return jsonify({"msg": "Las tareas recurrentes necesitan fecha de inicio (due_date)"}), 400
+    try:
+        due_date = parse_datetime(data['due_date']) if data.get('due_date') else None
+    except (TypeError, ValueError):
+        return jsonify({"msg": "Fecha inválida"}), 400
 
-    new_task = Task(
+    values = dict(
         title=data['title'],
         description=data.get('description'),
-        due_date=datetime.fromisoformat(data['due_date']) if data.get('due_date') else None,
+        due_date=due_date,
         eisenhower_quadrant=data.get('eisenhower_quadrant', 'ni_urgente_ni_importante'),
         status=data.get('status', 'pending'),
-        user_id=user_id
+        recurrence_rule=recurrence_rule,
     )
-    
-    db.session.add(new_task)
-    db.session.commit()
-    
-    return jsonify(new_task.to_dict()), 201
+    # La inserción pasa por la cola de escritura (commit agrupado si está activo)
+    version, record = writer.submit(_insert_task, user_id, values)
+    task_store.write_through(user_id, version, record=record)
+    summary_cache.invalidate(user_id)
+    reminder_scheduler.task_changed(record)
+    task = record.to_dict()
+    event_hub.publish(user_id, 'task.created', task, cursor=version)
+    return jsonify(task), 201
+
+def _insert_task(session, user_id, values):
+    new_task = Task(user_id=user_id, **values)
+    # Primero la escritura: leer antes obligaría a SQLite a promover el bloqueo
+    version = mark_changed(user_id, new_task, session=session)
+    # Al final de su columna (en los dos tableros)
+    new_task.position = last_position(session, Task, user_id)
+    session.add(new_task)
+    session.flush()
+    return version, TaskRecord.from_task(new_task)
 
 @main_bp.route('/tasks', methods=['GET'])
 @jwt_required()
 def get_tasks():
-    """Obtiene todas las tareas del usuario logueado."""
-    user_id = get_jwt_identity()
+    """Obtiene las tareas del usuario logueado.
+
+    Filtros opcionales: status, eisenhower_quadrant, completed, due_from, due_to.
+    Paginación por cursor con `limit` y `cursor`; el cursor de la siguiente
+    página se devuelve en la cabecera X-Next-Cursor. `order=position` ordena
+    por el orden manual de los tableros en lugar de por fecha de creación.
+    """
+    user_id = current_user_id()
+    version = current_version(user_id)
+    etag = list_etag(user_id, 'tasks', version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
     # Filtra tareas solo del usuario autenticado [cite: 14]
-    tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
-    return jsonify([task.to_dict() for task in tasks]), 200
+    order = request.args.get('order', 'created')
+    if order not in ('created', 'position'):
+        return jsonify({"msg": "El parámetro order debe ser created o position"}), 400
+    try:
+        if task_store.enabled and order == 'created':
+            payload, next_cursor = _tasks_from_store(user_id, version, request.args)
+        else:
+            query = Task.query.filter(Task.user_id == user_id, *task_filters(Task, request.args))
+            rows, next_cursor = paginate(task_rows(query),
+                                         POSITION_ORDER if order == 'position' else TASK_ORDER,
+                                         request.args)
+            payload = serialize_task_rows(rows)
+    except PaginationError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    response = negotiated_response(payload)
+    response.set_etag(etag)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def _tasks_from_store(user_id, version, args):
+    """Misma respuesta que la consulta SQL de get_tasks, servida desde el almacén en memoria."""
+    filters = parse_task_filters(args)
+    size, cursor = page_params(args, len(TASK_ORDER))
+    if cursor and not (isinstance(cursor[0], (datetime, type(None))) and isinstance(cursor[1], int)):
+        raise PaginationError('Cursor inválido')
+    entry = task_store.get(user_id, version, Task.query.filter(Task.user_id == user_id))
+    records, more = entry.query(filters, cursor, size)
+    next_cursor = encode_cursor([records[-1].created_at, records[-1].id]) if more else None
+    return [record.to_dict() for record in records], next_cursor
+
+@main_bp.route('/tasks/search', methods=['GET'])
+@jwt_required()
+def search_tasks():
+    """Busca tareas del usuario por título y descripción, ordenadas por relevancia.
+
+    `q`: palabras a buscar (todas, por prefijo). `limit`: máximo de resultados.
+    """
+    user_id = current_user_id()
+    try:
+        limit = parse_search_limit(request.args.get('limit'))
+        query = search_query(Task.query.filter(Task.user_id == user_id), request.args.get('q'), user_id)
+    except SearchError as e:
+        return jsonify({"msg": str(e)}), 400
+    rows = task_rows(query).limit(limit).all()
+    return negotiated_response(serialize_task_rows(rows))
+
+@main_bp.route('/tasks/cache', methods=['GET'])
+@jwt_required()
+def task_store_stats():
+    """Estadísticas del almacén de tareas en memoria (memoria usada y tasa de aciertos)."""
+    return jsonify({"enabled": task_store.enabled, **task_store.stats()}), 200
+
+@main_bp.route('/tasks/batch', methods=['POST'])
+@jwt_required()
+def batch_tasks():
+    """Aplica varias operaciones (create/update/delete) de tareas en una transacción.
+
+    Cuerpo: {"operations": [{"op": "create", "data": {...}},
+                            {"op": "update", "id": 1, "data": {...}},
+                            {"op": "delete", "id": 2}]}
+    Si alguna operación es inválida no se aplica ninguna.
+    """
+    user_id = current_user_id()
+    data = request.get_json()
+
+    try:
+        ok, results = apply_batch(user_id, (data or {}).get('operations'))
+    except BatchError as e:
+        return jsonify({"msg": str(e)}), 400
+    summary_cache.invalidate(user_id)
+
+    if not ok:
+        return jsonify({"msg": "El lote contiene operaciones inválidas", "results": results}), 400
+    reminder_scheduler.reload_user(user_id)
+    event_hub.publish(user_id, 'sync')
+    return jsonify({"results": results}), 200
 
 @main_bp.route('/tasks/<int:task_id>', methods=['PUT'])
 @jwt_required()
 def update_task(task_id):
     """Actualiza una tarea existente (editar, marcar completada, cambiar estado)."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     task = Task.query.get_or_404(task_id)
 
     # Verifica que la tarea pertenezca al usuario [cite: 59]
@@ -55,6 +191,19 @@ def update_task(task_id):
         return jsonify({"msg": "No autorizado"}), 403
 
     data = request.get_json()
+    try:
+        due_date = parse_datetime(data['due_date']) if data.get('due_date') else None
+    except (TypeError, ValueError):
+        return jsonify({"msg": "Fecha inválida"}), 400
+    series = (task.recurrence_rule, task.due_date)
+    recurrence_rule = task.recurrence_rule
+    if 'recurrence_rule' in data:
+        try:
+            recurrence_rule = normalize_rule(data['recurrence_rule'])
+        except RecurrenceError as e:
+            return jsonify({"msg": str(e)}), 400
+        if recurrence_rule and not (data.get('due_date') or task.due_date):
+            return jsonify({"msg": "Las tareas recurrentes necesitan fecha de inicio (due_date)"}), 400
     
     task.title = data.get('title', task.title)
     task.description = data.get('description', task.description)
@@ -62,42 +211,308 @@ def update_task(task_id):
     task.status = data.get('status', task.status)
     task.eisenhower_quadrant = data.get('eisenhower_quadrant', task.eisenhower_quadrant)
     
-    if data.get('due_date'):
-        task.due_date = datetime.fromisoformat(data['due_date'])
+    if due_date:
+        task.due_date = due_date
+    task.recurrence_rule = recurrence_rule
+    # Las excepciones de la serie dejan de valer si cambia su regla o su inicio
+    if series[0] and (task.recurrence_rule, task.due_date) != series:
+        OccurrenceException.query.filter_by(task_id=task.id).delete()
     
     # Manejo de asignación de etiquetas [cite: 33]
     if 'tags_ids' in data:
-        task.tags.clear()
-        for tag_id in data['tags_ids']:
-            tag = Tag.query.filter_by(id=tag_id, user_id=user_id).first()
-            if tag:
-                task.tags.append(tag)
+        tag_ids = [int(tag_id) for tag_id in data['tags_ids'] if tag_id]
+        task.tags = Tag.query.filter(Tag.id.in_(tag_ids), Tag.user_id == user_id).all() if tag_ids else []
     
+    version = mark_changed(user_id, task)
+    db.session.flush()
+    record = TaskRecord.from_task(task)
     db.session.commit()
-    return jsonify(task.to_dict()), 200
+    task_store.write_through(user_id, version, record=record)
+    summary_cache.invalidate(user_id)
+    reminder_scheduler.task_changed(record)
+    task = record.to_dict()
+    event_hub.publish(user_id, 'task.updated', task, cursor=version)
+    return jsonify(task), 200
 
-@main_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+@main_bp.route('/tasks/<int:task_id>/move', methods=['POST'])
 @jwt_required()
-def delete_task(task_id):
-    """Elimina una tarea."""
-    user_id = get_jwt_identity()
+def move_task(task_id):
+    """Mueve una tarjeta entre dos vecinas (arrastrar y soltar en Kanban o Matriz).
+
+    `after_id`: tarjeta que queda justo encima (null = principio de la columna).
+    `before_id`: tarjeta que queda justo debajo (null = final de la columna).
+    `status` / `eisenhower_quadrant`: columna de destino si cambia. Solo se
+    escribe la fila movida, con una posición entre las de sus vecinas.
+    """
+    user_id = current_user_id()
     task = Task.query.get_or_404(task_id)
+    if task.user_id != user_id:
+        return jsonify({"msg": "No autorizado"}), 403
+
+    data = request.get_json() or {}
+    for field in ('after_id', 'before_id'):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return jsonify({"msg": f"{field} debe ser un id de tarea"}), 400
+    for field in ('status', 'eisenhower_quadrant'):
+        if field in data and not (isinstance(data[field], str) and data[field]):
+            return jsonify({"msg": f"{field} debe ser un texto"}), 400
+    neighbour_ids = {data.get('after_id'), data.get('before_id')} - {None}
+    if task.id in neighbour_ids:
+        return jsonify({"msg": "Una tarea no puede ser vecina de sí misma"}), 400
+    neighbours = {}
+    if neighbour_ids:
+        neighbours = dict(db.session.execute(
+            select(Task.id, Task.position).where(Task.user_id == user_id, Task.id.in_(neighbour_ids))
+        ).all())
+        if set(neighbours) != neighbour_ids:
+            return jsonify({"msg": "Tarea vecina no encontrada"}), 404
+    try:
+        if None in neighbours.values():
+            raise PositionError('Vecina sin posición')
+        position = key_in_gap(db.session, Task, user_id, neighbours.get(data.get('after_id')),
+                              neighbours.get(data.get('before_id')), exclude=task.id)
+    except PositionError:
+        # Vecinas sin posición o desordenadas: el cliente tiene un orden antiguo
+        position_rebalancer.schedule(user_id)
+        return jsonify({"msg": "El orden ha cambiado, vuelve a cargar el tablero"}), 409
+
+    status_changed = False
+    for field in ('status', 'eisenhower_quadrant'):
+        if field in data and data[field] != getattr(task, field):
+            setattr(task, field, data[field])
+            status_changed = True
+    task.position = position
+    version = mark_changed(user_id, task)
+    db.session.flush()
+    record = TaskRecord.from_task(task)
+    db.session.commit()
+    task_store.write_through(user_id, version, record=record)
+    if status_changed:
+        summary_cache.invalidate(user_id)
+    position_rebalancer.check(user_id, position)
+    task = record.to_dict()
+    event_hub.publish(user_id, 'task.updated', task, cursor=version)
+    return jsonify(task), 200
+
+@main_bp.route('/tasks/agenda', methods=['GET'])
+@jwt_required()
+def get_agenda():
+    """Tareas de una ventana de fechas (vistas Hoy y Semana) con las series ya expandidas.
+
+    `start` y `end` (ISO, `end` excluido; por defecto, hoy). Las ocurrencias de
+    las tareas recurrentes traen `occurrence`, su inicio original, que es la
+    clave para completarlas o modificarlas en /tasks/<id>/occurrences/<occurrence>.
+    """
+    user_id = current_user_id()
+    try:
+        start, end = parse_window(request.args)
+    except RecurrenceError as e:
+        return jsonify({"msg": str(e)}), 400
+    return negotiated_response({"start": start.isoformat(), "end": end.isoformat(),
+                                "tasks": agenda(user_id, start, end)})
+
+@main_bp.route('/tasks/agenda/cache', methods=['GET'])
+@jwt_required()
+def agenda_cache_stats():
+    """Aciertos y fallos de la caché de expansiones de series."""
+    return jsonify(occurrence_cache.stats()), 200
+
+@main_bp.route('/tasks/<int:task_id>/occurrences/<occurrence>', methods=['PUT'])
+@jwt_required()
+def update_occurrence(task_id, occurrence):
+    """Completa, cancela o cambia el título o la fecha de una sola ocurrencia de una serie."""
+    user_id = current_user_id()
+    task, occurrence, error = _series_occurrence(user_id, task_id, occurrence)
+    if error:
+        return error
+    data = request.get_json() or {}
+    for field in ('completed', 'cancelled'):
+        if field in data and not isinstance(data[field], bool):
+            return jsonify({"msg": f"{field} debe ser true o false"}), 400
+    if data.get('title') is not None and not isinstance(data['title'], str):
+        return jsonify({"msg": "El título debe ser un texto"}), 400
+    due_date = None
+    if data.get('due_date'):
+        try:
+            due_date = parse_datetime(data['due_date'])
+        except (TypeError, ValueError):
+            return jsonify({"msg": "Fecha inválida"}), 400
+
+    exception = OccurrenceException.query.filter_by(task_id=task.id, occurrence=occurrence).first()
+    if exception is None:
+        exception = OccurrenceException(task_id=task.id, user_id=user_id, occurrence=occurrence,
+                                        completed=False, cancelled=False)
+        db.session.add(exception)
+    exception.completed = data.get('completed', exception.completed)
+    exception.cancelled = data.get('cancelled', exception.cancelled)
+    if 'title' in data:
+        exception.title = data['title'] or None
+    if 'due_date' in data:
+        exception.due_date = due_date
+    # La serie cambia de versión: /sync y el ETag de /tasks avisan a los clientes
+    version = _occurrence_changed(user_id, task)
+    payload = exception.to_dict()
+    event_hub.publish(user_id, 'task.occurrence', payload, cursor=version)
+    return jsonify(payload), 200
+
+@main_bp.route('/tasks/<int:task_id>/occurrences/<occurrence>', methods=['DELETE'])
+@jwt_required()
+def reset_occurrence(task_id, occurrence):
+    """Quita la excepción de una ocurrencia: vuelve a ser como el resto de la serie."""
+    user_id = current_user_id()
+    task, occurrence, error = _series_occurrence(user_id, task_id, occurrence)
+    if error:
+        return error
+    deleted = OccurrenceException.query.filter_by(task_id=task.id, occurrence=occurrence).delete()
+    if not deleted:
+        db.session.rollback()
+        return jsonify({"msg": "La ocurrencia no tiene cambios"}), 404
+    version = _occurrence_changed(user_id, task)
+    event_hub.publish(user_id, 'task.occurrence', {"task_id": task.id,
+                                                   "occurrence": occurrence.isoformat(),
+                                                   "reset": True}, cursor=version)
+    return jsonify({"msg": "Ocurrencia restablecida"}), 200
 
+def _occurrence_changed(user_id, task):
+    """Versiona la serie en la misma transacción que su excepción y hace commit."""
+    version = mark_changed(user_id, task)
+    db.session.flush()
+    record = TaskRecord.from_task(task)
+    db.session.commit()
+    task_store.write_through(user_id, version, record=record)
+    return version
+
+def _series_occurrence(user_id, task_id, occurrence):
+    """Valida la serie y la ocurrencia de la URL. Devuelve `(tarea, datetime, respuesta_error)`."""
+    task = Task.query.get_or_404(task_id)
     if task.user_id != user_id:
+        return None, None, (jsonify({"msg": "No autorizado"}), 403)
+    if not task.recurrence_rule or not task.due_date:
+        return None, None, (jsonify({"msg": "La tarea no es recurrente"}), 400)
+    try:
+        occurrence = parse_datetime(occurrence)
+    except ValueError:
+        return None, None, (jsonify({"msg": "Fecha de la ocurrencia inválida"}), 400)
+    if not is_occurrence(task.recurrence_rule, task.due_date, occurrence):
+        return None, None, (jsonify({"msg": "La fecha no es una ocurrencia de la serie"}), 404)
+    return task, occurrence, None
+
+@main_bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+@jwt_required()
+def delete_task(task_id):
+    """Elimina una tarea."""
+    user_id = current_user_id()
+    owner = db.session.scalar(select(Task.user_id).where(Task.id == task_id))
+    if owner is None:
+        return jsonify({"msg": "Tarea no encontrada"}), 404
+    if owner != user_id:
         return jsonify({"msg": "No autorizado"}), 403
     
-    db.session.delete(task)
+    version = record_deletion(user_id, 'task', task_id)
+    # Un solo DELETE: la base borra en cascada sus enlaces task_tags y excepciones
+    db.session.execute(delete(Task).where(Task.id == task_id))
     db.session.commit()
+    task_store.write_through(user_id, version, deleted_id=task_id)
+    summary_cache.invalidate(user_id)
+    reminder_scheduler.task_deleted(task_id)
+    event_hub.publish(user_id, 'task.deleted', {"id": task_id}, cursor=version)
     
     return jsonify({"msg": "Tarea eliminada"}), 200
 
+@main_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_summary():
+    """Conteos del tablero: por estado, por cuadrante, para hoy, vencidas y completadas."""
+    user_id = current_user_id()
+    summary, hit = summary_cache.get_or_compute(
+        user_id, lambda: summary_counts(db.session, Task, user_id), current_version(user_id)
+    )
+    response = jsonify(summary)
+    response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+@main_bp.route('/summary/cache', methods=['GET'])
+@jwt_required()
+def get_summary_cache_stats():
+    """Aciertos, fallos y entradas de la caché del resumen (de este proceso)."""
+    return jsonify(summary_cache.stats()), 200
+
 # --- RUTAS DE ETIQUETAS (Tags) --- [cite: 31, 63]
 
+# Máximo de ids por lado en la asignación masiva de etiquetas
+MAX_BULK_TAG_IDS = 2000
+
+def _bulk_tag_ids(user_id, data):
+    """Valida task_ids y tag_ids del cuerpo con una consulta de propiedad por lado.
+
+    Devuelve (task_ids, tag_ids, respuesta_de_error).
+    """
+    try:
+        task_ids = sorted({int(i) for i in data.get('task_ids') or []})
+        tag_ids = sorted({int(i) for i in data.get('tag_ids') or []})
+    except (TypeError, ValueError):
+        return None, None, (jsonify({"msg": "Los ids deben ser enteros"}), 400)
+
+    if not task_ids or not tag_ids:
+        return None, None, (jsonify({"msg": "task_ids y tag_ids son requeridos"}), 400)
+    if len(task_ids) > MAX_BULK_TAG_IDS or len(tag_ids) > MAX_BULK_TAG_IDS:
+        return None, None, (jsonify({"msg": f"Máximo {MAX_BULK_TAG_IDS} ids por lista"}), 400)
+
+    owned_tasks = db.session.scalar(
+        select(db.func.count()).where(Task.user_id == user_id, Task.id.in_(task_ids))
+    )
+    owned_tags = db.session.scalar(
+        select(db.func.count()).where(Tag.user_id == user_id, Tag.id.in_(tag_ids))
+    )
+    if owned_tasks != len(task_ids) or owned_tags != len(tag_ids):
+        return None, None, (jsonify({"msg": "Tarea o etiqueta no encontrada"}), 404)
+    return task_ids, tag_ids, None
+
+@main_bp.route('/tags/attach', methods=['POST'])
+@jwt_required()
+def attach_tags():
+    """Asigna un conjunto de etiquetas a un conjunto de tareas en una sola sentencia."""
+    user_id = current_user_id()
+    task_ids, tag_ids, error = _bulk_tag_ids(user_id, request.get_json() or {})
+    if error:
+        return error
+
+    # Producto cartesiano tareas x etiquetas; los pares ya existentes se ignoran
+    pairs = select(Task.id, Tag.id).select_from(Task).join(Tag, true()).where(
+        Task.user_id == user_id, Task.id.in_(task_ids),
+        Tag.user_id == user_id, Tag.id.in_(tag_ids),
+    )
+    result = db.session.execute(
+        insert_ignore(db.session, task_tags).from_select(['task_id', 'tag_id'], pairs)
+    )
+    version = mark_tasks_changed(user_id, task_ids)
+    db.session.commit()
+    event_hub.publish(user_id, 'sync', cursor=version)
+    return jsonify({"msg": "Etiquetas asignadas", "inserted": result.rowcount}), 200
+
+@main_bp.route('/tags/detach', methods=['POST'])
+@jwt_required()
+def detach_tags():
+    """Quita un conjunto de etiquetas de un conjunto de tareas en una sola sentencia."""
+    user_id = current_user_id()
+    task_ids, tag_ids, error = _bulk_tag_ids(user_id, request.get_json() or {})
+    if error:
+        return error
+
+    result = db.session.execute(
+        delete(task_tags).where(task_tags.c.task_id.in_(task_ids), task_tags.c.tag_id.in_(tag_ids))
+    )
+    version = mark_tasks_changed(user_id, task_ids)
+    db.session.commit()
+    event_hub.publish(user_id, 'sync', cursor=version)
+    return jsonify({"msg": "Etiquetas quitadas", "deleted": result.rowcount}), 200
+
 @main_bp.route('/tags', methods=['POST'])
 @jwt_required()
 def create_tag():
     """Crea una nueva etiqueta."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     data = request.get_json()
     
     if not data.get('name'):
@@ -108,30 +523,47 @@ def create_tag():
     if existing_tag:
         return jsonify({"msg": "La etiqueta ya existe"}), 409
     
-    new_tag = Tag(name=data['name'], user_id=user_id)
-    db.session.add(new_tag)
-    db.session.commit()
-    return jsonify(new_tag.to_dict()), 201
+    version, tag = writer.submit(_insert_tag, user_id, data['name'])
+    event_hub.publish(user_id, 'tag.created', tag, cursor=version)
+    return jsonify(tag), 201
+
+def _insert_tag(session, user_id, name):
+    new_tag = Tag(name=name, user_id=user_id)
+    version = mark_changed(user_id, new_tag, session=session)
+    session.add(new_tag)
+    session.flush()
+    return version, new_tag.to_dict()
 
 @main_bp.route('/tags', methods=['GET'])
 @jwt_required()
 def get_tags():
     """Obtiene todas las etiquetas del usuario."""
-    user_id = get_jwt_identity()
-    tags = Tag.query.filter_by(user_id=user_id).all()
-    return jsonify([tag.to_dict() for tag in tags]), 200
+    user_id = current_user_id()
+    etag = list_etag(user_id, 'tags')
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    response = negotiated_response(serialize_tags(user_id))
+    response.set_etag(etag)
+    return response
 
 @main_bp.route('/tags/<int:tag_id>', methods=['DELETE'])
 @jwt_required()
 def delete_tag(tag_id):
     """Elimina una etiqueta."""
-    user_id = get_jwt_identity()
-    tag = Tag.query.get_or_404(tag_id)
-    if tag.user_id != user_id:
+    user_id = current_user_id()
+    owner = db.session.scalar(select(Tag.user_id).where(Tag.id == tag_id))
+    if owner is None:
+        return jsonify({"msg": "Etiqueta no encontrada"}), 404
+    if owner != user_id:
         return jsonify({"msg": "No autorizado"}), 403
     
-    db.session.delete(tag)
+    # Antes del DELETE: versiona las tareas que la llevaban mientras existen sus enlaces
+    version = tag_deleted(user_id, tag_id)
+    db.session.execute(delete(Tag).where(Tag.id == tag_id))
     db.session.commit()
+    event_hub.publish(user_id, 'tag.deleted', {"id": tag_id}, cursor=version)
     return jsonify({"msg": "Etiqueta eliminada"}), 200
 
 # --- RUTAS DE MÉTRICAS (Pomodoro) --- [cite: 26, 53]
@@ -140,11 +572,30 @@ def delete_tag(tag_id):
 @jwt_required()
 def log_pomodoro_session():
     """Registra un ciclo Pomodoro completado."""
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
     data = request.get_json()
     duration = data.get('duration', 25) # Default 25 min [cite: 23]
     
-    session = PomodoroSession(user_id=user_id, duration=duration)
-    db.session.add(session)
-    db.session.commit()
-    return jsonify({"msg": "Sesión Pomodoro registrada"}), 201
\ No newline at end of file
+    # Inserta la sesión y actualiza los acumulados diario y semanal en la misma transacción
+    writer.submit(record_session, user_id, duration)
+    return jsonify({"msg": "Sesión Pomodoro registrada"}), 201
+
+@main_bp.route('/pomodoro-sessions/stats', methods=['GET'])
+@jwt_required()
+def pomodoro_stats():
+    """Sesiones y minutos por día o semana, leídos de los acumulados.
+
+    Parámetros: granularity=day|week, from=YYYY-MM-DD, to=YYYY-MM-DD.
+    """
+    user_id = current_user_id()
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return jsonify({"msg": "granularity debe ser day o week"}), 400
+
+    try:
+        start, end = parse_range(request.args, granularity)
+    except ValueError as e:
+        return jsonify({"msg": f"Rango de fechas inválido: {e}"}), 400
+
+    return jsonify({"granularity": granularity,
+                    "stats": stats(user_id, granularity, start, end)}), 200
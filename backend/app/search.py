@@ -0,0 +1,183 @@
+# backend/app/search.py
+"""Búsqueda de texto completo sobre título y descripción de las tareas.
+
+En SQLite se usa una tabla virtual FTS5 de contenido externo (`task_fts`)
+que apunta a `task`: el índice guarda solo los términos y los triggers
+`task_fts_ai/ad/au` lo mantienen al día con cada INSERT, DELETE o UPDATE.
+Las consultas buscan por prefijo cada palabra y se ordenan por BM25 (el
+título pesa más que la descripción). En otros motores se recurre a LIKE.
+
+El índice incluye también `user_id` como columna indexada (peso 0 en BM25)
+y cada MATCH exige `user_id : "<id>"`: FTS5 cruza las listas de términos
+con la del usuario dentro del propio índice, en vez de casar en las tareas
+de todos y descartar las ajenas después con el JOIN.
+
+`flask search rebuild` repuebla el índice por lotes. Mientras se ejecuta,
+las ediciones de tareas aún no indexadas pueden desajustar el índice de
+contenido externo: conviene lanzarlo con la aplicación parada o repetirlo.
+
+Ojo: SQLite borra los triggers al recrear `task`, así que las migraciones
+que la alteren con `batch_alter_table` deben volver a crearlos (`FTS_DDL`).
+"""
+import re
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import column, event, literal_column, select, or_, table, text
+
+from app import db
+from app.models import Task
+
+# Pesos BM25 de las columnas (title, description, user_id)
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+USER_WEIGHT = 0.0
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Palabras como máximo en una búsqueda
+MAX_TERMS = 16
+
+FTS_TABLE = 'task_fts'
+
+# Mismas sentencias que la migración b8d3f6a2c9e1 (para db.create_all)
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, user_id, content='task', content_rowid='id', prefix='2 3', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description, user_id) "
+    "VALUES (new.id, new.title, new.description, new.user_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description, user_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.user_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description, user_id ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description, user_id) "
+    "VALUES ('delete', old.id, old.title, old.description, old.user_id); "
+    "INSERT INTO task_fts(rowid, title, description, user_id) "
+    "VALUES (new.id, new.title, new.description, new.user_id); "
+    "END",
+]
+
+# Índice de la migración 9d3e5b7a1c02, sin user_id: el que recrean las
+# migraciones anteriores a b8d3f6a2c9e1 tras reconstruir task
+FTS_DDL_V1 = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id', prefix='2 3', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+    "END",
+]
+
+search_cli = AppGroup('search', help='Mantenimiento del índice de búsqueda de tareas.')
+
+
+class SearchError(ValueError):
+    """Parámetros de búsqueda inválidos (se responde con 400)."""
+
+
+def create_search_index(target, connection, **kw):
+    """Crea la tabla FTS5 y sus triggers; se engancha al `after_create` de `task`."""
+    if connection.dialect.name == 'sqlite':
+        for statement in FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+event.listen(Task.__table__, 'after_create', create_search_index)
+
+
+def search_terms(q):
+    """Palabras de la consulta del usuario (sin la sintaxis de FTS5)."""
+    terms = re.findall(r'\w+', q or '')
+    if not terms:
+        raise SearchError('El parámetro q es requerido')
+    if len(terms) > MAX_TERMS:
+        raise SearchError(f'La búsqueda admite como máximo {MAX_TERMS} palabras')
+    return terms
+
+
+def match_expression(terms, user_id):
+    """Expresión MATCH: las tareas de `user_id` con todas las palabras, cada una como prefijo."""
+    words = ' '.join(f'"{term}"*' for term in terms)
+    return f'user_id : "{int(user_id)}" AND {{title description}} : ({words})'
+
+
+def parse_search_limit(value):
+    if value is None or value == '':
+        return DEFAULT_SEARCH_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise SearchError('limit debe ser un entero')
+    if limit < 1:
+        raise SearchError('limit debe ser mayor que cero')
+    return min(limit, MAX_SEARCH_LIMIT)
+
+
+def search_query(query, q, user_id):
+    """Restringe `query` (sobre las tareas de `user_id`) a las que coinciden con `q`, por relevancia."""
+    terms = search_terms(q)
+    if db.session.get_bind().dialect.name != 'sqlite':
+        conditions = [or_(Task.title.ilike(f'%{term}%'), Task.description.ilike(f'%{term}%'))
+                      for term in terms]
+        return query.filter(*conditions).order_by(Task.created_at.desc(), Task.id.desc())
+
+    fts = table(FTS_TABLE, column('rowid'))
+    rank = literal_column(f'bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {USER_WEIGHT})')
+    matches = (
+        select(fts.c.rowid.label('task_id'), rank.label('rank'))
+        .where(text(f'{FTS_TABLE} MATCH :match')
+               .bindparams(match=match_expression(terms, user_id)))
+        .subquery('matches')
+    )
+    return (query.join(matches, matches.c.task_id == Task.id)
+            .order_by(matches.c.rank, Task.id.desc()))
+
+
+@search_cli.command('rebuild')
+@click.option('--batch-size', default=5000, show_default=True, help='Tareas indexadas por lote.')
+def rebuild_index(batch_size):
+    """Vacía y repuebla el índice FTS5 desde la tabla task."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('El índice FTS5 solo existe en SQLite.')
+        return
+    for statement in FTS_DDL:
+        db.session.execute(text(statement))
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"))
+    # Igual que en rebuild-stats: las tareas posteriores las indexan los triggers
+    max_id = db.session.scalar(select(db.func.max(Task.id))) or 0
+    db.session.commit()
+
+    last_id = 0
+    processed = 0
+    while last_id < max_id:
+        # Último id del lote: el rango (last_id, upper] se indexa con un INSERT ... SELECT
+        upper = db.session.scalar(
+            select(Task.id).where(Task.id > last_id)
+            .order_by(Task.id).offset(batch_size - 1).limit(1)
+        )
+        upper = min(upper or max_id, max_id)
+        result = db.session.execute(
+            text(f'INSERT INTO {FTS_TABLE}(rowid, title, description, user_id) '
+                 'SELECT id, title, description, user_id FROM task WHERE id > :low AND id <= :high'),
+            {"low": last_id, "high": upper},
+        )
+        db.session.commit()
+        last_id = upper
+        processed += result.rowcount
+        click.echo(f'{processed} tareas indexadas')
+
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+    click.echo('Índice de búsqueda reconstruido.')
@@ -0,0 +1,79 @@
+# backend/app/serializers.py
+"""Serialización masiva de tareas y etiquetas sin hidratar objetos ORM.
+
+Produce exactamente el mismo esquema que `Task.to_dict()` y `Tag.to_dict()`,
+pero con dos consultas de columnas (tareas y luego `task_tags JOIN tag`) y un
+solo recorrido para unir las etiquetas a cada tarea.
+"""
+from sqlalchemy import select
+
+from app import db
+from app.models import Task, Tag, task_tags
+
+# Límite de parámetros por IN para no superar SQLITE_MAX_VARIABLE_NUMBER
+IN_CHUNK_SIZE = 900
+
+TASK_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.due_date,
+    Task.completed,
+    Task.status,
+    Task.eisenhower_quadrant,
+    Task.user_id,
+    Task.created_at,
+    Task.recurrence_rule,
+    Task.position,
+)
+
+
+def task_rows(query):
+    """Reduce una consulta ORM de tareas a filas de columnas (sin identidades ORM)."""
+    return query.with_entities(*TASK_COLUMNS)
+
+
+def tags_by_task(task_ids, links=task_tags):
+    """Devuelve `{task_id: [{"id", "name"}, ...]}` para los ids dados.
+
+    `links` es la tabla de enlaces (`archived_task_tags` para las archivadas).
+    """
+    grouped = {}
+    for start in range(0, len(task_ids), IN_CHUNK_SIZE):
+        chunk = task_ids[start:start + IN_CHUNK_SIZE]
+        stmt = (
+            select(links.c.task_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == links.c.tag_id)
+            .where(links.c.task_id.in_(chunk))
+            .order_by(links.c.task_id, Tag.id)
+        )
+        for task_id, tag_id, name in db.session.execute(stmt):
+            grouped.setdefault(task_id, []).append({"id": tag_id, "name": name})
+    return grouped
+
+
+def serialize_task_rows(rows):
+    """Convierte filas de `task_rows` en dicts con el esquema de `Task.to_dict()`."""
+    tags = tags_by_task([row.id for row in rows])
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "description": row.description,
+            "due_date": row.due_date.isoformat() if row.due_date else None,
+            "completed": row.completed,
+            "status": row.status,
+            "eisenhower_quadrant": row.eisenhower_quadrant,
+            "user_id": row.user_id,
+            "recurrence_rule": row.recurrence_rule,
+            "position": row.position,
+            "tags": tags.get(row.id, []),
+        }
+        for row in rows
+    ]
+
+
+def serialize_tags(user_id):
+    """Etiquetas del usuario con el esquema de `Tag.to_dict()`."""
+    stmt = select(Tag.id, Tag.name).where(Tag.user_id == user_id)
+    return [{"id": tag_id, "name": name} for tag_id, name in db.session.execute(stmt)]
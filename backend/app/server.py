@@ -0,0 +1,41 @@
+# backend/app/server.py
+"""Estado por proceso para servir la app con varios workers (ver gunicorn.conf.py).
+
+Gunicorn importa la app una sola vez en el proceso maestro (`preload_app`) y
+después hace fork de los workers. Lo que se hereda del maestro y no debe
+compartirse se rehace en cada worker con `after_fork`:
+
+- Las conexiones del pool de SQLAlchemy: un descriptor de SQLite o un socket
+  usado a la vez desde dos procesos corrompe la sesión. `dispose(close=False)`
+  olvida las heredadas sin cerrarlas (son del padre) y el pool abre otras.
+- La época del hub de eventos: si todos los workers la heredasen, un
+  Last-Event-ID de un worker se daría por bueno en otro con otra secuencia.
+- El filtro de tokens revocados (app/revocation.py): el hilo que lo refresca
+  no sobrevive al fork, así que cada worker lo vuelve a cargar con el suyo.
+
+El hilo escritor (app/writer.py) y el pool de bcrypt (app/passwords.py) ya
+se crean perezosamente en cada proceso. El almacén de tareas, las métricas y
+el historial de eventos son por worker.
+
+`drain` se llama al recibir la orden de parada ordenada: cierra los flujos
+SSE abiertos (que no terminan nunca) para que el worker pueda acabar las
+peticiones en curso y salir antes de `graceful_timeout`; el navegador se
+reconecta a otro worker y recibe `resync`.
+"""
+from app import db
+from app.events import event_hub
+from app.revocation import token_blocklist
+
+
+def after_fork(app):
+    """Prepara el estado propio de un worker recién creado."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    event_hub.reset()
+    token_blocklist.stop()
+
+
+def drain():
+    """Corta las conexiones de larga duración antes de una parada ordenada."""
+    event_hub.close()
@@ -0,0 +1,79 @@
+# backend/app/sqlite.py
+"""Perfil de producción para SQLite: WAL, PRAGMAs ajustados y SAVEPOINTs reales.
+
+Se activa con `SQLITE_TUNED = True`. Con WAL los lectores nunca esperan al
+escritor y `synchronous=NORMAL` hace un fsync por checkpoint en lugar de
+uno por commit. `busy_timeout` evita los "database is locked" inmediatos
+cuando dos conexiones intentan escribir a la vez.
+
+Las peticiones que escriben (POST/PUT/PATCH/DELETE) y el hilo escritor abren
+la transacción con `BEGIN IMMEDIATE`. Con un `BEGIN` diferido, una
+transacción que lee y luego escribe falla con "database is locked" sin
+esperar a `busy_timeout` si otra conexión confirmó entre medias. Con varios
+procesos (gunicorn.conf.py) pasa a menudo. Login y registro siguen
+diferidos para no bloquear las escrituras mientras se calcula bcrypt
+(`SQLITE_DEFERRED_ENDPOINTS`).
+"""
+from contextvars import ContextVar
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+DEFERRED_ENDPOINTS = ('auth.login', 'auth.register', 'accounts.delete_account', 'login', 'register')
+
+# Activado por el hilo escritor (app/writer.py): todas sus transacciones escriben
+write_intent = ContextVar('sqlite_write_intent', default=False)
+
+
+def enforce_foreign_keys(engine):
+    """`PRAGMA foreign_keys=ON` en cada conexión SQLite (por defecto SQLite no las aplica).
+
+    Sin él los `ON DELETE CASCADE` de los modelos no se ejecutan y borrar un
+    usuario, una tarea o una etiqueta dejaría filas huérfanas.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+
+def configure_sqlite_engine(engine, config):
+    """Registra los eventos de conexión del perfil en `engine` (solo SQLite)."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = {
+        'journal_mode': 'WAL',
+        'synchronous': config.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        # Negativo = KiB: 64 MiB de caché de páginas por conexión
+        'cache_size': config.get('SQLITE_CACHE_SIZE', -64 * 1024),
+        'temp_store': 'MEMORY',
+    }
+    deferred = frozenset(config.get('SQLITE_DEFERRED_ENDPOINTS', DEFERRED_ENDPOINTS))
+
+    def wants_write_lock():
+        if write_intent.get():
+            return True
+        return (has_request_context() and request.method in WRITE_METHODS
+                and request.endpoint not in deferred)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # pysqlite abre las transacciones por su cuenta y rompe los SAVEPOINT;
+        # se desactiva y se emite BEGIN en el evento 'begin' (receta de SQLAlchemy)
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def do_begin(connection):
+        connection.exec_driver_sql('BEGIN IMMEDIATE' if wants_write_lock() else 'BEGIN')
@@ -0,0 +1,117 @@
+# backend/app/summary.py
+"""Resumen del tablero (conteos por estado, cuadrante, hoy y vencidas).
+
+Todos los conteos salen de una sola consulta GROUP BY con agregados
+condicionales y se guardan en una caché por usuario que invalidan los
+endpoints que escriben tareas. La caché es por proceso: cada entrada va
+ligada además al cursor de cambios del usuario (`User.sync_version`, el
+mismo de /sync y los ETag), así que una escritura en otro worker la deja
+sin valor en la siguiente petición. El `ttl` solo acota cuánto tarda en
+notarse que una tarea pasó a estar vencida.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, case, and_
+
+
+def summary_counts(session, model, user_id, now=None):
+    """Calcula el resumen de tareas de `user_id` sobre el modelo `model` (Task)."""
+    now = now or datetime.utcnow()
+    today = datetime(now.year, now.month, now.day)
+    tomorrow = today + timedelta(days=1)
+    done = func.coalesce(model.completed, False)
+
+    def count_if(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    rows = session.execute(
+        select(
+            model.status,
+            model.eisenhower_quadrant,
+            func.count(),
+            count_if(done == True),  # noqa: E712
+            count_if(and_(done == False, model.due_date >= today, model.due_date < tomorrow)),  # noqa: E712
+            count_if(and_(done == False, model.due_date < today)),  # noqa: E712
+        )
+        .where(model.user_id == user_id)
+        .group_by(model.status, model.eisenhower_quadrant)
+    )
+
+    summary = {"total": 0, "completed": 0, "pending": 0, "due_today": 0, "overdue": 0,
+               "by_status": {}, "by_quadrant": {}}
+    for status, quadrant, total, completed, due_today, overdue in rows:
+        summary["total"] += total
+        summary["completed"] += completed or 0
+        summary["due_today"] += due_today or 0
+        summary["overdue"] += overdue or 0
+        by_status = summary["by_status"]
+        by_status[status] = by_status.get(status, 0) + total
+        by_quadrant = summary["by_quadrant"]
+        quadrant = quadrant or 'sin_cuadrante'
+        by_quadrant[quadrant] = by_quadrant.get(quadrant, 0) + total
+    summary["pending"] = summary["total"] - summary["completed"]
+    return summary
+
+
+class SummaryCache:
+    """Caché en memoria del resumen por usuario, con contadores de aciertos y fallos."""
+
+    def __init__(self, ttl=30, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # user_id -> (clave, caduca, resumen, generación). La generación por
+        # usuario va en la propia entrada (un cálculo que se solapa con una
+        # escritura no se guarda) y `_evictions` cubre las que se expulsan
+        self._entries = {}
+        self._evictions = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, user_id, compute, version=None):
+        """Devuelve `(resumen, acierto)`; calcula con `compute()` si no hay entrada válida.
+
+        `version` es el cursor de cambios del usuario (`current_version`): lo
+        incrementa cualquier escritura en cualquier proceso, así que una
+        entrada de otra versión no vale aunque `invalidate` no llegara aquí.
+        """
+        # La fecha forma parte de la clave: "hoy" y "vencidas" cambian a medianoche
+        key = (datetime.utcnow().date(), version)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] == key and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[2], True
+            self.misses += 1
+            generation = self._generation(user_id)
+
+        value = compute()
+        with self._lock:
+            if self._generation(user_id) == generation:
+                self._store(user_id, (key, time.monotonic() + self.ttl, value, generation[0]))
+        return value, False
+
+    def invalidate(self, user_id):
+        with self._lock:
+            # Entrada vacía que solo conserva la generación siguiente
+            self._store(user_id, (None, 0, None, self._generation(user_id)[0] + 1))
+
+    def _generation(self, user_id):
+        entry = self._entries.get(user_id)
+        return (entry[3] if entry else 0), self._evictions
+
+    def _store(self, user_id, entry):
+        if len(self._entries) >= self.max_entries and user_id not in self._entries:
+            self._entries.pop(next(iter(self._entries)))
+            self._evictions += 1
+        self._entries[user_id] = entry
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Caché del paquete `app` (app.py crea la suya)
+summary_cache = SummaryCache()
@@ -0,0 +1,226 @@
+# backend/app/sync.py
+"""Sincronización incremental: cursor de cambios por usuario, lápidas y ETags.
+
+Cada escritura incrementa `User.sync_version` y guarda el nuevo valor en la
+fila modificada (`Task.sync_version` / `Tag.sync_version`) o en una lápida
+(`Tombstone`) si la fila se borró. Así `GET /sync?since=N` solo lee lo que
+cambió después de N, y las ETags de los listados se derivan del cursor sin
+consultar las tareas.
+
+Las lápidas se guardan `SYNC_TOMBSTONE_RETENTION_DAYS` días (`flask sync
+prune`, o el hilo del archivador con `ARCHIVE_INTERVAL` > 0). Al purgarlas
+se anota en `User.sync_pruned_version` la versión de la más reciente: un
+cliente cuyo cursor es anterior podría no enterarse de un borrado, así que
+/sync le devuelve el estado completo con `full: true`.
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+import click
+from flask import Blueprint, current_app, request, jsonify
+from flask.cli import AppGroup
+from flask_jwt_extended import jwt_required
+from app.auth import current_user_id
+from sqlalchemy import delete, func, select, update
+
+from app import db
+from app.models import User, Task, Tag, Tombstone, task_tags
+from app.sqlite import write_intent
+from app.encoding import etag_variants, negotiate, negotiated_response
+from app.serializers import serialize_task_rows, task_rows
+from app.events import event_hub, event_stream_response
+
+sync_bp = Blueprint('sync', __name__)
+sync_cli = AppGroup('sync', help='Mantenimiento de la sincronización incremental.')
+
+
+def next_version(user_id, session=None):
+    """Incrementa y devuelve el cursor de cambios del usuario.
+
+    El UPDATE bloquea la fila del usuario hasta el commit, de modo que dos
+    transacciones concurrentes no pueden confirmar versiones desordenadas.
+    `session` permite usarlo desde el hilo escritor (app/writer.py).
+    """
+    session = session or db.session
+    session.execute(
+        update(User).where(User.id == user_id).values(sync_version=User.sync_version + 1)
+    )
+    return session.execute(select(User.sync_version).where(User.id == user_id)).scalar_one()
+
+
+def current_version(user_id):
+    return db.session.execute(select(User.sync_version).where(User.id == user_id)).scalar() or 0
+
+
+def mark_changed(user_id, *objs, session=None):
+    """Marca tareas o etiquetas (nuevas o modificadas) con una nueva versión."""
+    version = next_version(user_id, session)
+    for obj in objs:
+        obj.sync_version = version
+    return version
+
+
+def mark_tasks_changed(user_id, task_ids, version=None):
+    """Versiona en bloque tareas cuyo contenido cambió sin cargarlas (p. ej. sus etiquetas).
+
+    `task_ids` puede ser una lista o un SELECT de ids.
+    """
+    if version is None:
+        version = next_version(user_id)
+    db.session.execute(
+        update(Task)
+        .where(Task.user_id == user_id, Task.id.in_(task_ids))
+        .values(sync_version=version)
+        .execution_options(synchronize_session=False)
+    )
+    return version
+
+
+def record_deletion(user_id, entity_type, *entity_ids, version=None):
+    """Escribe lápidas para filas borradas ('task' o 'tag')."""
+    if version is None:
+        version = next_version(user_id)
+    db.session.add_all([
+        Tombstone(user_id=user_id, entity_type=entity_type, entity_id=entity_id,
+                  sync_version=version)
+        for entity_id in entity_ids
+    ])
+    return version
+
+
+def prune_tombstones(days=None):
+    """Borra las lápidas de hace más de `days` días. Devuelve cuántas se borraron."""
+    if days is None:
+        days = current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    # Lee y después escribe: con BEGIN IMMEDIATE no hay que promover el cerrojo
+    token = write_intent.set(True)
+    try:
+        pruned = db.session.execute(
+            select(Tombstone.user_id, func.max(Tombstone.sync_version))
+            .where(Tombstone.deleted_at < cutoff)
+            .group_by(Tombstone.user_id)
+        ).all()
+        if pruned:
+            # Las versiones de un usuario crecen con el tiempo: la máxima purgada nunca baja
+            db.session.execute(update(User), [{"id": user_id, "sync_pruned_version": version}
+                                              for user_id, version in pruned])
+        count = db.session.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff)).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        write_intent.reset(token)
+    return count
+
+
+def tag_deleted(user_id, tag_id):
+    """Lápida de la etiqueta y nueva versión para las tareas que la tenían.
+
+    Debe llamarse antes de borrar la etiqueta, mientras existen sus filas en task_tags.
+    """
+    version = record_deletion(user_id, 'tag', tag_id)
+    linked = select(task_tags.c.task_id).where(task_tags.c.tag_id == tag_id)
+    return mark_tasks_changed(user_id, linked, version)
+
+
+def list_etag(user_id, scope, version=None):
+    """ETag fuerte de un listado: cursor del usuario + parámetros de la consulta."""
+    if version is None:
+        version = current_version(user_id)
+    # Cada representación negociada (Accept) tiene su propia ETag
+    key = f'{scope}:{user_id}:{version}:{negotiate()}:{request.query_string.decode()}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag):
+    """Respuesta 304 si el cliente ya tiene la versión `etag`, si no None."""
+    for variant in etag_variants(etag):
+        if request.if_none_match.contains(variant):
+            response = current_app.response_class(status=304)
+            response.set_etag(variant)
+            return response
+    return None
+
+
+def parse_since(value):
+    if value in (None, ''):
+        return 0
+    since = int(value)
+    if since < 0:
+        raise ValueError
+    return since
+
+
+@sync_bp.route('/sync', methods=['GET'])
+@jwt_required()
+def sync_changes():
+    """Devuelve las tareas y etiquetas creadas, modificadas o borradas desde `since`.
+
+    Sin `since` (o con 0) devuelve el estado completo. El campo `cursor` de
+    la respuesta es el valor a enviar como `since` en la siguiente llamada.
+    Con `full: true` la respuesta es el estado completo (sin `deleted`): el
+    cliente descarta lo que tenga, p. ej. porque `since` es anterior a las
+    lápidas que se conservan.
+    """
+    user_id = current_user_id()
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify({"msg": "El parámetro since debe ser un entero no negativo"}), 400
+
+    cursor, pruned = db.session.execute(
+        select(User.sync_version, User.sync_pruned_version).where(User.id == user_id)
+    ).one_or_none() or (0, 0)
+    if since >= cursor and since > 0:
+        return negotiated_response({"cursor": cursor, "full": False, "tasks": [], "tags": [],
+                                    "deleted": {"tasks": [], "tags": []}})
+    if since < pruned:
+        # Faltan lápidas posteriores a `since`: solo vale el estado completo
+        since = 0
+
+    task_query = Task.query.filter(Task.user_id == user_id)
+    tag_stmt = select(Tag.id, Tag.name).where(Tag.user_id == user_id)
+    deleted = {"tasks": [], "tags": []}
+    if since:
+        task_query = task_query.filter(Task.sync_version > since)
+        tag_stmt = tag_stmt.where(Tag.sync_version > since)
+        tombstones = db.session.execute(
+            select(Tombstone.entity_type, Tombstone.entity_id)
+            .where(Tombstone.user_id == user_id, Tombstone.sync_version > since)
+        )
+        for entity_type, entity_id in tombstones:
+            deleted[entity_type + 's'].append(entity_id)
+
+    return negotiated_response({
+        "cursor": cursor,
+        "full": not since,
+        "tasks": serialize_task_rows(task_rows(task_query).all()),
+        "tags": [{"id": tag_id, "name": name} for tag_id, name in db.session.execute(tag_stmt)],
+        "deleted": deleted,
+    })
+
+
+@sync_bp.route('/events', methods=['GET'])
+# EventSource no puede enviar cabeceras: se acepta también ?jwt=<token>
+@jwt_required(locations=['headers', 'query_string'])
+def events():
+    """Flujo SSE con los cambios de tareas y etiquetas del usuario (ver app/events.py)."""
+    return event_stream_response(event_hub, current_user_id(),
+                                 heartbeat=current_app.config.get('EVENTS_HEARTBEAT', 15))
+
+
+@sync_bp.route('/events/stats', methods=['GET'])
+@jwt_required()
+def events_stats():
+    """Conexiones abiertas y eventos publicados/descartados en este proceso."""
+    return jsonify(event_hub.stats()), 200
+
+
+@sync_cli.command('prune')
+@click.option('--older-than-days', type=int, default=None,
+              help='Antigüedad mínima en días (por defecto SYNC_TOMBSTONE_RETENTION_DAYS).')
+def prune_command(older_than_days):
+    """Borra las lápidas antiguas; los clientes con un cursor anterior resincronizan."""
+    click.echo(f'{prune_tombstones(older_than_days)} lápidas borradas')
@@ -0,0 +1,264 @@
+# backend/app/task_store.py
+"""Almacén en memoria, por usuario, de las tareas de los usuarios activos.
+
+Opcional (`TASK_STORE_ENABLED`). Cada usuario se carga de SQLite la primera
+vez que lee sus tareas y a partir de ahí `GET /tasks` se sirve desde
+memoria: registros compactos con `__slots__` e índices ordenados por
+fecha de creación y por fecha de vencimiento, más un índice por estado.
+
+Los endpoints de crear, editar y borrar escriben en la base y después en
+el almacén (write-through). Cada usuario guarda el `sync_version` con el
+que se cargó: si en la base es distinto (otro proceso escribió, o una
+escritura masiva sin write-through) la entrada se descarta y se recarga.
+Los usuarios menos usados recientemente se expulsan al superar
+`TASK_STORE_MAX_BYTES`.
+"""
+import sys
+import threading
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+# Clave para ordenar vencimientos NULL primero (como SQLite en ASC)
+_NO_DUE = datetime.min
+
+
+def _naive_utc(value):
+    # Los índices ordenan fechas sin zona (como la base); una con zona se
+    # pasa a UTC para que no rompa las comparaciones de `insort`
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class TaskRecord:
+    """Tarea compacta e inmutable en la práctica (se reemplaza al editarla)."""
+    __slots__ = ('id', 'title', 'description', 'due_date', 'completed', 'status',
+                 'eisenhower_quadrant', 'user_id', 'created_at', 'recurrence_rule', 'position',
+                 'tags', 'size')
+
+    def __init__(self, id, title, description, due_date, completed, status,
+                 eisenhower_quadrant, user_id, created_at, recurrence_rule, position, tags):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.due_date = _naive_utc(due_date)
+        self.completed = completed
+        self.status = status
+        self.eisenhower_quadrant = eisenhower_quadrant
+        self.user_id = user_id
+        self.created_at = _naive_utc(created_at)
+        self.recurrence_rule = recurrence_rule
+        self.position = position
+        self.tags = tags  # tupla de (id, nombre)
+        self.size = (sys.getsizeof(self) + sys.getsizeof(title) + sys.getsizeof(description)
+                     + sys.getsizeof(status) + sys.getsizeof(recurrence_rule)
+                     + sys.getsizeof(position) + sys.getsizeof(tags)
+                     + sum(sys.getsizeof(name) for _, name in tags))
+
+    @classmethod
+    def from_task(cls, task):
+        """Registro a partir de un objeto ORM `Task` (antes del commit)."""
+        return cls(task.id, task.title, task.description, task.due_date, task.completed,
+                   task.status, task.eisenhower_quadrant, task.user_id, task.created_at,
+                   task.recurrence_rule, task.position, tuple((tag.id, tag.name) for tag in task.tags))
+
+    def to_dict(self):
+        """Mismo esquema que `Task.to_dict()`."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "due_date": self.due_date.isoformat() if self.due_date else None,
+            "completed": self.completed,
+            "status": self.status,
+            "eisenhower_quadrant": self.eisenhower_quadrant,
+            "user_id": self.user_id,
+            "recurrence_rule": self.recurrence_rule,
+            "position": self.position,
+            "tags": [{"id": tag_id, "name": name} for tag_id, name in self.tags],
+        }
+
+
+def _created_key(record):
+    return (record.created_at or _NO_DUE, record.id)
+
+
+def _due_key(record):
+    return (record.due_date or _NO_DUE, record.id)
+
+
+class UserTasks:
+    """Tareas de un usuario con sus índices secundarios."""
+
+    def __init__(self, version):
+        self.version = version
+        self.records = {}
+        self.by_created = []  # [(created_at, id)] ascendente
+        self.by_due = []      # [(due_date, id)] ascendente, NULL primero
+        self.by_status = {}   # status -> set(ids)
+        self.size = sys.getsizeof(self)
+
+    def put(self, record):
+        self.remove(record.id)
+        self.records[record.id] = record
+        insort(self.by_created, _created_key(record))
+        insort(self.by_due, _due_key(record))
+        self.by_status.setdefault(record.status, set()).add(record.id)
+        self.size += record.size
+
+    def remove(self, task_id):
+        record = self.records.pop(task_id, None)
+        if record is None:
+            return
+        for index, key in ((self.by_created, _created_key(record)), (self.by_due, _due_key(record))):
+            del index[bisect_left(index, key)]
+        self.by_status[record.status].discard(task_id)
+        self.size -= record.size
+
+    def query(self, filters, cursor, limit):
+        """Replica `GET /tasks`: filtros, orden created_at DESC, id DESC y cursor.
+
+        `filters` viene de `parse_task_filters`. Devuelve `(registros, hay_más)`.
+        """
+        candidates = None
+        if filters.get('due_from') or filters.get('due_to') or filters.get('due_before'):
+            lo = bisect_left(self.by_due, (filters['due_from'], 0)) if filters.get('due_from') else 0
+            if filters.get('due_to'):
+                hi = bisect_right(self.by_due, (filters['due_to'], float('inf')))
+            elif filters.get('due_before'):
+                hi = bisect_left(self.by_due, (filters['due_before'], 0))
+            else:
+                hi = len(self.by_due)
+            candidates = {task_id for due, task_id in self.by_due[lo:hi] if due != _NO_DUE}
+        if filters.get('status') is not None:
+            ids = self.by_status.get(filters['status'], set())
+            candidates = ids if candidates is None else candidates & ids
+
+        end = len(self.by_created)
+        if cursor:
+            end = bisect_left(self.by_created, (cursor[0] or _NO_DUE, cursor[1]))
+
+        results = []
+        for i in range(end - 1, -1, -1):
+            task_id = self.by_created[i][1]
+            if candidates is not None and task_id not in candidates:
+                continue
+            record = self.records[task_id]
+            if ('eisenhower_quadrant' in filters
+                    and record.eisenhower_quadrant != filters['eisenhower_quadrant']):
+                continue
+            if 'completed' in filters and bool(record.completed) != filters['completed']:
+                continue
+            if limit is not None and len(results) == limit:
+                return results, True
+            results.append(record)
+        return results, False
+
+
+class TaskStore:
+    """Caché LRU de `UserTasks` con presupuesto de memoria y estadísticas."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_bytes = 64 * 1024 * 1024
+        self._users = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('TASK_STORE_ENABLED', False)
+        self.max_bytes = app.config.get('TASK_STORE_MAX_BYTES', self.max_bytes)
+        app.extensions['task_store'] = self
+
+    def get(self, user_id, version, query):
+        """`UserTasks` del usuario al día con `version`; lo carga con `query` si hace falta."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry.version == version:
+                self._users.move_to_end(user_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = UserTasks(version)
+        for row in load_records(query):
+            entry.put(row)
+
+        with self._lock:
+            self._replace(user_id, entry)
+            self._evict()
+        return entry
+
+    def write_through(self, user_id, version, record=None, deleted_id=None):
+        """Aplica una escritura ya confirmada con la nueva `version` del usuario.
+
+        Si el almacén no estaba justo en la versión anterior se descarta la
+        entrada: se perdió algún cambio y se recargará en la próxima lectura.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return
+            if entry.version != version - 1:
+                self._replace(user_id, None)
+                return
+            before = entry.size
+            if record is not None:
+                entry.put(record)
+            if deleted_id is not None:
+                entry.remove(deleted_id)
+            entry.version = version
+            self.bytes += entry.size - before
+            self._evict()
+
+    def invalidate(self, user_id):
+        """Descarta la entrada de `user_id` (p. ej. al borrar su cuenta)."""
+        with self._lock:
+            self._replace(user_id, None)
+
+    def _replace(self, user_id, entry):
+        old = self._users.pop(user_id, None)
+        if old is not None:
+            self.bytes -= old.size
+        if entry is not None:
+            self._users[user_id] = entry
+            self.bytes += entry.size
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and len(self._users) > 1:
+            user_id = next(iter(self._users))
+            self._replace(user_id, None)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._users),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def load_records(query):
+    """Carga las tareas de una consulta ORM como `TaskRecord` (columnas + etiquetas)."""
+    # Import diferido: app.serializers importa `db` del paquete
+    from app.serializers import serialize_task_rows, task_rows
+
+    rows = task_rows(query).all()
+    for row, data in zip(rows, serialize_task_rows(rows)):
+        yield TaskRecord(row.id, row.title, row.description, row.due_date, row.completed,
+                         row.status, row.eisenhower_quadrant, row.user_id, row.created_at,
+                         row.recurrence_rule, row.position, tuple((tag["id"], tag["name"]) for tag in data["tags"]))
@@ -0,0 +1,309 @@
+# backend/app/transfer.py
+"""Exportación e importación masiva de tareas (copias de seguridad y migraciones).
+
+`GET /export?format=ndjson|csv` recorre las tareas del usuario con
+`yield_per` y emite cada partición en cuanto se lee, así que la memoria no
+depende del número de tareas. Las etiquetas se exportan por nombre.
+
+`POST /import?format=ndjson|csv` lee la subida línea a línea (cuerpo crudo o
+campo `file` de un formulario multipart) y escribe en trozos de
+`IMPORT_CHUNK_SIZE` registros: INSERT masivo de tareas, etiquetas nuevas y
+enlaces `task_tags`, con un commit por trozo. Los registros inválidos se
+saltan y se devuelven en el informe (como mucho `IMPORT_MAX_ERRORS`).
+"""
+import csv
+import io
+
+from flask import Blueprint, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db, position_rebalancer
+from app.auth import current_user_id
+from app.encoding import dumps, loads
+from app.batch import task_values
+from app.events import event_hub
+from app.models import Task, Tag, task_tags
+from app.ordering import is_valid_key, tail_keys
+from app.reminders import reminder_scheduler
+from app.serializers import IN_CHUNK_SIZE, TASK_COLUMNS, tags_by_task
+from app.summary import summary_cache
+from app.sync import next_version
+
+transfer_bp = Blueprint('transfer', __name__)
+
+FORMATS = ('ndjson', 'csv')
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+CSV_FIELDS = ('id', 'title', 'description', 'due_date', 'completed', 'status',
+              'eisenhower_quadrant', 'recurrence_rule', 'position', 'created_at', 'tags')
+# Separador de etiquetas dentro de la celda `tags` del CSV
+CSV_TAG_SEPARATOR = '|'
+TAG_NAME_LENGTH = Tag.name.type.length
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class RecordError(ValueError):
+    """Registro de importación inválido."""
+
+
+def _export_record(row, tags):
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "due_date": row.due_date.isoformat() if row.due_date else None,
+        "completed": row.completed,
+        "status": row.status,
+        "eisenhower_quadrant": row.eisenhower_quadrant,
+        "recurrence_rule": row.recurrence_rule,
+        "position": row.position,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "tags": [tag["name"] for tag in tags.get(row.id, ())],
+    }
+
+
+def _ndjson_chunk(records):
+    return b''.join(dumps(record) + b'\n' for record in records)
+
+
+def _csv_chunk(records, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_FIELDS)
+    for record in records:
+        record = dict(record, tags=CSV_TAG_SEPARATOR.join(record['tags']))
+        writer.writerow(['' if record[field] is None else record[field] for field in CSV_FIELDS])
+    return buffer.getvalue().encode('utf-8')
+
+
+@transfer_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_tasks():
+    """Descarga todas las tareas del usuario en NDJSON (por defecto) o CSV, en streaming."""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({"msg": "El parámetro format debe ser ndjson o csv"}), 400
+    user_id = current_user_id()
+    chunk_size = current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    stmt = (
+        select(*TASK_COLUMNS).where(Task.user_id == user_id).order_by(Task.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    def generate():
+        if fmt == 'csv':
+            yield _csv_chunk((), header=True)
+        for rows in db.session.execute(stmt).partitions():
+            tags = tags_by_task([row.id for row in rows])
+            records = [_export_record(row, tags) for row in rows]
+            yield _ndjson_chunk(records) if fmt == 'ndjson' else _csv_chunk(records)
+
+    response = current_app.response_class(stream_with_context(generate()), mimetype=MIMETYPES[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=tareas.{fmt}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _upload():
+    """Devuelve `(stream binario, formato)` de la subida, sin leerla."""
+    fmt = request.args.get('format')
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            return None, fmt
+        if fmt is None and (upload.filename or '').lower().endswith('.csv'):
+            fmt = 'csv'
+        return upload.stream, fmt or 'ndjson'
+    if fmt is None and request.mimetype == 'text/csv':
+        fmt = 'csv'
+    # El flujo WSGI no tiene búfer: leer línea a línea sin él lee byte a byte
+    return io.BufferedReader(request.stream, READ_BUFFER_SIZE), fmt or 'ndjson'
+
+
+def _ndjson_records(stream):
+    """Genera `(línea, dict o RecordError)` de un flujo NDJSON."""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = loads(line)
+        except ValueError:
+            yield number, RecordError("JSON inválido")
+            continue
+        if not isinstance(data, dict):
+            yield number, RecordError("Cada línea debe ser un objeto JSON")
+            continue
+        yield number, data
+
+
+def _csv_records(stream):
+    """Genera `(línea, dict)` de un flujo CSV con cabecera (celdas vacías = sin valor)."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    for row in reader:
+        data = {key: value for key, value in row.items() if key and value not in (None, '')}
+        if 'completed' in data:
+            data['completed'] = data['completed'].strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+        if 'tags' in data:
+            data['tags'] = data['tags'].split(CSV_TAG_SEPARATOR)
+        yield reader.line_num, data
+
+
+def _parse_record(data):
+    """Valida un registro importado. Devuelve `(valores, nombres de etiquetas, posición)`."""
+    values, error = task_values(data, creating=True)
+    if error:
+        raise RecordError(error)
+    tags = data.get('tags') or []
+    if not isinstance(tags, list):
+        raise RecordError("tags debe ser una lista")
+    names = []
+    for tag in tags:
+        name = tag.get('name') if isinstance(tag, dict) else tag
+        if not isinstance(name, str) or not name.strip():
+            raise RecordError("Etiqueta inválida")
+        name = name.strip()
+        if len(name) > TAG_NAME_LENGTH:
+            raise RecordError(f"El nombre de etiqueta supera {TAG_NAME_LENGTH} caracteres")
+        if name not in names:
+            names.append(name)
+    position = data.get('position')
+    return values, names, position if is_valid_key(position) else None
+
+
+def _tag_ids(user_id, names, version):
+    """`{nombre: id}` de las etiquetas del usuario; crea las que falten."""
+    names = sorted(names)
+    found = {}
+    for start in range(0, len(names), IN_CHUNK_SIZE):
+        stmt = (
+            select(Tag.name, Tag.id)
+            .where(Tag.user_id == user_id, Tag.name.in_(names[start:start + IN_CHUNK_SIZE]))
+            .order_by(Tag.id.desc())
+        )
+        # La más antigua gana si hay nombres repetidos
+        found.update(db.session.execute(stmt).all())
+    missing = [name for name in names if name not in found]
+    if missing:
+        new_ids = db.session.scalars(
+            insert(Tag).returning(Tag.id, sort_by_parameter_order=True),
+            [{"name": name, "user_id": user_id, "sync_version": version} for name in missing]
+        ).all()
+        found.update(zip(missing, new_ids))
+    return found
+
+
+def _write_chunk(user_id, chunk):
+    """Inserta un trozo de registros válidos en una transacción. Devuelve la versión."""
+    version = next_version(user_id)
+    tag_ids = _tag_ids(user_id, {name for _, _, names, _ in chunk for name in names}, version)
+    # Sin posición válida: al final de su columna, en el orden del fichero
+    tails = iter(tail_keys(db.session, Task, user_id,
+                           sum(1 for *_, position in chunk if position is None)))
+    rows = []
+    for _, values, _, position in chunk:
+        status = values['status']
+        if position is None:
+            position = next(tails)
+        rows.append({
+            "title": values['title'],
+            "description": values.get('description'),
+            "due_date": values.get('due_date'),
+            "completed": values.get('completed', False),
+            "status": status,
+            "eisenhower_quadrant": values['eisenhower_quadrant'],
+            "recurrence_rule": values.get('recurrence_rule'),
+            "position": position,
+            "user_id": user_id,
+            "sync_version": version,
+        })
+    # executemany sin RETURNING (con él SQLite inserta fila a fila); las tareas del
+    # trozo son las únicas con esta versión y los ids crecen en orden de inserción
+    db.session.execute(insert(Task.__table__), rows)
+    new_ids = db.session.scalars(
+        select(Task.id).where(Task.user_id == user_id, Task.sync_version == version).order_by(Task.id)
+    ).all()
+    links = [{"task_id": task_id, "tag_id": tag_ids[name]}
+             for task_id, (_, _, names, _) in zip(new_ids, chunk) for name in names]
+    if links:
+        db.session.execute(insert(task_tags), links)
+    db.session.commit()
+    return version
+
+
+@transfer_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_tasks():
+    """Importa tareas desde NDJSON (por defecto) o CSV, en trozos con commit propio.
+
+    Acepta el mismo formato que produce /export; `id` y `created_at` se
+    ignoran. Las etiquetas se buscan por nombre y se crean si no existen.
+    """
+    user_id = current_user_id()
+    stream, fmt = _upload()
+    if stream is None:
+        return jsonify({"msg": "Falta el fichero (campo file)"}), 400
+    if fmt not in FORMATS:
+        return jsonify({"msg": "El parámetro format debe ser ndjson o csv"}), 400
+
+    chunk_size = current_app.config.get('IMPORT_CHUNK_SIZE', 1000)
+    max_errors = current_app.config.get('IMPORT_MAX_ERRORS', 100)
+    report = {"imported": 0, "failed": 0, "chunks": 0, "errors": [], "errors_truncated": False}
+    version = None
+    kept_positions = False
+
+    def fail(line, msg):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({"line": line, "msg": msg})
+        else:
+            report['errors_truncated'] = True
+
+    def flush(chunk):
+        nonlocal version, kept_positions
+        try:
+            version = _write_chunk(user_id, chunk)
+        except SQLAlchemyError:
+            db.session.rollback()
+            current_app.logger.exception('Fallo al importar el trozo %d', report['chunks'] + 1)
+            for line, *_ in chunk:
+                fail(line, "Error al guardar el trozo")
+        else:
+            report['imported'] += len(chunk)
+            kept_positions = kept_positions or any(position is not None for *_, position in chunk)
+        report['chunks'] += 1
+
+    records = _ndjson_records(stream) if fmt == 'ndjson' else _csv_records(stream)
+    chunk = []
+    try:
+        for line, data in records:
+            if isinstance(data, RecordError):
+                fail(line, str(data))
+                continue
+            try:
+                chunk.append((line, *_parse_record(data)))
+            except RecordError as e:
+                fail(line, str(e))
+                continue
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Fichero corrupto: lo ya confirmado se queda, el resto no se lee
+        fail(None, f"No se pudo leer el fichero: {e}")
+    if chunk:
+        flush(chunk)
+
+    if version is not None:
+        summary_cache.invalidate(user_id)
+        reminder_scheduler.reload_user(user_id)
+        event_hub.publish(user_id, 'sync', cursor=version)
+    if kept_positions:
+        # Las posiciones del fichero pueden repetir claves de la cuenta: se reparten de nuevo
+        position_rebalancer.schedule(user_id)
+    report['cursor'] = version
+    status = 200 if report['imported'] or not report['failed'] else 400
+    return jsonify(report), status
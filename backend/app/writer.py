@@ -0,0 +1,141 @@
+# backend/app/writer.py
+"""Cola de escritura con un único hilo escritor y commits agrupados.
+
+SQLite admite un solo escritor a la vez y cada commit cuesta un fsync. Con
+`SQLITE_GROUP_COMMIT = True` las escrituras de todos los hilos de petición
+se encolan y un hilo dedicado las ejecuta juntas: cada trabajo dentro de su
+propio SAVEPOINT (un fallo solo deshace ese trabajo) y un único COMMIT por
+grupo. Así el rendimiento de escritura crece con la concurrencia en lugar
+de con el número de fsyncs.
+
+Los trabajos son funciones `fn(session, *args)` que deben devolver datos
+planos (dicts, ids), no objetos ORM: la sesión del escritor no es la de la
+petición.
+"""
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from flask import jsonify
+
+from sqlalchemy.orm import Session
+
+from app.sqlite import write_intent
+
+
+class WriteTimeout(Exception):
+    """El escritor no confirmó el trabajo a tiempo (la petición responde 503)."""
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'future')
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.future = Future()
+
+
+class GroupCommitWriter:
+    """Extensión Flask con el hilo escritor (se arranca en el primer uso)."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.commits = 0
+        self.jobs = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Los SAVEPOINT por trabajo necesitan el perfil SQLITE_TUNED (app/sqlite.py)
+        self.enabled = bool(app.config.get('SQLITE_GROUP_COMMIT') and app.config.get('SQLITE_TUNED'))
+        self.max_batch = app.config.get('SQLITE_GROUP_COMMIT_MAX_BATCH', 64)
+        self.timeout = app.config.get('SQLITE_GROUP_COMMIT_TIMEOUT', 10)
+        self.retry_after = app.config.get('SQLITE_GROUP_COMMIT_RETRY_AFTER', 1)
+        self.app = app
+        app.extensions['group_commit_writer'] = self
+        app.register_error_handler(WriteTimeout, self._timeout_response)
+
+    def _timeout_response(self, error):
+        response = jsonify({"msg": "Servidor ocupado, inténtalo de nuevo"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+    def _ensure_started(self):
+        # Perezoso: tras un fork del servidor cada proceso arranca su propio hilo
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    with self.app.app_context():
+                        engine = self.app.extensions['sqlalchemy'].engine
+                    self._thread = threading.Thread(
+                        target=self._run, args=(engine,), name='sqlite-writer', daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, fn, *args):
+        """Ejecuta `fn(session, *args)` en una transacción de escritura y devuelve su resultado.
+
+        Sin el perfil activado se ejecuta en la sesión de la petición con un
+        commit normal.
+        """
+        if not self.enabled:
+            session = self.app.extensions['sqlalchemy'].session
+            result = fn(session, *args)
+            session.commit()
+            return result
+
+        # La transacción de la petición (BEGIN IMMEDIATE en las que escriben,
+        # app/sqlite.py) se cierra antes: si retuviera el bloqueo de escritura
+        # el hilo escritor no podría avanzar
+        self.app.extensions['sqlalchemy'].session.commit()
+        self._ensure_started()
+        job = _Job(fn, args)
+        self._queue.put(job)
+        try:
+            return job.future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Si aún no empezó, el escritor lo descarta: reintentar no duplica la escritura
+            job.future.cancel()
+            raise WriteTimeout()
+
+    def _drain(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, engine):
+        write_intent.set(True)
+        while True:
+            batch = self._drain()
+            done = []
+            with Session(bind=engine, expire_on_commit=False) as session:
+                try:
+                    for job in batch:
+                        # False si la petición ya se rindió (WriteTimeout) y lo canceló
+                        if not job.future.set_running_or_notify_cancel():
+                            continue
+                        try:
+                            with session.begin_nested():
+                                result = job.fn(session, *job.args)
+                            done.append((job, result))
+                        except Exception as e:
+                            job.future.set_exception(e)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    for job, _ in done:
+                        job.future.set_exception(e)
+                    continue
+            self.commits += 1
+            self.jobs += len(done)
+            for job, result in done:
+                job.future.set_result(result)
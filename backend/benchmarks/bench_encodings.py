@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_encodings.py
+"""Tamaño y coste de cada representación negociada de /tasks, con y sin compresión.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_encodings --tasks 1000 10000 50000 --tags 20
+
+Para cada tamaño se siembra un usuario con etiquetas, se construye la lista
+de tareas de /tasks (`serialize_task_rows`) y se codifica en cada tipo de
+`app/encoding.py`. Se mide el tiempo de codificación (mejor de `--repeat`),
+el tamaño del cuerpo y el tamaño y tiempo de gzip y brotli con los niveles
+de la configuración.
+"""
+import argparse
+import json
+import sys
+import time
+
+from benchmarks.bench_serializers import seed
+from benchmarks.common import temp_app
+from app import db
+from app.encoding import MEDIA_TYPES, brotli, compress, encode
+from app.models import Task
+from app.serializers import serialize_task_rows, task_rows
+
+SHORT_NAMES = {
+    'application/json': 'json',
+    'application/vnd.organizador.columnar+json': 'columnar-json',
+    'application/msgpack': 'msgpack',
+    'application/vnd.organizador.columnar+msgpack': 'columnar-msgpack',
+}
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run(n_tasks, args):
+    with temp_app() as app, app.app_context():
+        user_id = seed(n_tasks, args.tags, args.tags_per_task)
+        query = Task.query.filter(Task.user_id == user_id).order_by(Task.created_at.desc())
+        payload = serialize_task_rows(task_rows(query).all())
+        levels = {'gzip': app.config['COMPRESS_GZIP_LEVEL'], 'br': app.config['COMPRESS_BROTLI_QUALITY']}
+        db.session.remove()
+
+    results = {}
+    for media_type in MEDIA_TYPES:
+        encode_s, body = best_time(lambda: encode(payload, media_type), args.repeat)
+        result = {"encode_ms": round(encode_s * 1000, 2), "bytes": len(body)}
+        for coding in ('gzip', 'br') if brotli else ('gzip',):
+            compress_s, compressed = best_time(lambda: compress(body, coding, levels[coding]), args.repeat)
+            result[f"{coding}_bytes"] = len(compressed)
+            result[f"{coding}_ms"] = round(compress_s * 1000, 2)
+        results[SHORT_NAMES[media_type]] = result
+    return {"tasks": n_tasks, "encodings": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--tags', type=int, default=20)
+    parser.add_argument('--tags-per-task', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [run(n_tasks, args) for n_tasks in args.tasks]
+    print(f"{'tareas':>7} {'formato':>17} {'bytes':>10} {'cod. ms':>8} {'gzip':>9} {'gzip ms':>8} "
+          f"{'br':>9} {'br ms':>7}", file=sys.stderr)
+    for r in runs:
+        for name, e in r['encodings'].items():
+            print(f"{r['tasks']:>7} {name:>17} {e['bytes']:>10} {e['encode_ms']:>8} "
+                  f"{e['gzip_bytes']:>9} {e['gzip_ms']:>8} {e.get('br_bytes', '-'):>9} "
+                  f"{e.get('br_ms', '-'):>7}", file=sys.stderr)
+    json.dump({"args": vars(args), "runs": runs}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# backend/benchmarks/bench_reminders.py
+"""Coste por pasada de los recordatorios: montículo por ventanas vs. recorrer la tabla.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_reminders --tasks 10000 100000 --ticks 60
+
+Para cada tamaño se siembran tareas pendientes con vencimientos repartidos
+en `--days` días y se simulan `--ticks` pasadas de `--tick` segundos:
+
+- `scan`: cada pasada busca en `task` todas las pendientes ya vencidas que
+  aún no se avisaron (lo que haría un cron ingenuo).
+- `heap`: `ReminderScheduler.run_once` con el sumidero `log` (carga el
+  tramo nuevo de la ventana y saca lo vencido).
+
+Se mide el tiempo por pasada (mediana y máximo, la primera carga aparte) y
+las entradas en memoria del montículo.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import temp_app
+from app import db
+from app.models import Task, User
+from app.reminders import ReminderScheduler
+from sqlalchemy import select
+
+
+def seed(n_tasks, days, start):
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    rng = random.Random(42)
+    span = days * 86400
+    rows = [
+        {"title": f"tarea {i}", "completed": i % 4 == 0, "status": "pending",
+         "eisenhower_quadrant": "ni_urgente_ni_importante", "user_id": user.id,
+         "due_date": start + timedelta(seconds=rng.uniform(0, span))}
+        for i in range(n_tasks)
+    ]
+    for i in range(0, len(rows), 10000):
+        db.session.execute(Task.__table__.insert(), rows[i:i + 10000])
+    db.session.commit()
+
+
+def run_scan(start, ticks, tick):
+    times = []
+    notified_until = start
+    for i in range(ticks):
+        now = start + timedelta(seconds=(i + 1) * tick)
+        begin = time.perf_counter()
+        # Con `completed = 0` SQLite recorre todas las pendientes por (completed, created_at)
+        db.session.execute(
+            select(Task.id, Task.user_id, Task.title, Task.due_date)
+            .where(Task.completed.is_(False), Task.due_date > notified_until, Task.due_date <= now)
+        ).all()
+        db.session.rollback()
+        times.append(time.perf_counter() - begin)
+        notified_until = now
+    return times
+
+
+def run_heap(app, start, ticks, tick):
+    scheduler = ReminderScheduler()
+    app.config['REMINDER_SINK'] = 'log'
+    scheduler.init_app(app)
+    times = []
+    peak = 0
+    for i in range(ticks + 1):
+        now = start + timedelta(seconds=i * tick)
+        begin = time.perf_counter()
+        scheduler.run_once(now)
+        times.append(time.perf_counter() - begin)
+        peak = max(peak, scheduler.stats()['entries'])
+    return times, peak, scheduler.stats()
+
+
+def summary(times):
+    return {"median_ms": round(statistics.median(times) * 1000, 3),
+            "max_ms": round(max(times) * 1000, 3)}
+
+
+def run(n_tasks, args):
+    start = datetime(2030, 1, 1)
+    with temp_app(REMINDER_WINDOW=args.window) as app, app.app_context():
+        seed(n_tasks, args.days, start)
+        scan = run_scan(start, args.ticks, args.tick)
+        heap, peak, stats = run_heap(app, start, args.ticks, args.tick)
+        db.session.remove()
+    return {
+        "tasks": n_tasks,
+        "scan": summary(scan),
+        "heap_first_ms": round(heap[0] * 1000, 3),
+        "heap": summary(heap[1:]),
+        "heap_peak_entries": peak,
+        "fired": stats['fired'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--ticks', type=int, default=60)
+    parser.add_argument('--tick', type=int, default=60, help='segundos simulados por pasada')
+    parser.add_argument('--window', type=int, default=3600)
+    args = parser.parse_args()
+
+    runs = [run(n_tasks, args) for n_tasks in args.tasks]
+    print(f"{'tareas':>8} {'scan p50':>9} {'scan max':>9} {'heap 1ª':>9} {'heap p50':>9} "
+          f"{'heap max':>9} {'entradas':>9} {'avisos':>7}", file=sys.stderr)
+    for r in runs:
+        print(f"{r['tasks']:>8} {r['scan']['median_ms']:>9} {r['scan']['max_ms']:>9} "
+              f"{r['heap_first_ms']:>9} {r['heap']['median_ms']:>9} {r['heap']['max_ms']:>9} "
+              f"{r['heap_peak_entries']:>9} {r['fired']:>7}", file=sys.stderr)
+    json.dump({"args": vars(args), "runs": runs}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_revocation.py
+"""Coste de comprobar la revocación de JWT: filtro de Bloom vs. consulta en cada petición.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_revocation --revoked 0 10000 100000 --checks 20000
+
+Para cada tamaño de `revoked_token` se mide, por token no revocado (el caso
+normal):
+
+- `verify`: `verify_jwt_in_request` completo en un contexto de petición
+  de prueba (decodificar, comprobar la firma y el filtro), como referencia.
+- `bloom`: `TokenBlocklist.is_revoked` (el filtro en memoria; consulta solo
+  en los falsos positivos).
+- `query`: la consulta por `jti` que haría una lista sin filtro.
+
+Y la tasa de falsos positivos observada con `--checks` jtis aleatorios.
+"""
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token, verify_jwt_in_request
+from sqlalchemy import select
+
+from benchmarks.common import temp_app
+from app import db
+from app.models import RevokedToken, User
+from app.revocation import token_blocklist
+
+
+def seed(n_revoked):
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    rows = [{"jti": str(uuid.uuid4()), "user_id": user.id, "revoked_at": datetime.utcnow(),
+             "expires_at": expires_at} for _ in range(n_revoked)]
+    for i in range(0, len(rows), 10000):
+        db.session.execute(RevokedToken.__table__.insert(), rows[i:i + 10000])
+    db.session.commit()
+    return user.id
+
+
+def per_call_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return round((time.perf_counter() - start) / len(items) * 1e6, 2)
+
+
+def run(n_revoked, args):
+    # Sin refrescos durante la medida
+    with temp_app(JWT_BLOCKLIST_REFRESH_INTERVAL=3600, JWT_BLOCKLIST_REBUILD_INTERVAL=3600) as app:
+        with app.app_context():
+            user_id = seed(n_revoked)
+            tokens = [create_access_token(identity=str(user_id)) for _ in range(200)]
+            jtis = [str(uuid.uuid4()) for _ in range(args.checks)]
+            # Carga el filtro (lo que hace la primera petición de cada proceso)
+            start = time.perf_counter()
+            token_blocklist.is_revoked(jtis[0])
+            load_ms = round((time.perf_counter() - start) * 1000, 2)
+
+            bloom_us = per_call_us(token_blocklist.is_revoked, jtis)
+            lookups = token_blocklist.stats()['lookups']
+            query_us = per_call_us(
+                lambda jti: db.session.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti)),
+                jtis[:args.queries],
+            )
+            db.session.remove()
+
+        # Decodificación completa con el filtro (la comprobación va dentro)
+        def verify(token):
+            with app.test_request_context(headers={'Authorization': f'Bearer {token}'}):
+                verify_jwt_in_request()
+        verify_us = per_call_us(verify, (tokens * (args.verifies // len(tokens) + 1))[:args.verifies])
+
+    return {
+        "revoked": n_revoked,
+        "load_ms": load_ms,
+        "verify_us": verify_us,
+        "bloom_us": bloom_us,
+        "query_us": query_us,
+        "false_positive_rate": round(lookups / len(jtis), 5),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--revoked', type=int, nargs='+', default=[0, 10000, 100000])
+    parser.add_argument('--checks', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--verifies', type=int, default=2000)
+    args = parser.parse_args()
+
+    runs = [run(n_revoked, args) for n_revoked in args.revoked]
+    print(f"{'revocados':>10} {'carga ms':>9} {'verify µs':>10} {'bloom µs':>9} {'query µs':>9} "
+          f"{'f. pos.':>8}", file=sys.stderr)
+    for r in runs:
+        print(f"{r['revoked']:>10} {r['load_ms']:>9} {r['verify_us']:>10} {r['bloom_us']:>9} "
+              f"{r['query_us']:>9} {r['false_positive_rate']:>8}", file=sys.stderr)
+    json.dump({"args": vars(args), "runs": runs}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
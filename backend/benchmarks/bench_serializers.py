@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_serializers.py
+"""Micro-benchmark: serialización de /tasks con `to_dict` vs. ruta masiva.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_serializers --tasks 5000 --tags 20
+
+Mide tiempo de CPU y memoria asignada (tracemalloc) por cada 1k tareas
+en una base SQLite temporal.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from config import Config
+from app import create_app, db
+from app.models import User, Task, Tag, task_tags
+from app.encoding import dumps
+from app.serializers import serialize_task_rows, task_rows
+
+
+def seed(n_tasks, n_tags, tags_per_task):
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    db.session.execute(Tag.__table__.insert(), [
+        {"name": f"tag{i}", "user_id": user.id} for i in range(n_tags)
+    ])
+    db.session.execute(Task.__table__.insert(), [
+        {"title": f"tarea {i}", "description": "descripción " * 5, "completed": i % 3 == 0,
+         "status": "pending", "eisenhower_quadrant": "ni_urgente_ni_importante",
+         "user_id": user.id}
+        for i in range(n_tasks)
+    ])
+    task_ids = [row[0] for row in db.session.execute(db.select(Task.id))]
+    tag_ids = [row[0] for row in db.session.execute(db.select(Tag.id))]
+    rng = random.Random(42)
+    db.session.execute(task_tags.insert(), [
+        {"task_id": task_id, "tag_id": tag_id}
+        for task_id in task_ids
+        for tag_id in rng.sample(tag_ids, min(tags_per_task, len(tag_ids)))
+    ])
+    db.session.commit()
+    return user.id
+
+
+def orm_path(user_id):
+    tasks = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).all()
+    return json.dumps([task.to_dict() for task in tasks]).encode('utf-8')
+
+
+def bulk_path(user_id):
+    query = Task.query.filter(Task.user_id == user_id).order_by(Task.created_at.desc())
+    return dumps(serialize_task_rows(task_rows(query).all()))
+
+
+def measure(fn, user_id, repeat):
+    results = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        tracemalloc.start()
+        start = time.process_time()
+        fn(user_id)
+        cpu = time.process_time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append((cpu, peak))
+    return min(r[0] for r in results), min(r[1] for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--tags', type=int, default=20)
+    parser.add_argument('--tags-per-task', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + path
+
+    app = create_app(BenchConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            user_id = seed(args.tasks, args.tags, args.tags_per_task)
+            assert json.loads(orm_path(user_id)) == json.loads(bulk_path(user_id))
+
+            per_k = 1000 / args.tasks
+            report = {}
+            for name, fn in (('to_dict', orm_path), ('bulk', bulk_path)):
+                cpu, peak = measure(fn, user_id, args.repeat)
+                report[name] = {
+                    "cpu_ms_per_1k": round(cpu * 1000 * per_k, 2),
+                    "peak_kib_per_1k": round(peak / 1024 * per_k, 1),
+                }
+            print(json.dumps({"tasks": args.tasks, **report}, indent=2))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
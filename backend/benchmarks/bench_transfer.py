@@ -0,0 +1,134 @@
+# backend/benchmarks/bench_transfer.py
+"""Exportación e importación masiva: tiempo y memoria según el número de tareas.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_transfer --tasks 10000 100000 1000000 --format ndjson
+
+Para cada tamaño se siembra un usuario en un SQLite desechable, se exporta
+con GET /export (consumiendo la respuesta en streaming hacia un fichero) y
+ese fichero se importa en otro usuario con POST /import, enviado como flujo.
+Cada operación se mide dos veces: sin trazar (filas/s) y con tracemalloc
+(pico de memoria). Si el streaming funciona, el pico no crece con el tamaño.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from flask_jwt_extended import create_access_token
+
+from benchmarks.common import temp_app
+from app import db
+from app.models import User, Task, Tag, task_tags
+
+SEED_CHUNK = 20000
+
+
+def seed(n_tasks, n_tags, tags_per_task):
+    users = [User(username=f'bench{i}', email=f'bench{i}@example.com', password_hash='x')
+             for i in (1, 2)]
+    db.session.add_all(users)
+    db.session.commit()
+    source = users[0].id
+    tag_ids = db.session.scalars(
+        Tag.__table__.insert().returning(Tag.id),
+        [{"name": f"etiqueta {i}", "user_id": source} for i in range(n_tags)]
+    ).all()
+    rng = random.Random(42)
+    for start in range(0, n_tasks, SEED_CHUNK):
+        ids = db.session.scalars(Task.__table__.insert().returning(Task.id), [
+            {"title": f"tarea {i}", "description": "descripción " * 5, "completed": i % 3 == 0,
+             "status": ('pending', 'in_progress', 'done')[i % 3],
+             "eisenhower_quadrant": "ni_urgente_ni_importante", "user_id": source,
+             "position": f"V{i}"}
+            for i in range(start, min(start + SEED_CHUNK, n_tasks))
+        ]).all()
+        db.session.execute(task_tags.insert(), [
+            {"task_id": task_id, "tag_id": tag_id}
+            for task_id in ids for tag_id in rng.sample(tag_ids, min(tags_per_task, len(tag_ids)))
+        ])
+        db.session.commit()
+    return [user.id for user in users]
+
+
+def export(client, headers, fmt, path):
+    response = client.get(f'/export?format={fmt}', headers=headers, buffered=False)
+    assert response.status_code == 200, response.status_code
+    with open(path, 'wb') as out:
+        for chunk in response.response:
+            out.write(chunk)
+    response.close()
+
+
+def import_(client, headers, fmt, path):
+    with open(path, 'rb') as stream:
+        response = client.post(f'/import?format={fmt}', headers=headers, input_stream=stream,
+                               content_type='application/octet-stream',
+                               content_length=os.path.getsize(path))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def measure(fn, *args):
+    """(segundos sin trazar, pico de tracemalloc en bytes, resultado)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def run(n_tasks, args):
+    settings = {'EXPORT_CHUNK_SIZE': args.chunk, 'IMPORT_CHUNK_SIZE': args.chunk}
+    with temp_app(**settings) as app, tempfile.TemporaryDirectory() as tmp:
+        with app.app_context():
+            source, target = seed(n_tasks, args.tags, args.tags_per_task)
+            tokens = [create_access_token(identity=str(user_id)) for user_id in (source, target)]
+        client = app.test_client()
+        source_headers, target_headers = ({'Authorization': 'Bearer ' + token} for token in tokens)
+        path = os.path.join(tmp, f'tareas.{args.format}')
+
+        export_s, export_peak, _ = measure(export, client, source_headers, args.format, path)
+        size = os.path.getsize(path)
+        # Se importa dos veces (medida sin trazar y con tracemalloc): 2 × n_tasks en destino
+        import_s, import_peak, report = measure(import_, client, target_headers, args.format, path)
+        assert report['imported'] == n_tasks and not report['failed'], report
+
+    return {
+        "tasks": n_tasks,
+        "file_mib": round(size / 2 ** 20, 1),
+        "export_rows_per_s": round(n_tasks / export_s),
+        "export_peak_kib": round(export_peak / 1024),
+        "import_rows_per_s": round(n_tasks / import_s),
+        "import_peak_kib": round(import_peak / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+    parser.add_argument('--chunk', type=int, default=1000, help='EXPORT/IMPORT_CHUNK_SIZE')
+    parser.add_argument('--tags', type=int, default=20)
+    parser.add_argument('--tags-per-task', type=int, default=2)
+    args = parser.parse_args()
+
+    runs = [run(n_tasks, args) for n_tasks in args.tasks]
+    print(f"{'tareas':>9} {'MiB':>7} {'export/s':>9} {'pico KiB':>9} {'import/s':>9} {'pico KiB':>9}",
+          file=sys.stderr)
+    for r in runs:
+        print(f"{r['tasks']:>9} {r['file_mib']:>7} {r['export_rows_per_s']:>9} {r['export_peak_kib']:>9} "
+              f"{r['import_rows_per_s']:>9} {r['import_peak_kib']:>9}", file=sys.stderr)
+    json.dump({"format": args.format, "chunk": args.chunk, "runs": runs}, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# backend/benchmarks/bench_workers.py
+"""Rendimiento de gunicorn según el número de workers (gunicorn.conf.py).
+
+Uso (desde backend/, en Linux con varios núcleos):
+    python -m benchmarks.bench_workers --workers 1 2 4 8 --threads 8 \\
+        --clients 32 --duration 20 > workers.json
+
+Para cada número de workers se crea un SQLite desechable (perfil
+SQLITE_TUNED), se siembran usuarios con tareas, se arranca gunicorn con la
+configuración de producción y `--clients` procesos cliente lanzan peticiones
+con conexiones keep-alive durante `--duration` segundos: listados de tareas
+y resúmenes y, con `--write-ratio`, ediciones de tareas. Los clientes son
+procesos para que el GIL del cliente no limite la medida; conviene que la
+máquina tenga núcleos libres para ellos o lanzarlos desde otra.
+
+Se imprime un informe JSON (peticiones/s, p50/p95/p99, errores por número de
+workers) y en stderr una tabla con la escala respecto a un worker. Con un
+solo núcleo no hay escala que medir: el informe lo indica en `cpu_count`.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from benchmarks.common import percentiles, request, temp_app
+from benchmarks.suite import PASSWORD, seed
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_uri, port, workers, threads, rounds):
+    env = dict(os.environ, DATABASE_URL=database_uri, WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads), GUNICORN_BIND=f'127.0.0.1:{port}',
+               SQLITE_TUNED='1', BCRYPT_LOG_ROUNDS=str(rounds), PASSWORD_HASH_WORKERS='0',
+               RATE_LIMIT_ENABLED='0', RATE_LIMIT_MAX_CONCURRENT='0')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+                              cwd=BACKEND_DIR, env=env, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            status, _ = request(port, 'GET', '/metrics')
+            if status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError('gunicorn no arrancó en 30 s')
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=60)
+
+
+def client(port, token, task_ids, duration, write_ratio, seed_value):
+    """Proceso cliente: bucle de peticiones sobre una conexión keep-alive."""
+    rng = random.Random(seed_value)
+    headers = {'Authorization': 'Bearer ' + token, 'Content-Type': 'application/json'}
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    samples, errors = [], 0
+    begin = time.perf_counter()
+    deadline = begin + duration
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < write_ratio:
+            task_id = rng.choice(task_ids)
+            method, path = 'PUT', f'/tasks/{task_id}'
+            body = json.dumps({'title': f'editada {task_id}', 'completed': rng.random() < 0.5})
+        else:
+            method, path, body = 'GET', ('/tasks' if roll < 0.8 else '/summary'), None
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            ok = False
+        samples.append(time.perf_counter() - start)
+        errors += not ok
+    conn.close()
+    return samples, errors, time.perf_counter() - begin
+
+
+def measure(workers, args):
+    settings = {'BCRYPT_LOG_ROUNDS': args.rounds, 'PASSWORD_HASH_WORKERS': 0}
+    seed_args = SimpleNamespace(users=args.clients, tasks=args.tasks, tags=args.tags,
+                                rounds=args.rounds, seed=args.seed)
+    with temp_app(**settings) as app:
+        from app import db
+        with app.app_context():
+            seed(db, seed_args, user_columns=lambda i, pw: {'username': f'bench{i}', 'password_hash': pw},
+                 pomodoro=True)
+            database_uri = str(db.engine.url)
+            db.engine.dispose()
+
+        port = free_port()
+        server = start_server(database_uri, port, workers, args.threads, args.rounds)
+        try:
+            jobs = []
+            for i in range(1, args.clients + 1):
+                status, data = request(port, 'POST', '/login',
+                                       {'email': f'bench{i}@example.com', 'password': PASSWORD})
+                if status != 200:
+                    raise RuntimeError(f'login fallido ({status}): {data}')
+                task_ids = list(range((i - 1) * args.tasks + 1, i * args.tasks + 1))
+                jobs.append((port, data['access_token'], task_ids, args.duration,
+                             args.write_ratio, args.seed * 1000 + i))
+
+            # Cada cliente mide su propia ventana: el arranque del pool no cuenta
+            with multiprocessing.get_context('spawn').Pool(args.clients) as pool:
+                results = pool.starmap(client, jobs)
+        finally:
+            stop_server(server)
+
+    samples = [s for result, _, _ in results for s in result]
+    errors = sum(e for _, e, _ in results)
+    rate = sum(len(result) / elapsed for result, _, elapsed in results)
+    return {
+        'workers': workers,
+        'threads': args.threads,
+        'requests': len(samples),
+        'errors': errors,
+        'requests_per_second': round(rate, 1),
+        **percentiles(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8, help='hilos por worker')
+    parser.add_argument('--clients', type=int, default=16, help='procesos cliente (un usuario cada uno)')
+    parser.add_argument('--duration', type=float, default=10, help='segundos por medida')
+    parser.add_argument('--write-ratio', type=float, default=0.0, help='fracción de ediciones')
+    parser.add_argument('--tasks', type=int, default=200, help='tareas por usuario')
+    parser.add_argument('--tags', type=int, default=10, help='etiquetas por usuario')
+    parser.add_argument('--rounds', type=int, default=4, help='coste de bcrypt')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    runs = [measure(workers, args) for workers in args.workers]
+    base = runs[0]['requests_per_second'] or 1
+    print(f"{'workers':>8} {'req/s':>10} {'escala':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errores':>8}", file=sys.stderr)
+    for run in runs:
+        print(f"{run['workers']:>8} {run['requests_per_second']:>10} "
+              f"{run['requests_per_second'] / base:>6.2f}x {run['p50']:>8} {run['p95']:>8} "
+              f"{run['p99']:>8} {run['errors']:>8}", file=sys.stderr)
+
+    json.dump({
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'args': vars(args),
+        'runs': runs,
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
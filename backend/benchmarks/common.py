@@ -0,0 +1,86 @@
+# backend/benchmarks/common.py
+"""Utilidades compartidas por los benchmarks: base temporal, servidor local y percentiles."""
+import http.client
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from config import Config
+from app import create_app, db
+
+
+@contextmanager
+def temp_app(**settings):
+    """App del paquete `app` sobre un fichero SQLite desechable."""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    config = type('BenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        # Los benchmarks generan carga a propósito: sin límite salvo que se pida
+        'RATE_LIMIT_ENABLED': False,
+        **settings,
+    })
+    app = create_app(config)
+    try:
+        with app.app_context():
+            db.create_all()
+        yield app
+    finally:
+        # Sin hilos que sigan consultando la base borrada
+        app.extensions['token_blocklist'].stop()
+        with app.app_context():
+            db.engine.dispose()
+        os.remove(path)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+@contextmanager
+def serve(app, threaded=True):
+    """Sirve `app` con el servidor WSGI de Werkzeug en un puerto libre."""
+    server = make_server('127.0.0.1', 0, app, threaded=threaded,
+                         request_handler=QuietRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_port
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def request(port, method, path, body=None, headers=None):
+    """Petición HTTP mínima; devuelve (status, cuerpo_decodificado)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        payload = json.dumps(body) if body is not None else None
+        conn.request(method, path, body=payload,
+                     headers={'Content-Type': 'application/json', **(headers or {})})
+        response = conn.getresponse()
+        raw = response.read()
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = raw
+        return response.status, data
+    finally:
+        conn.close()
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Percentiles (en ms) de una lista de duraciones en segundos."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[index] * 1000, 2)
+    return result
@@ -0,0 +1,102 @@
+# backend/benchmarks/load_login_storm.py
+"""Prueba de carga: latencia de GET /tasks durante una ráfaga de logins.
+
+Uso (desde backend/):
+    python -m benchmarks.load_login_storm --logins 16 --seconds 5
+
+Compara bcrypt en el hilo de la petición (PASSWORD_HASH_WORKERS=0) con el
+pool de procesos, sirviendo la app con un servidor WSGI local multihilo.
+"""
+import argparse
+import json
+import threading
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models import User, Task
+from benchmarks.common import temp_app, serve, request, percentiles
+
+PASSWORD = 'contraseña-de-prueba'
+
+
+def seed(app, tasks):
+    with app.app_context():
+        user = User(username='bench', email='bench@example.com')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        db.session.execute(Task.__table__.insert(), [
+            {"title": f"tarea {i}", "status": "pending", "user_id": user.id} for i in range(tasks)
+        ])
+        db.session.commit()
+        return {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
+
+
+def measure_reads(port, headers, seconds):
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        request(port, 'GET', '/tasks', headers=headers)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def login_storm(port, stop, counters):
+    while not stop.is_set():
+        status, _ = request(port, 'POST', '/login',
+                            body={"email": "bench@example.com", "password": PASSWORD})
+        with counters['lock']:
+            counters[status] = counters.get(status, 0) + 1
+
+
+def run(workers, args):
+    settings = {
+        'PASSWORD_HASH_WORKERS': workers,
+        'PASSWORD_HASH_QUEUE': args.queue,
+        'BCRYPT_LOG_ROUNDS': args.rounds,
+    }
+    with temp_app(**settings) as app:
+        headers = seed(app, args.tasks)
+        with serve(app) as port:
+            baseline = measure_reads(port, headers, args.seconds)
+
+            stop = threading.Event()
+            counters = {'lock': threading.Lock()}
+            storm = [threading.Thread(target=login_storm, args=(port, stop, counters))
+                     for _ in range(args.logins)]
+            for thread in storm:
+                thread.start()
+            time.sleep(0.2)
+            during = measure_reads(port, headers, args.seconds)
+            stop.set()
+            for thread in storm:
+                thread.join()
+
+    counters.pop('lock')
+    return {
+        "password_hash_workers": workers,
+        "tasks_baseline_ms": percentiles(baseline),
+        "tasks_during_storm_ms": percentiles(during),
+        "login_responses": {str(k): v for k, v in sorted(counters.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=16, help='clientes haciendo login en bucle')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=2, help='procesos del pool de bcrypt')
+    parser.add_argument('--queue', type=int, default=8)
+    args = parser.parse_args()
+
+    report = [run(0, args), run(args.workers, args)]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
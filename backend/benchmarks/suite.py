@@ -0,0 +1,422 @@
+# backend/benchmarks/suite.py
+"""Suite de benchmarks reproducible para las dos APIs (paquete `app` y app.py).
+
+Uso (desde backend/):
+    python -m benchmarks.suite --users 20 --tasks 200 --tags 10 --requests 2000 > antes.json
+    python -m benchmarks.suite ... --baseline antes.json > despues.json
+
+Para cada API y modo (`client`: cliente de pruebas de Flask en un hilo;
+`server`: servidor WSGI local con `--clients` hilos concurrentes) se crea un
+SQLite desechable, se siembran usuarios x tareas x etiquetas con inserciones
+masivas y se ejecuta una mezcla de peticiones con semilla fija: login,
+listado, alta/edición/borrado de tareas, alta y borrado de etiquetas,
+resumen y sesiones Pomodoro (solo en el paquete).
+
+El informe JSON trae, por endpoint, p50/p95/p99 en ms, errores y consultas
+SQL por petición, y por ejecución el rendimiento total en peticiones/s. Con
+`--baseline` se imprime en stderr la comparación con un informe anterior.
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import g
+from flask_bcrypt import generate_password_hash
+from sqlalchemy import event
+
+from benchmarks.common import temp_app, serve, percentiles
+
+PASSWORD = 'contraseña-de-prueba'
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Peso de cada operación en la mezcla
+WORKLOAD = {
+    'list_tasks': 35,
+    'create_task': 15,
+    'update_task': 15,
+    'delete_task': 8,
+    'summary': 10,
+    'tag_churn': 7,
+    'pomodoro': 8,
+    'login': 2,
+}
+STATUSES = ('pending', 'in_progress', 'done')
+QUADRANTS = ('urgente_importante', 'no_urgente_importante',
+             'urgente_no_importante', 'ni_urgente_ni_importante')
+
+
+# ----------------------------------------------------
+# Apps instrumentadas
+# ----------------------------------------------------
+def count_queries(app, engine):
+    """Añade la cabecera X-Bench-Queries con las sentencias SQL de cada petición."""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(*args):
+        try:
+            g._bench_queries = g.get('_bench_queries', 0) + 1
+        except RuntimeError:
+            pass  # fuera de una petición (siembra, hilo escritor)
+
+    @app.after_request
+    def add_query_header(response):
+        response.headers['X-Bench-Queries'] = str(g.get('_bench_queries', 0))
+        return response
+
+
+@contextmanager
+def package_target(args):
+    settings = {'BCRYPT_LOG_ROUNDS': args.rounds, 'PASSWORD_HASH_WORKERS': args.hash_workers}
+    with temp_app(**settings) as app:
+        from app import db
+        with app.app_context():
+            count_queries(app, db.engine)
+            seed(db, args, user_columns=lambda i, pw: {'username': f'bench{i}', 'password_hash': pw},
+                 pomodoro=True)
+        yield {'name': 'package', 'app': app, 'token_auth': True, 'pomodoro': True}
+
+
+@contextmanager
+def legacy_target(args):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    # app.py se configura al importarse: base y bcrypt por variables de entorno
+    os.environ.update(ORGANIZADOR_DB_PATH=path, BCRYPT_LOG_ROUNDS=str(args.rounds),
+                      PASSWORD_HASH_WORKERS=str(args.hash_workers), RATE_LIMIT_ENABLED='0')
+    spec = importlib.util.spec_from_file_location('legacy_app', os.path.join(BACKEND_DIR, 'app.py'))
+    legacy = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(legacy)
+    try:
+        with legacy.app.app_context():
+            legacy.db.create_all()
+            count_queries(legacy.app, legacy.db.engine)
+            seed(legacy.db, args, user_columns=lambda i, pw: {'password': pw}, pomodoro=False)
+        yield {'name': 'legacy', 'app': legacy.app, 'token_auth': False, 'pomodoro': False}
+    finally:
+        with legacy.app.app_context():
+            legacy.db.engine.dispose()
+        os.remove(path)
+
+
+TARGETS = {'package': package_target, 'legacy': legacy_target}
+
+
+def seed(db, args, user_columns, pomodoro):
+    """Siembra usuarios x tareas x etiquetas con inserciones masivas (ids deterministas)."""
+    rng = random.Random(args.seed)
+    tables = db.metadata.tables
+    password_hash = generate_password_hash(PASSWORD, args.rounds).decode('utf-8')
+    now = datetime.utcnow()
+
+    db.session.execute(tables['user'].insert(), [
+        {'id': i, 'email': f'bench{i}@example.com', **user_columns(i, password_hash)}
+        for i in range(1, args.users + 1)
+    ])
+    tags, tasks, links = [], [], []
+    for user_id in range(1, args.users + 1):
+        user_tags = [(user_id - 1) * args.tags + k for k in range(1, args.tags + 1)]
+        tags += [{'id': tag_id, 'name': f'etiqueta {tag_id}', 'user_id': user_id}
+                 for tag_id in user_tags]
+        for k in range(args.tasks):
+            task_id = (user_id - 1) * args.tasks + k + 1
+            tasks.append({
+                'id': task_id, 'user_id': user_id, 'title': f'tarea {task_id}',
+                'description': f'descripción de la tarea {task_id}',
+                'status': rng.choice(STATUSES), 'eisenhower_quadrant': rng.choice(QUADRANTS),
+                'completed': rng.random() < 0.3,
+                'due_date': now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.7 else None,
+                'created_at': now - timedelta(minutes=args.tasks - k),
+            })
+            if user_tags:
+                links += [{'task_id': task_id, 'tag_id': tag_id}
+                          for tag_id in rng.sample(user_tags, min(len(user_tags), rng.randint(0, 2)))]
+    db.session.execute(tables['tag'].insert(), tags)
+    db.session.execute(tables['task'].insert(), tasks)
+    if links:
+        db.session.execute(tables['task_tags'].insert(), links)
+    if pomodoro:
+        db.session.execute(tables['pomodoro_session'].insert(), [
+            {'user_id': user_id, 'duration': 25, 'date_completed': now - timedelta(days=rng.randint(0, 60))}
+            for user_id in range(1, args.users + 1) for _ in range(10)
+        ])
+    db.session.commit()
+
+
+# ----------------------------------------------------
+# Clientes
+# ----------------------------------------------------
+class Recorder:
+    """Acumula duración, estado y consultas de cada petición por etiqueta."""
+
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, label, elapsed, status, queries):
+        with self.lock:
+            self.samples.setdefault(label, []).append((elapsed, status, queries))
+
+
+class TestClientSession:
+    """Cliente de pruebas de Flask (mantiene la cookie de sesión de app.py)."""
+
+    def __init__(self, app, recorder):
+        self.client = app.test_client()
+        self.recorder = recorder
+        self.headers = {}
+
+    def send(self, label, method, path, body=None):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, json=body, headers=self.headers)
+        elapsed = time.perf_counter() - start
+        self.recorder.add(label, elapsed, response.status_code,
+                          int(response.headers.get('X-Bench-Queries', 0)))
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPSession:
+    """Cliente HTTP contra el servidor local, con cookie y cabecera de autorización."""
+
+    def __init__(self, port, recorder):
+        self.port = port
+        self.recorder = recorder
+        self.headers = {}
+
+    def send(self, label, method, path, body=None):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            start = time.perf_counter()
+            conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                         headers={'Content-Type': 'application/json', **self.headers})
+            response = conn.getresponse()
+            raw = response.read()
+            elapsed = time.perf_counter() - start
+        finally:
+            conn.close()
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.headers['Cookie'] = cookie.split(';', 1)[0]
+        self.recorder.add(label, elapsed, response.status,
+                          int(response.getheader('X-Bench-Queries') or 0))
+        try:
+            return response.status, json.loads(raw) if raw else None
+        except ValueError:
+            return response.status, None
+
+
+# ----------------------------------------------------
+# Carga de trabajo
+# ----------------------------------------------------
+class VirtualUser:
+    """Un usuario sembrado con su propio conjunto de tareas y etiquetas conocidas."""
+
+    def __init__(self, target, session, user_id, args, rng):
+        self.target = target
+        self.session = session
+        self.user_id = user_id
+        self.rng = rng
+        self.tasks = list(range((user_id - 1) * args.tasks + 1, user_id * args.tasks + 1))
+        self.created = 0
+
+    def login(self):
+        status, data = self.session.send('POST /login', 'POST', '/login', {
+            'email': f'bench{self.user_id}@example.com', 'password': PASSWORD,
+        })
+        if self.target['token_auth'] and status == 200:
+            self.session.headers['Authorization'] = 'Bearer ' + data['access_token']
+
+    def list_tasks(self):
+        self.session.send('GET /tasks', 'GET', '/tasks')
+
+    def summary(self):
+        self.session.send('GET /summary', 'GET', '/summary')
+
+    def create_task(self):
+        self.created += 1
+        body = {'title': f'nueva {self.user_id}-{self.created}',
+                'status': self.rng.choice(STATUSES),
+                'eisenhower_quadrant': self.rng.choice(QUADRANTS)}
+        if self.rng.random() < 0.5:
+            body['due_date'] = (datetime.utcnow() + timedelta(days=self.rng.randint(0, 30))).isoformat()
+        status, data = self.session.send('POST /tasks', 'POST', '/tasks', body)
+        if status == 201:
+            self.tasks.append(data['id'])
+
+    def update_task(self):
+        if not self.tasks:
+            return self.create_task()
+        task_id = self.rng.choice(self.tasks)
+        self.session.send('PUT /tasks/<id>', 'PUT', f'/tasks/{task_id}', {
+            'title': f'editada {task_id}', 'completed': self.rng.random() < 0.5,
+        })
+
+    def delete_task(self):
+        if not self.tasks:
+            return self.create_task()
+        task_id = self.tasks.pop(self.rng.randrange(len(self.tasks)))
+        self.session.send('DELETE /tasks/<id>', 'DELETE', f'/tasks/{task_id}')
+
+    def tag_churn(self):
+        self.created += 1
+        status, data = self.session.send('POST /tags', 'POST', '/tags',
+                                         {'name': f'temporal {self.user_id}-{self.created}'})
+        if status == 201:
+            self.session.send('DELETE /tags/<id>', 'DELETE', f"/tags/{data['id']}")
+
+    def pomodoro(self):
+        if self.target['pomodoro']:
+            self.session.send('POST /pomodoro-sessions', 'POST', '/pomodoro-sessions',
+                              {'duration': 25})
+        else:
+            self.list_tasks()
+
+
+def schedule(rng, count):
+    """Secuencia de operaciones de la mezcla, determinista para la semilla."""
+    names = list(WORKLOAD)
+    return rng.choices(names, weights=[WORKLOAD[n] for n in names], k=count)
+
+
+def run(target_factory, mode, args):
+    recorder = Recorder()
+    clients = 1 if mode == 'client' else args.clients
+    with target_factory(args) as target:
+        with (serve(target['app']) if mode == 'server' else _no_server()) as port:
+            users = []
+            for i in range(clients):
+                session = (TestClientSession(target['app'], recorder) if mode == 'client'
+                           else HTTPSession(port, recorder))
+                rng = random.Random(args.seed * 1000 + i)
+                users.append((VirtualUser(target, session, i + 1, args, rng),
+                              schedule(rng, args.requests // clients)))
+            for user, _ in users:
+                user.login()
+
+            start = time.perf_counter()
+            if mode == 'client':
+                for user, operations in users:
+                    for name in operations:
+                        getattr(user, name)()
+            else:
+                threads = [threading.Thread(target=lambda u=user, ops=operations:
+                                            [getattr(u, name)() for name in ops])
+                           for user, operations in users]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = time.perf_counter() - start
+
+    return report(target['name'], mode, clients, elapsed, recorder)
+
+
+@contextmanager
+def _no_server():
+    yield None
+
+
+def report(name, mode, clients, elapsed, recorder):
+    endpoints = {}
+    total = queries = errors = 0
+    for label, samples in sorted(recorder.samples.items()):
+        durations = [s[0] for s in samples]
+        endpoint_queries = sum(s[2] for s in samples)
+        endpoint_errors = sum(1 for s in samples if s[1] >= 400)
+        endpoints[label] = {
+            'count': len(samples),
+            **percentiles(durations),
+            'errors': endpoint_errors,
+            'queries_per_request': round(endpoint_queries / len(samples), 2),
+        }
+        total += len(samples)
+        queries += endpoint_queries
+        errors += endpoint_errors
+    return {
+        'target': name,
+        'mode': mode,
+        'clients': clients,
+        'elapsed_s': round(elapsed, 3),
+        'requests': total,
+        # El login inicial de cada cliente queda fuera del tiempo medido
+        'throughput_rps': round((total - clients) / elapsed, 1) if elapsed else None,
+        'errors': errors,
+        'queries_per_request': round(queries / total, 2) if total else None,
+        'endpoints': endpoints,
+    }
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'date': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'args': {k: v for k, v in vars(args).items() if k != 'baseline'},
+    }
+
+
+def compare(baseline, current):
+    """Imprime en stderr p95 y rendimiento frente a un informe anterior."""
+    previous = {(r['target'], r['mode']): r for r in baseline['results']}
+    for result in current['results']:
+        old = previous.get((result['target'], result['mode']))
+        if not old:
+            continue
+        print(f"{result['target']}/{result['mode']}: {old['throughput_rps']} -> "
+              f"{result['throughput_rps']} req/s", file=sys.stderr)
+        for label, stats in result['endpoints'].items():
+            before = old['endpoints'].get(label)
+            if before and before['p95'] and stats['p95']:
+                change = (stats['p95'] - before['p95']) / before['p95'] * 100
+                print(f"  {label:28} p95 {before['p95']:>8} -> {stats['p95']:>8} ms ({change:+.1f}%)  "
+                      f"consultas {before['queries_per_request']} -> {stats['queries_per_request']}",
+                      file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--target', choices=['package', 'legacy', 'both'], default='both')
+    parser.add_argument('--mode', choices=['client', 'server', 'both'], default='both')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=200, help='tareas por usuario')
+    parser.add_argument('--tags', type=int, default=10, help='etiquetas por usuario')
+    parser.add_argument('--requests', type=int, default=2000, help='peticiones por ejecución')
+    parser.add_argument('--clients', type=int, default=8, help='clientes concurrentes (modo server)')
+    parser.add_argument('--rounds', type=int, default=4, help='coste de bcrypt')
+    parser.add_argument('--hash-workers', type=int, default=0, help='procesos del pool de bcrypt')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--baseline', help='informe JSON anterior con el que comparar')
+    args = parser.parse_args()
+    if args.clients > args.users:
+        parser.error('--clients no puede superar --users (cada cliente usa su propio usuario)')
+
+    targets = ['package', 'legacy'] if args.target == 'both' else [args.target]
+    modes = ['client', 'server'] if args.mode == 'both' else [args.mode]
+    result = {'meta': metadata(args),
+              'results': [run(TARGETS[t], m, args) for t in targets for m in modes]}
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(json.load(f), result)
+
+
+if __name__ == '__main__':
+    main()
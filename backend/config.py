@@ -17,4 +17,98 @@ class Config:
     
     # Configuración de JWT (JSON Web Tokens)
     # Coloca una clave diferente para JWT, también hardcodeada.
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'h$B7n!E3kR5&Qj1G9uPz'
\ No newline at end of file
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'h$B7n!E3kR5&Qj1G9uPz'
+
+    # Revocación de JWT con filtro de Bloom delante de revoked_token (ver app/revocation.py)
+    JWT_BLOCKLIST_ERROR_RATE = 0.001        # falsos positivos del filtro (cada uno cuesta una consulta)
+    JWT_BLOCKLIST_MIN_CAPACITY = 10000
+    JWT_BLOCKLIST_REFRESH_INTERVAL = 5      # segundos hasta ver las revocaciones de otros procesos
+    JWT_BLOCKLIST_REBUILD_INTERVAL = 3600   # segundos entre borrado de caducados y reconstrucción
+
+    # Hashing de contraseñas (ver app/passwords.py)
+    # Factor de coste de bcrypt; los hashes con menos rondas se actualizan al hacer login
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    # Procesos dedicados a bcrypt (0 = en el hilo de la petición) y operaciones en espera
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = 10
+
+    # Perfil de producción de SQLite (ver app/sqlite.py y app/writer.py)
+    # WAL, synchronous=NORMAL, busy_timeout, mmap y caché de páginas
+    SQLITE_TUNED = os.environ.get('SQLITE_TUNED', '0') == '1'
+    # Aplica las claves foráneas (ON DELETE CASCADE) en SQLite, con o sin el perfil anterior
+    SQLITE_FOREIGN_KEYS = True
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE = -64 * 1024
+    # Hilo escritor único con commits agrupados (requiere SQLITE_TUNED por los SAVEPOINT)
+    SQLITE_GROUP_COMMIT = os.environ.get('SQLITE_GROUP_COMMIT', '0') == '1'
+    SQLITE_GROUP_COMMIT_TIMEOUT = 10       # segundos; después 503 con Retry-After
+
+    # Almacén en memoria de las tareas de los usuarios activos (ver app/task_store.py)
+    TASK_STORE_ENABLED = os.environ.get('TASK_STORE_ENABLED', '0') == '1'
+    TASK_STORE_MAX_BYTES = 64 * 1024 * 1024
+
+    # Orden manual de los tableros: longitud de clave que dispara la compactación (ver app/ordering.py)
+    POSITION_MAX_LENGTH = 24
+
+    # Compresión de respuestas grandes con brotli o gzip (ver app/encoding.py)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = 1024        # bytes; por debajo no compensa
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4     # calidad baja: compresión al vuelo, no estática
+
+    # Exportación/importación masiva (ver app/transfer.py)
+    EXPORT_CHUNK_SIZE = 1000    # filas por lectura (yield_per) y por escritura al cliente
+    IMPORT_CHUNK_SIZE = 1000    # registros por INSERT masivo y commit
+    IMPORT_MAX_ERRORS = 100     # errores detallados en el informe
+
+    # Baja de cuentas (ver app/accounts.py): filas borradas por transacción
+    ACCOUNT_PURGE_CHUNK_SIZE = 500
+
+    # Límite de peticiones y descarte de carga (ver app/ratelimit.py)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    # (tokens por segundo, capacidad de ráfaga) por usuario, o por IP en auth
+    RATE_LIMITS = {'read': (10, 60), 'write': (5, 30), 'auth': (0.2, 5)}
+    # 'memory' (por proceso) o la ruta de un fichero SQLite compartido por los workers
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    # Peticiones en curso por proceso antes de responder 503 (0 = sin límite)
+    RATE_LIMIT_MAX_CONCURRENT = int(os.environ.get('RATE_LIMIT_MAX_CONCURRENT', 0))
+    # Proxies inversos de confianza delante de la app: la IP del cliente (límites de
+    # auth) sale de X-Forwarded-For en vez de la del proxy (0 = conexión directa)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+
+    # Archivo de tareas completadas antiguas (ver app/archive.py)
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+    ARCHIVE_BATCH_SIZE = 500    # tareas por transacción
+    ARCHIVE_INTERVAL = int(os.environ.get('ARCHIVE_INTERVAL', 0))  # segundos; 0 = solo `flask archive run`
+
+    # Días que se guardan las lápidas de /sync (ver app/sync.py); un cliente con un
+    # cursor anterior recibe el estado completo. Las purga `flask sync prune` o el
+    # hilo del archivador
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+    # Recordatorios de vencimiento (ver app/reminders.py)
+    REMINDERS_ENABLED = os.environ.get('REMINDERS_ENABLED', '0') == '1'
+    # 'outbox' (tabla reminder_outbox), 'log' o la ruta de una clase con deliver(reminders)
+    REMINDER_SINK = os.environ.get('REMINDER_SINK', 'outbox')
+    REMINDER_LEAD = int(os.environ.get('REMINDER_LEAD', 0))  # segundos de antelación
+    REMINDER_WINDOW = 3600      # segundos de vencimientos cargados en memoria
+    REMINDER_TICK = 30          # segundos máximos entre pasadas
+    REMINDER_GRACE = 300        # segundos de retraso con los que aún se envía (p. ej. tras reiniciar)
+    REMINDER_BATCH_SIZE = 1000  # filas por lectura de la ventana
+    REMINDER_MAX_ENTRIES = 100000
+
+    # Flujo de cambios SSE (ver app/events.py)
+    EVENTS_QUEUE_SIZE = 100     # eventos pendientes por conexión antes de cortarla
+    EVENTS_REPLAY_SIZE = 256    # eventos recientes por usuario para Last-Event-ID
+    EVENTS_HEARTBEAT = 15       # segundos entre latidos
+
+    # Métricas Prometheus en /metrics y cabecera Server-Timing (ver app/metrics.py)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', '0') == '1'
+
+    # Modo diagnóstico de SQL: consultas lentas con su plan y N+1 (ver app/diagnostics.py)
+    SQL_DIAGNOSTICS = os.environ.get('SQL_DIAGNOSTICS', '0') == '1'
+    SQL_SLOW_QUERY_MS = int(os.environ.get('SQL_SLOW_QUERY_MS', 50))
+    SQL_N_PLUS_ONE_THRESHOLD = 5
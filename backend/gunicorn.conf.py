@@ -0,0 +1,79 @@
+# backend/gunicorn.conf.py
+"""Servidor de producción: varios procesos con varios hilos cada uno.
+
+Uso (desde backend/, con el esquema ya migrado):
+    flask db upgrade
+    SQLITE_TUNED=1 gunicorn -c gunicorn.conf.py
+
+La app se importa una vez en el maestro (`preload_app`) y los workers se
+crean con fork; `post_fork` rehace en cada uno las conexiones y el estado
+por proceso (app/server.py). Variables de entorno:
+
+- `WEB_CONCURRENCY`: workers (por defecto, uno por núcleo).
+- `GUNICORN_THREADS`: hilos por worker. Cada flujo SSE abierto ocupa uno.
+- `GUNICORN_BIND`: dirección de escucha (127.0.0.1:5000).
+- `RATE_LIMIT_STORAGE` / `RATE_LIMIT_MAX_CONCURRENT`: por defecto un fichero
+  SQLite común en el directorio temporal y `GUNICORN_THREADS - 2`.
+- `PROXY_FIX_X_FOR`: proxies inversos de confianza delante (nginx = 1). Sin
+  él, los límites por IP de login y registro ven a todos los clientes como
+  la IP del proxy y los bloquean a la vez.
+
+Cada worker tiene su propio pool de bcrypt (`PASSWORD_HASH_WORKERS`
+procesos) y, con `SQLITE_GROUP_COMMIT`, su propio hilo escritor: entre
+workers las escrituras se serializan con el `busy_timeout` de SQLite.
+
+Señales al maestro:
+- `HUP`: workers nuevos y parada ordenada de los viejos (recarga la
+  configuración; el código no, porque está precargado).
+- `USR2` y después `TERM` al maestro viejo: nuevo maestro con el código
+  actualizado, sin cortar conexiones.
+- `TERM`: parada ordenada. Los workers dejan de aceptar, cierran los flujos
+  SSE y terminan lo que tienen en curso (hasta `graceful_timeout`).
+"""
+import multiprocessing
+import os
+import signal
+import tempfile
+import threading
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Límite de peticiones (app/ratelimit.py): cubos compartidos por todos los workers
+# y dos hilos libres para responder 503 en lugar de encolar. Se lee al importar la app.
+os.environ.setdefault('RATE_LIMIT_STORAGE',
+                      os.path.join(tempfile.gettempdir(), 'organizador-ratelimit.db'))
+os.environ.setdefault('RATE_LIMIT_MAX_CONCURRENT', str(max(threads - 2, 1)))
+preload_app = True
+
+# Sin respuesta del worker en este tiempo el maestro lo reinicia
+timeout = 30
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 20))
+keepalive = 5
+# Reinicio periódico de workers (0 = nunca), con margen para no coincidir
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    from app.server import after_fork
+    after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    # Gunicorn instala aquí sus manejadores; se encadena el de parada ordenada
+    from app.server import drain
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(signum, frame):
+        # Fuera del manejador: cerrar los flujos toma el lock del hub
+        threading.Thread(target=drain, name='drain', daemon=True).start()
+        handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
@@ -90,13 +90,28 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # La tabla FTS5 de búsqueda (y sus tablas internas) se gestiona a mano
+    # en su migración; autogenerate no debe proponer borrarla
+    def include_name(name, type_, parent_names):
+        if type_ == 'table':
+            return not name.startswith('task_fts')
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            # Las migraciones por lotes recrean tablas (DROP + RENAME): con
+            # foreign_keys=ON el DROP borraría en cascada las filas hijas.
+            # Fuera de transacción, que dentro el PRAGMA no tiene efecto
+            connection.connection.driver_connection.execute('PRAGMA foreign_keys=OFF')
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
@@ -106,6 +121,9 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+        if sqlite:
+            connection.connection.driver_connection.execute('PRAGMA foreign_keys=ON')
+
 
 if context.is_offline_mode():
     run_migrations_offline()
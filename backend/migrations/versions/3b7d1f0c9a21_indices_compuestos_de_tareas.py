@@ -0,0 +1,32 @@
+"""Índices compuestos de tareas para filtros y paginación
+
+Revision ID: 3b7d1f0c9a21
+Revises: ec601c2b781f
+Create Date: 2026-10-17 10:12:31.418204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d1f0c9a21'
+down_revision = 'ec601c2b781f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index('ix_task_user_completed_due', ['user_id', 'completed', 'due_date'], unique=False)
+        batch_op.create_index('ix_task_user_created', ['user_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_task_user_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('ix_task_user_quadrant', ['user_id', 'eisenhower_quadrant'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_quadrant')
+        batch_op.drop_index('ix_task_user_status')
+        batch_op.drop_index('ix_task_user_created')
+        batch_op.drop_index('ix_task_user_completed_due')
@@ -0,0 +1,60 @@
+"""Sincronización incremental: versiones de cambios y tabla de lápidas
+
+Revision ID: 5c2e8a4d7f10
+Revises: 3b7d1f0c9a21
+Create Date: 2026-10-17 11:40:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8a4d7f10'
+down_revision = '3b7d1f0c9a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tombstone',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('sync_version', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstone_user_sync', ['user_id', 'sync_version'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_task_user_sync', ['user_id', 'sync_version'], unique=False)
+
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index('ix_tag_user_sync', ['user_id', 'sync_version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tag', schema=None) as batch_op:
+        batch_op.drop_index('ix_tag_user_sync')
+        batch_op.drop_column('sync_version')
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_sync')
+        batch_op.drop_column('sync_version')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('sync_version')
+
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstone_user_sync')
+
+    op.drop_table('tombstone')
@@ -0,0 +1,40 @@
+"""Acumulados diarios y semanales de sesiones Pomodoro
+
+Revision ID: 7a4f0b9e2c33
+Revises: 5c2e8a4d7f10
+Create Date: 2026-10-17 12:58:47.220931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4f0b9e2c33'
+down_revision = '5c2e8a4d7f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pomodoro_daily_stat',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table('pomodoro_weekly_stat',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'week_start')
+    )
+
+
+def downgrade():
+    op.drop_table('pomodoro_weekly_stat')
+    op.drop_table('pomodoro_daily_stat')
@@ -0,0 +1,56 @@
+"""Búsqueda FTS5 de tareas (título y descripción)
+
+Revision ID: 9d3e5b7a1c02
+Revises: 7a4f0b9e2c33
+Create Date: 2026-10-17 14:21:05.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3e5b7a1c02'
+down_revision = '7a4f0b9e2c33'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # Tabla virtual de contenido externo: solo guarda el índice, el texto sigue en task
+    op.execute(
+        "CREATE VIRTUAL TABLE task_fts USING fts5("
+        "title, description, content='task', content_rowid='id', prefix='2 3', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER task_fts_ai AFTER INSERT ON task BEGIN "
+        "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER task_fts_ad AFTER DELETE ON task BEGIN "
+        "INSERT INTO task_fts(task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+        "INSERT INTO task_fts(task_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO task_fts(rowid, title, description) VALUES (new.id, new.title, new.description); "
+        "END"
+    )
+    # Indexa las tareas existentes (en bases grandes: flask search rebuild)
+    op.execute("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS task_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS task_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS task_fts_ai")
+    op.execute("DROP TABLE IF EXISTS task_fts")
@@ -0,0 +1,38 @@
+"""Revocación de JWT: tabla revoked_token
+
+Revision ID: a7c2e5f8b1d4
+Revises: f1b4d7a9c3e6
+Create Date: 2026-10-19 10:05:48.217403
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c2e5f8b1d4'
+down_revision = 'f1b4d7a9c3e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('revoked_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('jti', name='uq_revoked_token_jti'),
+    sqlite_autoincrement=True
+    )
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.create_index('ix_revoked_token_expires', ['expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_token', schema=None) as batch_op:
+        batch_op.drop_index('ix_revoked_token_expires')
+
+    op.drop_table('revoked_token')
@@ -0,0 +1,62 @@
+"""Tareas recurrentes: regla en task y tabla de excepciones de ocurrencias
+
+Revision ID: b41c7e2d9f58
+Revises: 9d3e5b7a1c02
+Create Date: 2026-10-17 23:05:12.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41c7e2d9f58'
+down_revision = '9d3e5b7a1c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN no recrea la tabla: los triggers FTS de task se conservan
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence_rule', sa.String(length=200), nullable=True))
+        batch_op.create_index('ix_task_user_recurring', ['user_id'], unique=False,
+                              sqlite_where=sa.text('recurrence_rule IS NOT NULL'),
+                              postgresql_where=sa.text('recurrence_rule IS NOT NULL'))
+
+    op.create_table('occurrence_exception',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('occurrence', sa.DateTime(), nullable=False),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('cancelled', sa.Boolean(), nullable=False),
+    sa.Column('title', sa.String(length=150), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'occurrence', name='uq_occurrence_exception_task_occurrence')
+    )
+    with op.batch_alter_table('occurrence_exception', schema=None) as batch_op:
+        batch_op.create_index('ix_occurrence_exception_user_occurrence', ['user_id', 'occurrence'], unique=False)
+        batch_op.create_index('ix_occurrence_exception_user_due', ['user_id', 'due_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('occurrence_exception', schema=None) as batch_op:
+        batch_op.drop_index('ix_occurrence_exception_user_due')
+        batch_op.drop_index('ix_occurrence_exception_user_occurrence')
+
+    op.drop_table('occurrence_exception')
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_recurring')
+        batch_op.drop_column('recurrence_rule')
+
+    # DROP COLUMN recrea task y SQLite borra sus triggers: se vuelven a crear
+    if op.get_bind().dialect.name == 'sqlite':
+        from app.search import FTS_DDL_V1 as FTS_DDL
+        for statement in FTS_DDL:
+            op.execute(statement)
@@ -0,0 +1,41 @@
+"""Búsqueda FTS5 por usuario: user_id indexado en task_fts
+
+Revision ID: b8d3f6a2c9e1
+Revises: a7c2e5f8b1d4
+Create Date: 2026-10-18 00:20:41.582930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d3f6a2c9e1'
+down_revision = 'a7c2e5f8b1d4'
+branch_labels = None
+depends_on = None
+
+
+def _recreate_index(statements, columns):
+    op.execute("DROP TRIGGER IF EXISTS task_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS task_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS task_fts_ai")
+    op.execute("DROP TABLE IF EXISTS task_fts")
+    for statement in statements:
+        op.execute(statement)
+    # Indexa las tareas existentes (en bases grandes: flask search rebuild)
+    op.execute(f"INSERT INTO task_fts(rowid, {columns}) SELECT id, {columns} FROM task")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    from app.search import FTS_DDL
+    _recreate_index(FTS_DDL, 'title, description, user_id')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    from app.search import FTS_DDL_V1
+    _recreate_index(FTS_DDL_V1, 'title, description')
@@ -0,0 +1,47 @@
+"""Orden único por usuario: índice (user_id, position) y claves repetidas repartidas
+
+Revision ID: c3e9a7d5b2f4
+Revises: b8d3f6a2c9e1
+Create Date: 2026-10-18 01:05:12.407316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e9a7d5b2f4'
+down_revision = 'b8d3f6a2c9e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index('ix_task_user_position', ['user_id', 'position'], unique=False)
+
+    # Las claves se calculaban por columna del Kanban: los usuarios con claves
+    # repetidas se reparten de nuevo conservando su orden (position, id)
+    from app.ordering import spread_keys
+
+    bind = op.get_bind()
+    task = sa.table('task', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                    sa.column('position', sa.String))
+    repeated = bind.execute(
+        sa.select(task.c.user_id).where(task.c.position.is_not(None))
+        .group_by(task.c.user_id, task.c.position).having(sa.func.count() > 1).distinct()
+    ).scalars().all()
+    for user_id in repeated:
+        ids = bind.execute(
+            sa.select(task.c.id).where(task.c.user_id == user_id)
+            .order_by(task.c.position.is_(None), task.c.position, task.c.id)
+        ).scalars().all()
+        bind.execute(
+            task.update().where(task.c.id == sa.bindparam('task_id')).values(position=sa.bindparam('key')),
+            [{"task_id": task_id, "key": key} for task_id, key in zip(ids, spread_keys(len(ids)))]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_position')
@@ -0,0 +1,55 @@
+"""Orden manual de tareas: columna position (índice fraccionario) e índices por columna
+
+Revision ID: c5a8d3f1e7b4
+Revises: b41c7e2d9f58
+Create Date: 2026-10-17 23:48:37.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a8d3f1e7b4'
+down_revision = 'b41c7e2d9f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD COLUMN no recrea la tabla: los triggers FTS de task se conservan
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('position', sa.String(length=255), nullable=True))
+        batch_op.create_index('ix_task_user_status_position', ['user_id', 'status', 'position'], unique=False)
+        batch_op.create_index('ix_task_user_quadrant_position', ['user_id', 'eisenhower_quadrant', 'position'], unique=False)
+
+    # Posiciones iniciales: por usuario, en orden de creación
+    from app.ordering import spread_keys
+
+    bind = op.get_bind()
+    task = sa.table('task', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                    sa.column('created_at', sa.DateTime), sa.column('position', sa.String))
+    rows = bind.execute(
+        sa.select(task.c.id, task.c.user_id).order_by(task.c.user_id, task.c.created_at, task.c.id)
+    ).all()
+    by_user = {}
+    for task_id, user_id in rows:
+        by_user.setdefault(user_id, []).append(task_id)
+    for ids in by_user.values():
+        bind.execute(
+            task.update().where(task.c.id == sa.bindparam('task_id')).values(position=sa.bindparam('key')),
+            [{"task_id": task_id, "key": key} for task_id, key in zip(ids, spread_keys(len(ids)))]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_user_quadrant_position')
+        batch_op.drop_index('ix_task_user_status_position')
+        batch_op.drop_column('position')
+
+    # DROP COLUMN recrea task y SQLite borra sus triggers: se vuelven a crear
+    if op.get_bind().dialect.name == 'sqlite':
+        from app.search import FTS_DDL_V1 as FTS_DDL
+        for statement in FTS_DDL:
+            op.execute(statement)
@@ -0,0 +1,32 @@
+"""Retención de lápidas: versión purgada por usuario e índice por fecha de borrado
+
+Revision ID: d4f8b2e6a1c7
+Revises: c3e9a7d5b2f4
+Create Date: 2026-10-18 01:32:48.610254
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f8b2e6a1c7'
+down_revision = 'c3e9a7d5b2f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sync_pruned_version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.create_index('ix_tombstone_deleted', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tombstone', schema=None) as batch_op:
+        batch_op.drop_index('ix_tombstone_deleted')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('sync_pruned_version')
@@ -0,0 +1,75 @@
+"""Claves foráneas con ON DELETE CASCADE para borrar usuarios, tareas y etiquetas en bloque
+
+Revision ID: d8e2f4a6b9c1
+Revises: c5a8d3f1e7b4
+Create Date: 2026-10-18 00:41:09.381522
+
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e2f4a6b9c1'
+down_revision = 'c5a8d3f1e7b4'
+branch_labels = None
+depends_on = None
+
+# (tabla, columna, tabla referida): todas apuntan a la columna id
+FOREIGN_KEYS = [
+    ('occurrence_exception', 'task_id', 'task'),
+    ('occurrence_exception', 'user_id', 'user'),
+    ('pomodoro_daily_stat', 'user_id', 'user'),
+    ('pomodoro_session', 'user_id', 'user'),
+    ('pomodoro_weekly_stat', 'user_id', 'user'),
+    ('tag', 'user_id', 'user'),
+    ('task', 'user_id', 'user'),
+    ('task_tags', 'task_id', 'task'),
+    ('task_tags', 'tag_id', 'tag'),
+    ('tombstone', 'user_id', 'user'),
+]
+
+# Las claves de las migraciones anteriores no tienen nombre: en SQLite el
+# modo por lotes las reconoce con esta convención
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _set_ondelete(ondelete):
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table, keys in groupby(FOREIGN_KEYS, key=lambda key: key[0]):
+        existing = {fk['constrained_columns'][0]: fk['name'] for fk in inspector.get_foreign_keys(table)}
+        with op.batch_alter_table(table, schema=None, recreate='auto',
+                                  naming_convention=NAMING_CONVENTION) as batch_op:
+            for _, column, referred in keys:
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(existing.get(column) or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def _recreate_sqlite_extras():
+    # Recrear task en SQLite borra sus triggers FTS y el WHERE del índice parcial
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    from app.search import FTS_DDL_V1 as FTS_DDL
+    for statement in FTS_DDL:
+        op.execute(statement)
+    op.execute('DROP INDEX IF EXISTS ix_task_user_recurring')
+    op.execute('CREATE INDEX ix_task_user_recurring ON task (user_id) WHERE recurrence_rule IS NOT NULL')
+
+
+def upgrade():
+    # Filas huérfanas de borrados antiguos: con las claves aplicadas no podrían existir
+    op.execute('DELETE FROM task_tags WHERE task_id NOT IN (SELECT id FROM task) '
+               'OR tag_id NOT IN (SELECT id FROM tag)')
+    op.execute('DELETE FROM occurrence_exception WHERE task_id NOT IN (SELECT id FROM task)')
+
+    _set_ondelete('CASCADE')
+    _recreate_sqlite_extras()
+
+
+def downgrade():
+    _set_ondelete(None)
+    _recreate_sqlite_extras()
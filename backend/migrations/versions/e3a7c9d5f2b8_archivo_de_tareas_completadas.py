@@ -0,0 +1,93 @@
+"""Archivo de tareas completadas antiguas: archived_task, archived_task_tags e ids de task sin reutilizar
+
+Revision ID: e3a7c9d5f2b8
+Revises: d8e2f4a6b9c1
+Create Date: 2026-10-18 09:12:35.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a7c9d5f2b8'
+down_revision = 'd8e2f4a6b9c1'
+branch_labels = None
+depends_on = None
+
+
+def _recreate_sqlite_extras():
+    # Recrear task en SQLite borra sus triggers FTS y el WHERE del índice parcial
+    from app.search import FTS_DDL_V1 as FTS_DDL
+    for statement in FTS_DDL:
+        op.execute(statement)
+    op.execute('DROP INDEX IF EXISTS ix_task_user_recurring')
+    op.execute('CREATE INDEX ix_task_user_recurring ON task (user_id) WHERE recurrence_rule IS NOT NULL')
+
+
+def upgrade():
+    op.create_table('archived_task',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(length=150), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('eisenhower_quadrant', sa.String(length=30), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recurrence_rule', sa.String(length=200), nullable=True),
+    sa.Column('position', sa.String(length=255), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_archived_task_user_id_user', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_task', schema=None) as batch_op:
+        batch_op.create_index('ix_archived_task_user_archived', ['user_id', 'archived_at', 'id'], unique=False)
+
+    op.create_table('archived_task_tags',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tag.id'], name='fk_archived_task_tags_tag_id_tag', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['task_id'], ['archived_task.id'], name='fk_archived_task_tags_task_id_archived_task', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('task_id', 'tag_id')
+    )
+    # En SQLite se recrea task con AUTOINCREMENT: una tarea archivada debe poder volver con su id
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    with op.batch_alter_table('task', schema=None, recreate='always' if sqlite else 'auto',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.add_column(sa.Column('restored_at', sa.DateTime(), nullable=True))
+        batch_op.create_index('ix_task_completed_created', ['completed', 'created_at'], unique=False)
+
+    if sqlite:
+        # Tampoco los ids de tareas ya borradas (siguen en las lápidas de /sync)
+        op.execute("DELETE FROM sqlite_sequence WHERE name = 'task'")
+        op.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'task', COALESCE(MAX(id), 0) FROM "
+                   "(SELECT id FROM task UNION ALL "
+                   "SELECT entity_id FROM tombstone WHERE entity_type = 'task')")
+        _recreate_sqlite_extras()
+
+
+def downgrade():
+    # Las archivadas vuelven a `task` antes de borrar el archivo
+    op.execute('INSERT INTO task (id, title, description, due_date, completed, created_at, status, '
+               'eisenhower_quadrant, user_id, recurrence_rule, position) '
+               'SELECT id, title, description, due_date, completed, created_at, status, '
+               'eisenhower_quadrant, user_id, recurrence_rule, position FROM archived_task '
+               'WHERE id NOT IN (SELECT id FROM task)')
+    op.execute('INSERT INTO task_tags (task_id, tag_id) SELECT task_id, tag_id FROM archived_task_tags '
+               'WHERE task_id IN (SELECT id FROM task)')
+
+    sqlite = op.get_bind().dialect.name == 'sqlite'
+    with op.batch_alter_table('task', schema=None, recreate='always' if sqlite else 'auto',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        batch_op.drop_index('ix_task_completed_created')
+        batch_op.drop_column('restored_at')
+    if sqlite:
+        _recreate_sqlite_extras()
+
+    op.drop_table('archived_task_tags')
+    with op.batch_alter_table('archived_task', schema=None) as batch_op:
+        batch_op.drop_index('ix_archived_task_user_archived')
+
+    op.drop_table('archived_task')
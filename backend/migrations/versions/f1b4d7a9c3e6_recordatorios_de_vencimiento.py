@@ -0,0 +1,48 @@
+"""Recordatorios de vencimiento: índice (due_date, completed) de task y tabla reminder_outbox
+
+Revision ID: f1b4d7a9c3e6
+Revises: e3a7c9d5f2b8
+Create Date: 2026-10-18 16:41:07.382915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b4d7a9c3e6'
+down_revision = 'e3a7c9d5f2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reminder_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=150), nullable=False),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('delivered_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['task_id'], ['task.id'], name='fk_reminder_outbox_task_id_task', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_reminder_outbox_user_id_user', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'due_date', name='uq_reminder_outbox_task_due')
+    )
+    with op.batch_alter_table('reminder_outbox', schema=None) as batch_op:
+        batch_op.create_index('ix_reminder_outbox_pending', ['delivered_at', 'id'], unique=False)
+
+    # Solo un índice nuevo: task no se recrea y conserva triggers FTS e índice parcial
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index('ix_task_due_completed', ['due_date', 'completed'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_due_completed')
+
+    with op.batch_alter_table('reminder_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_reminder_outbox_pending')
+
+    op.drop_table('reminder_outbox')
@@ -1,7 +1,10 @@
 # backend/run.py
+# Servidor de desarrollo. En producción: gunicorn -c gunicorn.conf.py (ver wsgi.py)
+import os
+
 from app import create_app
 
 app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1')
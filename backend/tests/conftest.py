@@ -0,0 +1,49 @@
+# backend/tests/conftest.py
+"""Fixtures comunes: app del paquete `app` sobre un SQLite temporal, cliente y usuario."""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from config import Config
+from app import create_app, db, task_store
+from app.models import User
+from app.summary import summary_cache
+
+
+@pytest.fixture
+def app(tmp_path, request):
+    """App con una base propia; parametrizada indirectamente, sobreescribe la configuración."""
+    config = type('TestConfig', (Config,), {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'RATE_LIMIT_ENABLED': False,
+        'PASSWORD_HASH_WORKERS': 0,
+        'BCRYPT_LOG_ROUNDS': 4,
+        **getattr(request, 'param', {}),
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+    yield app
+    # Sin hilos que sigan consultando la base borrada
+    app.extensions['token_blocklist'].stop()
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth(app):
+    """Cabeceras con el JWT de un usuario nuevo."""
+    with app.app_context():
+        user = User(username='prueba', email='prueba@example.com')
+        user.set_password('secreto')
+        db.session.add(user)
+        db.session.commit()
+        # Las cachés son por proceso y los ids se repiten entre bases de prueba
+        summary_cache.invalidate(user.id)
+        task_store.invalidate(user.id)
+        return {'Authorization': 'Bearer ' + create_access_token(identity=str(user.id))}
@@ -0,0 +1,46 @@
+# backend/tests/test_queries.py
+"""Número de consultas de los endpoints más leídos (ver app/diagnostics.py)."""
+import pytest
+
+from app import db
+from app.diagnostics import assert_max_queries
+
+
+def _seed(client, auth, count):
+    tag = client.post('/tags', json={'name': 'casa'}, headers=auth).get_json()
+    operations = [{'op': 'create', 'data': {'title': f'Tarea {i}', 'tag_ids': [tag['id']]}}
+                  for i in range(count)]
+    response = client.post('/tasks/batch', json={'operations': operations}, headers=auth)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize('count', [1, 25])
+def test_list_tasks_does_not_depend_on_task_count(app, client, auth, count):
+    _seed(client, auth, count)
+    # Cursor del usuario, tareas y etiquetas de todas ellas
+    with app.app_context(), assert_max_queries(db.engine, 3):
+        response = client.get('/tasks', headers=auth)
+    assert response.status_code == 200
+    tasks = response.get_json()
+    assert len(tasks) == count
+    assert all(task['tags'] == [{'id': 1, 'name': 'casa'}] for task in tasks)
+
+
+@pytest.mark.parametrize('app', [{'TASK_STORE_ENABLED': True}], indirect=True)
+def test_list_tasks_from_store_only_checks_the_cursor(app, client, auth):
+    _seed(client, auth, 10)
+    client.get('/tasks', headers=auth)
+    with app.app_context(), assert_max_queries(db.engine, 1):
+        response = client.get('/tasks', headers=auth)
+    assert len(response.get_json()) == 10
+
+
+def test_summary_is_one_query_and_then_cached(app, client, auth):
+    _seed(client, auth, 5)
+    with app.app_context(), assert_max_queries(db.engine, 2):
+        first = client.get('/summary', headers=auth)
+    with app.app_context(), assert_max_queries(db.engine, 1):
+        second = client.get('/summary', headers=auth)
+    assert first.get_json() == second.get_json()
+    assert first.get_json()['total'] == 5
+
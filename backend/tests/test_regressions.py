@@ -0,0 +1,124 @@
+# backend/tests/test_regressions.py
+"""Entradas que respondían 500 (o estropeaban escrituras posteriores)."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Tombstone
+from app.sync import prune_tombstones
+
+
+def _create(client, auth, **data):
+    response = client.post('/tasks', json={'title': 'Tarea', **data}, headers=auth)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def _batch(client, auth, *operations):
+    return client.post('/tasks/batch', json={'operations': list(operations)}, headers=auth)
+
+
+@pytest.mark.parametrize('app', [{'TASK_STORE_ENABLED': True}], indirect=True)
+def test_zoned_due_date_is_stored_as_naive_utc(client, auth):
+    client.get('/tasks', headers=auth)  # carga el almacén
+    first = _create(client, auth, due_date='2026-10-10T10:00:00+02:00')
+    second = _create(client, auth, due_date='2026-10-10T09:00:00')
+    assert first['due_date'] == '2026-10-10T08:00:00'
+    updated = client.put(f"/tasks/{second['id']}", json={'due_date': '2026-10-11T10:00:00-05:00'},
+                         headers=auth).get_json()
+    assert updated['due_date'] == '2026-10-11T15:00:00'
+    assert [task['id'] for task in client.get('/tasks', headers=auth).get_json()] == \
+        [second['id'], first['id']]
+
+
+@pytest.mark.parametrize('due_date', ['mañana', 5, ['2026-10-10']])
+def test_invalid_due_date_is_rejected(client, auth, due_date):
+    task = _create(client, auth)
+    assert client.post('/tasks', json={'title': 'x', 'due_date': due_date},
+                       headers=auth).status_code == 400
+    assert client.put(f"/tasks/{task['id']}", json={'due_date': due_date},
+                      headers=auth).status_code == 400
+
+
+@pytest.mark.parametrize('data', [
+    {'status': None},
+    {'eisenhower_quadrant': None},
+    {'title': None},
+    {'tag_ids': '12'},
+    {'due_date': 'mañana'},
+])
+def test_batch_update_rejects_invalid_fields(client, auth, data):
+    task = _create(client, auth)
+    response = _batch(client, auth, {'op': 'update', 'id': task['id'], 'data': data})
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['status'] == 400
+
+
+def test_batch_empty_due_date_means_no_due_date(client, auth):
+    task = _create(client, auth, due_date='2026-10-10T10:00:00')
+    response = _batch(client, auth,
+                      {'op': 'create', 'data': {'title': 'nueva', 'due_date': ''}},
+                      {'op': 'update', 'id': task['id'], 'data': {'due_date': ''}})
+    assert response.status_code == 200
+    assert all(task['due_date'] is None for task in client.get('/tasks', headers=auth).get_json())
+
+
+def test_batch_update_keeps_recurring_tasks_dated(client, auth):
+    series = _create(client, auth, due_date='2026-10-10T10:00:00', recurrence_rule='FREQ=DAILY')
+    plain = _create(client, auth)
+    for operation in ({'op': 'update', 'id': series['id'], 'data': {'due_date': None}},
+                      {'op': 'update', 'id': plain['id'], 'data': {'recurrence_rule': 'FREQ=DAILY'}}):
+        assert _batch(client, auth, operation).status_code == 400
+    assert _batch(client, auth, {'op': 'update', 'id': plain['id'], 'data': {
+        'recurrence_rule': 'FREQ=DAILY', 'due_date': '2026-10-10T10:00:00'}}).status_code == 200
+
+
+@pytest.mark.parametrize('data', [
+    {'status': None},
+    {'eisenhower_quadrant': 3},
+    {'after_id': 'x'},
+    {'before_id': True},
+])
+def test_move_rejects_invalid_input(client, auth, data):
+    task = _create(client, auth)
+    assert client.post(f"/tasks/{task['id']}/move", json=data, headers=auth).status_code == 400
+
+
+def test_moves_keep_keys_unique_across_boards(client, auth):
+    # Mismo cuadrante, distinto estado: antes las claves del final se repetían
+    tasks = [_create(client, auth, status=status) for status in ('pending', 'done', 'pending', 'done')]
+    ids = [task['id'] for task in tasks]
+    positions = {task['position'] for task in client.get('/tasks', headers=auth).get_json()}
+    assert len(positions) == len(ids)
+    # Arrastre dentro de la columna del cuadrante, entre dos de distinto estado
+    response = client.post(f"/tasks/{ids[3]}/move", json={'after_id': ids[0], 'before_id': ids[1]},
+                           headers=auth)
+    assert response.status_code == 200
+    response = client.post(f"/tasks/{ids[2]}/move", json={'after_id': ids[0], 'before_id': ids[3]},
+                           headers=auth)
+    assert response.status_code == 200
+    column = sorted(client.get('/tasks', headers=auth).get_json(), key=lambda task: task['position'])
+    assert [task['id'] for task in column] == [ids[0], ids[2], ids[3], ids[1]]
+
+
+def test_sync_cursor_older_than_pruned_tombstones_gets_full_state(app, client, auth):
+    tasks = [_create(client, auth) for _ in range(3)]
+    since = client.get('/sync', headers=auth).get_json()['cursor']
+    client.delete(f"/tasks/{tasks[0]['id']}", headers=auth)
+    recent = client.get('/sync', headers=auth).get_json()['cursor']
+    client.delete(f"/tasks/{tasks[1]['id']}", headers=auth)
+    with app.app_context():
+        db.session.execute(
+            db.update(Tombstone).where(Tombstone.entity_id == tasks[0]['id'])
+            .values(deleted_at=datetime.utcnow() - timedelta(days=365))
+        )
+        db.session.commit()
+        assert prune_tombstones(days=90) == 1
+
+    stale = client.get(f'/sync?since={since}', headers=auth).get_json()
+    assert stale['full'] is True
+    assert [task['id'] for task in stale['tasks']] == [tasks[2]['id']]
+    fresh = client.get(f'/sync?since={recent}', headers=auth).get_json()
+    assert fresh['full'] is False
+    assert fresh['deleted']['tasks'] == [tasks[1]['id']]
@@ -0,0 +1,9 @@
+# backend/wsgi.py
+"""Punto de entrada WSGI de producción: `gunicorn -c gunicorn.conf.py`.
+
+No crea tablas: el esquema se aplica antes de arrancar con `flask db upgrade`.
+Para desarrollo sigue existiendo `python run.py`.
+"""
+from app import create_app
+
+app = create_app()
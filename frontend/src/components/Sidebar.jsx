@@ -18,8 +18,8 @@ function Sidebar() {
   const user = JSON.parse(localStorage.getItem('user'));
   const username = user ? user.username : 'Usuario';
 
-  const handleLogout = () => {
-    logoutUser();
+  const handleLogout = async () => {
+    await logoutUser();
     navigate('/login');
   };
 
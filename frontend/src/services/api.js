@@ -45,11 +45,31 @@ export const loginUser = async (credentials) => {
   return response.data;
 };
 
-export const logoutUser = () => {
+export const deleteAccount = async (password) => {
+  // DELETE /account → borra la cuenta y todos sus datos (pide la contraseña)
+  const response = await apiClient.delete('/account', { data: { password } });
+  clearSession();
+  return response.data;
+};
+
+export const clearSession = () => {
   localStorage.removeItem('accessToken');
   localStorage.removeItem('user');
 };
 
+export const logoutUser = async () => {
+  // POST /logout → revoca el token en el servidor (aunque falle, se borra la sesión local)
+  try {
+    if (localStorage.getItem('accessToken')) {
+      await apiClient.post('/logout');
+    }
+  } catch (error) {
+    console.error('No se pudo revocar el token', error);
+  } finally {
+    clearSession();
+  }
+};
+
 // =============================
 // TAREAS (TASKS)
 // =============================
@@ -58,6 +78,29 @@ export const getTasks = () => {
   return apiClient.get('/tasks');
 };
 
+// Accept: application/vnd.organizador.columnar+json → { columns, rows, tags } (más compacto).
+// El navegador ya descomprime gzip/br; esto rehace la lista de objetos
+export const fromColumnar = ({ columns, rows, tags = [] }) => {
+  const names = new Map(tags);
+  const tagsIndex = columns.indexOf('tags');
+  return rows.map((row) => {
+    const item = Object.fromEntries(columns.map((column, i) => [column, row[i]]));
+    if (tagsIndex !== -1) {
+      item.tags = row[tagsIndex].map((id) => ({ id, name: names.get(id) }));
+    }
+    return item;
+  });
+};
+
+export const getTasksColumnar = async (params = {}) => {
+  // GET /tasks con la representación columnar; devuelve la misma lista que getTasks
+  const response = await apiClient.get('/tasks', {
+    params,
+    headers: { Accept: 'application/vnd.organizador.columnar+json' },
+  });
+  return { ...response, data: fromColumnar(response.data) };
+};
+
 export const createTask = (taskData) => {
   // POST /tasks
   return apiClient.post('/tasks', taskData);
@@ -73,6 +116,13 @@ export const deleteTask = (taskId) => {
   return apiClient.delete(`/tasks/${taskId}`);
 };
 
+export const moveTask = (taskId, { after_id = null, before_id = null, ...column } = {}) => {
+  // POST /tasks/:id/move → coloca la tarjeta entre after_id (encima) y before_id (debajo).
+  // `column` puede traer status o eisenhower_quadrant si cambia de columna.
+  // 409 = el orden local está desfasado: volver a pedir GET /tasks?order=position
+  return apiClient.post(`/tasks/${taskId}/move`, { after_id, before_id, ...column });
+};
+
 // =============================
 // ETIQUETAS (TAGS)
 // =============================
@@ -91,4 +141,86 @@ export const deleteTag = (tagId) => {
   return apiClient.delete(`/tags/${tagId}`);
 };
 
+// =============================
+// SINCRONIZACIÓN INCREMENTAL
+// =============================
+export const syncChanges = (since = 0) => {
+  // GET /sync?since=<cursor> → { cursor, tasks, tags, deleted: { tasks, tags } }
+  return apiClient.get('/sync', { params: { since } });
+};
+
+// =============================
+// FLUJO DE CAMBIOS (SSE)
+// =============================
+export const subscribeEvents = (handlers = {}) => {
+  // GET /events → task.created | task.updated | task.deleted | tag.created |
+  // tag.deleted | sync | resync. EventSource no envía cabeceras: el JWT va en ?jwt=
+  const token = localStorage.getItem('accessToken');
+  const source = new EventSource(
+    `${apiClient.defaults.baseURL}/events?jwt=${encodeURIComponent(token || '')}`
+  );
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (event) => handler(JSON.parse(event.data)));
+  });
+  return source; // llamar a source.close() al desmontar
+};
+
+// =============================
+// AGENDA Y TAREAS RECURRENTES
+// =============================
+export const getAgenda = (start, end) => {
+  // GET /tasks/agenda?start=&end= → { start, end, tasks } con las series expandidas.
+  // Las ocurrencias traen `occurrence` (inicio original de esa repetición)
+  return apiClient.get('/tasks/agenda', { params: { start, end } });
+};
+
+export const updateOccurrence = (taskId, occurrence, changes) => {
+  // PUT /tasks/:id/occurrences/:occurrence → { completed, cancelled, title, due_date }
+  return apiClient.put(`/tasks/${taskId}/occurrences/${encodeURIComponent(occurrence)}`, changes);
+};
+
+export const resetOccurrence = (taskId, occurrence) => {
+  // DELETE /tasks/:id/occurrences/:occurrence → vuelve a ser como el resto de la serie
+  return apiClient.delete(`/tasks/${taskId}/occurrences/${encodeURIComponent(occurrence)}`);
+};
+
+// =============================
+// ARCHIVO
+// =============================
+export const getArchivedTasks = (cursor = null, limit = 100) => {
+  // GET /tasks/archive → completadas antiguas; la siguiente página en X-Next-Cursor
+  return apiClient.get('/tasks/archive', { params: cursor ? { cursor, limit } : { limit } });
+};
+
+export const unarchiveTasks = (ids) => {
+  // POST /tasks/unarchive → { tasks, cursor } (vuelven con su id, al final de su columna)
+  return apiClient.post('/tasks/unarchive', { ids });
+};
+
+// =============================
+// EXPORTAR / IMPORTAR
+// =============================
+export const exportTasks = (format = 'ndjson') => {
+  // GET /export?format=ndjson|csv → fichero con todas las tareas (etiquetas por nombre)
+  return apiClient.get('/export', { params: { format }, responseType: 'blob' });
+};
+
+export const importTasks = (file, format) => {
+  // POST /import (multipart, campo file) → { imported, failed, chunks, errors, cursor }
+  const form = new FormData();
+  form.append('file', file);
+  return apiClient.post('/import', form, {
+    params: format ? { format } : {},
+    headers: { 'Content-Type': 'multipart/form-data' }, // axios añade el boundary
+  });
+};
+
+// =============================
+// BÚSQUEDA
+// =============================
+export const searchTasks = (q, limit = 20) => {
+  // GET /tasks/search?q=... → tareas ordenadas por relevancia
+  return apiClient.get('/tasks/search', { params: { q, limit } });
+};
+
 export default apiClient;